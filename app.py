@@ -1,10 +1,18 @@
 """Streamlit application for Google Analytics 4 data analysis."""
+import hashlib
 import io
+import uuid
+from typing import Any, Callable, Dict
 import streamlit as st
 import pandas as pd
+from core.aggregates import get_aggregates
 from core.analyzer import DataAnalyzer
+from core.dashboard import build_dashboard
 from core.models import AVAILABLE_MODELS
+from core.prompts import ANALYSIS_TYPES
+from core.reader import read_ga4_csv
 from core.config import Config
+from core.callbacks import METRICS_REGISTRY
 
 # Setup environment
 Config.setup_environment()
@@ -15,6 +23,87 @@ AVAILABLE_MODEL_STATUS = Config.get_available_models()
 # Configure page
 st.set_page_config(layout="wide")
 
+def render_metrics():
+    """Render latency, token and cost metrics recorded in this process."""
+    snapshot = METRICS_REGISTRY.snapshot()
+    if not snapshot:
+        st.caption("No LLM calls recorded yet.")
+        return
+    
+    rows = []
+    for series in snapshot.get("orixa_llm_latency_seconds", []):
+        labels = series["labels"]
+        cost = next(
+            (entry["value"] for entry in snapshot.get("orixa_llm_cost_usd_total", [])
+             if entry["labels"] == labels),
+            0.0
+        )
+        rows.append({
+            "Model": labels["model"],
+            "Calls": series["count"],
+            "Avg latency (s)": round(series["mean"], 2),
+            "Cost (USD)": round(cost, 4),
+        })
+    if rows:
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+    
+    st.download_button("Export JSON", METRICS_REGISTRY.to_json(), "orixa_metrics.json")
+    st.download_button("Export Prometheus", METRICS_REGISTRY.to_prometheus(), "orixa_metrics.prom")
+
+def upload_key(uploaded_file) -> str:
+    """Cheaply identify an upload widget value, so reruns don't re-read the file."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    return file_id or f"{uploaded_file.name}:{uploaded_file.size}"
+
+def upload_fingerprint(uploaded_file) -> str:
+    """Identify an upload by its content, so re-uploading the same file doesn't reprocess it."""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+def run_once(store: str, job_id: str, fn: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Run a job once per id; reruns get the stored outcome instead of calling it again.
+    
+    Args:
+        store: Session state key holding the jobs
+        job_id: Identifier of the job
+        fn: Function performing the job
+        
+    Returns:
+        Dictionary with the "result" or the "error" message
+    """
+    jobs = st.session_state.setdefault(store, {})
+    if job_id not in jobs:
+        try:
+            jobs[job_id] = {"result": fn(), "error": None}
+        except Exception as e:
+            jobs[job_id] = {"result": None, "error": str(e)}
+    return jobs[job_id]
+
+def render_dashboard(analyzer: DataAnalyzer):
+    """Render KPIs and charts from the precomputed aggregates; no LLM call or data scan."""
+    aggregates = get_aggregates(analyzer.df, analyzer.dataset_version)
+    dashboard = build_dashboard(
+        aggregates,
+        top_k=Config.get_int("ORIXA_DASHBOARD_TOP_K", 10),
+        max_points=Config.get_int("ORIXA_DASHBOARD_MAX_POINTS", 500)
+    )
+    
+    for column, (label, value) in zip(st.columns(len(dashboard.kpis)), dashboard.kpis.items()):
+        column.metric(label, value)
+    
+    if not dashboard.trend.empty:
+        st.markdown("#### Daily Events and Users")
+        st.line_chart(dashboard.trend)
+        if len(dashboard.trend) < dashboard.trend_days:
+            st.caption(f"{len(dashboard.trend)} of {dashboard.trend_days} days shown (shape-preserving downsampling)")
+    
+    titles = list(dashboard.splits)
+    for row in range(0, len(titles), 2):
+        for column, title in zip(st.columns(2), titles[row:row + 2]):
+            with column:
+                st.markdown(f"#### {title}")
+                st.bar_chart(dashboard.splits[title])
+
 def render_sidebar():
     """Render the sidebar with GA4 guidance and model selection."""
     with st.sidebar:
@@ -72,6 +161,9 @@ def render_sidebar():
         4. Get instant insights
         """)
         
+        with st.expander("📈 LLM Metrics"):
+            render_metrics()
+        
         st.markdown("### ❓ Need Help?")
         st.markdown("""
         You can ask specific questions about your data using the
@@ -109,29 +201,57 @@ def main():
     render_sidebar()
     
     # Data Upload Section
-    uploaded_file = st.file_uploader("Upload your GA4 data (CSV)", type="csv")
+    uploaded_file = st.file_uploader(
+        "Upload your GA4 data (CSV, optionally .gz/.zst/.bz2 compressed)",
+        type=["csv", "gz", "zst", "bz2"]
+    )
     
     if uploaded_file is not None:
-        try:
-            # Create a loading placeholder
-            with st.status("Processing data...", expanded=True) as status:
-                # Read CSV file
-                df = pd.read_csv(uploaded_file)
-                status.update(label="Loading data...", state="running")
-                
-                try:
-                    # Load and process data
-                    st.session_state.analyzer.load_data(df)
-                    st.session_state.df = df
-                    status.update(label="✅ Data loaded successfully!", state="complete")
-                    st.session_state.analysis_complete = True
-                    
-                except ValueError as e:
-                    status.update(label=f"❌ Error: {str(e)}", state="error")
-                    st.stop()
-                    
-        except Exception as e:
-            st.error("❌ Error reading file. Please ensure you've uploaded a valid GA4 data export.")
+        # Only a new file is parsed and preprocessed; reruns reuse the loaded data
+        # and only hash the content when the widget holds a different upload
+        key = upload_key(uploaded_file)
+        if st.session_state.get("upload_key") == key:
+            fingerprint = st.session_state.get("upload_fingerprint")
+        else:
+            st.session_state.upload_key = key
+            fingerprint = upload_fingerprint(uploaded_file)
+        if st.session_state.get("upload_fingerprint") != fingerprint:
+            st.session_state.upload_fingerprint = fingerprint
+            st.session_state.upload_error = None
+            st.session_state.analysis_complete = False
+            for store in ("analysis_jobs", "compare_jobs", "questions"):
+                st.session_state.pop(store, None)
+            try:
+                # Create a loading placeholder
+                with st.status("Processing data...", expanded=True) as status:
+                    try:
+                        # Read the CSV, validating its header before the full parse
+                        df = read_ga4_csv(uploaded_file)
+                        status.update(label="Loading data...", state="running")
+                        
+                        # Load and process data
+                        st.session_state.analyzer.load_data(df)
+                        st.session_state.df = df
+                        # Computed once per dataset; the dashboard only reads them
+                        status.update(label="Computing aggregates...", state="running")
+                        analyzer = st.session_state.analyzer
+                        get_aggregates(analyzer.df, analyzer.dataset_version)
+                        status.update(label="✅ Data loaded successfully!", state="complete")
+                        st.session_state.analysis_complete = True
+                        
+                    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+                        raise
+                    except ValueError as e:
+                        status.update(label=f"❌ Error: {str(e)}", state="error")
+                        st.session_state.upload_error = f"❌ Error: {str(e)}"
+                        
+            except Exception as e:
+                st.session_state.upload_error = (
+                    "❌ Error reading file. Please ensure you've uploaded a valid GA4 data export."
+                )
+        
+        if st.session_state.get("upload_error"):
+            st.error(st.session_state.upload_error)
             st.stop()
     
     # Only show analysis section if data is loaded and processed
@@ -143,20 +263,46 @@ def main():
         st.info(f"🤖 Currently using: {current_model.display_name}")
         
         # Analysis section with tabs
-        tab1, tab2 = st.tabs(["📊 Key Insights", "❓ Ask Questions"])
+        dashboard_tab, tab1, tab2, tab3 = st.tabs(
+            ["📈 Dashboard", "📊 Key Insights", "❓ Ask Questions", "🆚 Compare Models"]
+        )
+        
+        with dashboard_tab:
+            render_dashboard(st.session_state.analyzer)
         
         with tab1:
+            selected_analyses = st.multiselect(
+                "Analyses to run:",
+                options=list(ANALYSIS_TYPES.keys()),
+                default=["overview"],
+                format_func=lambda analysis_type: ANALYSIS_TYPES[analysis_type]
+            )
+            
+            # Jobs are identified by model and selection; reruns show the stored result
+            analysis_id = f"{st.session_state.current_model}:{','.join(selected_analyses)}"
             if st.button("Analyze Data", type="primary"):
+                st.session_state.analysis_job_id = analysis_id
                 with st.spinner(f"Generating insights using {current_model.display_name}..."):
-                    try:
-                        result = st.session_state.analyzer.analyze("overview")
-                        
-                        # Display results in a clean format
-                        st.markdown("### 📈 Analysis Results")
-                        st.markdown(result)
-                        
-                    except Exception as e:
-                        st.error(f"❌ Error during analysis: {str(e)}")
+                    if len(selected_analyses) == 1:
+                        run_once(
+                            "analysis_jobs", analysis_id,
+                            lambda: st.session_state.analyzer.analyze(selected_analyses[0])
+                        )
+                    else:
+                        # Runs the analyses concurrently and combines them
+                        run_once(
+                            "analysis_jobs", analysis_id,
+                            lambda: st.session_state.analyzer.analyze_batch(selected_analyses or None)
+                        )
+            
+            job = st.session_state.get("analysis_jobs", {}).get(st.session_state.get("analysis_job_id"))
+            if job is not None:
+                if job["error"]:
+                    st.error(f"❌ Error during analysis: {job['error']}")
+                else:
+                    # Display results in a clean format
+                    st.markdown("### 📈 Analysis Results")
+                    st.markdown(job["result"])
         
         with tab2:
             st.markdown("### Ask Specific Questions")
@@ -167,15 +313,68 @@ def main():
             - What's the most common user journey?
             """)
             
-            question = st.text_input("Your question:")
-            if question:
+            # Follow-ups can refer to earlier answers in this session
+            if len(st.session_state.analyzer.memory) and st.button("Clear conversation"):
+                st.session_state.analyzer.memory.clear()
+                st.session_state.pop("questions", None)
+            
+            # Questions are sent once per submission and kept by id for reruns
+            with st.form("ask_form", clear_on_submit=True):
+                question = st.text_input("Your question:")
+                submitted = st.form_submit_button("Ask")
+            if submitted and question.strip():
                 with st.spinner(f"Finding answers using {current_model.display_name}..."):
-                    try:
-                        result = st.session_state.analyzer.ask(question)
-                        st.markdown("### 💡 Answer")
-                        st.markdown(result)
-                    except Exception as e:
-                        st.error(f"❌ Error processing question: {str(e)}")
+                    question_id = uuid.uuid4().hex
+                    run_once(
+                        "questions", question_id,
+                        lambda: st.session_state.analyzer.ask(question)
+                    )
+                    st.session_state.questions[question_id]["question"] = question
+            
+            for entry in reversed(list(st.session_state.get("questions", {}).values())):
+                st.markdown(f"**Q: {entry['question']}**")
+                if entry["error"]:
+                    st.error(f"❌ Error processing question: {entry['error']}")
+                else:
+                    st.markdown(entry["result"])
+                st.markdown("---")
+        
+        with tab3:
+            st.markdown("### Compare AI Models")
+            st.markdown("Run the same request against every available model side by side.")
+            
+            compare_question = st.text_input(
+                "Question to compare (leave empty for the data overview):",
+                key="compare_question"
+            )
+            if st.button("Compare Models"):
+                st.session_state.compare_job_id = compare_question
+                with st.spinner("Running all available models..."):
+                    run_once(
+                        "compare_jobs", compare_question,
+                        lambda: st.session_state.analyzer.compare_models(
+                            question=compare_question or None
+                        )
+                    )
+            
+            job = st.session_state.get("compare_jobs", {}).get(st.session_state.get("compare_job_id"))
+            if job is not None:
+                if job["error"]:
+                    st.error(f"❌ Error comparing models: {job['error']}")
+                else:
+                    results = job["result"]
+                    columns = st.columns(len(results))
+                    for column, result in zip(columns, results.values()):
+                        with column:
+                            st.markdown(f"#### {result.display_name}")
+                            st.caption(
+                                f"⏱️ {result.latency_seconds:.1f}s · "
+                                f"🔤 {result.prompt_tokens} in / {result.completion_tokens} out"
+                            )
+                            if result.error:
+                                st.error(f"❌ {result.error}")
+                            else:
+                                st.markdown(result.output)
 
 if __name__ == "__main__":
     main()
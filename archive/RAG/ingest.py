@@ -0,0 +1,257 @@
+"""Parallel, deduplicated, incremental ingestion into the local vector store.
+
+Files are parsed and split in a process pool. Each chunk is identified by a
+hash of its text, so chunks already in the store (from an earlier upload or
+another file) are never embedded again, and unchanged files are skipped
+before parsing. New chunks are embedded in large batches, several batches
+at a time, and appended to the store as each batch finishes, so the index
+grows incrementally and a failure only loses the batches in flight.
+
+A file counts as unchanged only once all of its chunks are stored: its hash
+is recorded in the store's file manifest after its last batch, so a file
+whose batches partly failed is parsed again on the next upload and only its
+missing chunks are embedded.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from langchain_core.embeddings import Embeddings
+from vector_store import HashingEmbeddings, LocalVectorStore, chunk_id
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# Hashes of the files whose chunks are all in the store
+FILES_MANIFEST = "files.json"
+
+@dataclass
+class IngestStats:
+    """What an ingestion run did."""
+    files: int = 0
+    skipped_files: int = 0
+    chunks: int = 0
+    new_chunks: int = 0
+    duplicate_chunks: int = 0
+    seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.new_chunks / self.seconds if self.seconds else 0.0
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_file(path: str, name: str, content_hash: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Load and split one file; runs in a worker process.
+
+    Returns:
+        (text, metadata) per chunk
+    """
+    from langchain.document_loaders import UnstructuredFileLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    documents = UnstructuredFileLoader(path).load()
+    metadata = {
+        "filename": name,
+        "filetype": os.path.splitext(name)[1],
+        "filesize": os.path.getsize(path),
+        "file_hash": content_hash
+    }
+    for doc in documents:
+        doc.metadata.update(metadata)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return [(chunk.page_content, chunk.metadata) for chunk in splitter.split_documents(documents)]
+
+def embed_batch(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    return embeddings.embed_documents(texts)
+
+def read_manifest(directory: str) -> Set[str]:
+    """Hashes of the files fully ingested into the store in directory."""
+    try:
+        with open(os.path.join(directory, FILES_MANIFEST), encoding="utf-8") as f:
+            return set(json.load(f))
+    except FileNotFoundError:
+        return set()
+
+def write_manifest(directory: str, hashes: Set[str]) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(sorted(hashes), f)
+    os.replace(tmp_path, os.path.join(directory, FILES_MANIFEST))
+
+class Ingestor:
+    """Feeds files into a LocalVectorStore."""
+
+    def __init__(
+        self,
+        store: LocalVectorStore,
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+        concurrency: int = 4,
+        parse: Callable[[str, str, str], List[Tuple[str, Dict[str, Any]]]] = parse_file
+    ):
+        """
+        Args:
+            store: Store to add chunks to
+            workers: Processes for parsing (default: CPU count)
+            batch_size: Chunks per embedding request
+            concurrency: Embedding batches in flight
+            parse: Top-level function turning a file into chunks
+        """
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.parse = parse
+
+    def _embedding_executor(self, pool: ProcessPoolExecutor) -> Tuple[Executor, bool]:
+        """Local embedders are CPU-bound and use the process pool; remote ones use threads."""
+        if isinstance(self.store.embedding, HashingEmbeddings):
+            return pool, False
+        return ThreadPoolExecutor(max_workers=self.concurrency), True
+
+    def ingest(self, files: List[Tuple[str, str]], progress: Optional[Callable[[str], None]] = None) -> IngestStats:
+        """
+        Ingest files, skipping content the store already has.
+
+        Args:
+            files: (path, display name) per file
+            progress: Called with a status line as files finish
+
+        Returns:
+            Statistics of the run; files that failed to parse or embed are
+            listed in ``errors`` and retried on the next run
+        """
+        start = time.perf_counter()
+        stats = IngestStats(files=len(files))
+        report = progress or (lambda message: None)
+        known_files = read_manifest(self.store.directory)
+        stored: Set[str] = self.store.ids()
+        seen = set(stored)
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        in_flight: Dict[Future, List[Tuple[str, Dict[str, Any]]]] = {}
+        # Chunk id -> hashes of the files waiting for it to be stored
+        waiting: Dict[str, Set[str]] = {}
+        # File hash -> number of its chunks not stored yet
+        remaining: Dict[str, int] = {}
+        # File hash -> display name
+        names: Dict[str, str] = {}
+
+        def complete(content_hash: str) -> None:
+            known_files.add(content_hash)
+            write_manifest(self.store.directory, known_files)
+
+        def fail(content_hash: str, error: Exception) -> None:
+            # The file stays out of the manifest, so the next upload retries it
+            if content_hash in remaining:
+                del remaining[content_hash]
+                stats.errors[names[content_hash]] = str(error)
+                report(f"{names[content_hash]}: {error}")
+
+        def finish(done: Set[Future]) -> None:
+            for future in done:
+                batch = in_flight.pop(future)
+                texts = [text for text, _ in batch]
+                ids = [chunk_id(text) for text in texts]
+                try:
+                    self.store.add_embeddings(texts, future.result(), [metadata for _, metadata in batch], ids)
+                except Exception as e:
+                    for text_id in ids:
+                        # Later files with this chunk queue it again
+                        seen.discard(text_id)
+                        for content_hash in waiting.pop(text_id, ()):
+                            fail(content_hash, e)
+                    continue
+                stats.new_chunks += len(batch)
+                for text_id in ids:
+                    stored.add(text_id)
+                    for content_hash in waiting.pop(text_id, ()):
+                        if content_hash in remaining:
+                            remaining[content_hash] -= 1
+                            if not remaining[content_hash]:
+                                del remaining[content_hash]
+                                complete(content_hash)
+
+        def submit(executor: Executor, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+            # Bound the batches in flight so memory and API concurrency stay flat
+            while len(in_flight) >= self.concurrency:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finish(done)
+            future = executor.submit(embed_batch, self.store.embedding, [text for text, _ in batch])
+            in_flight[future] = batch
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            executor, owns_executor = self._embedding_executor(pool)
+            try:
+                parsing = {}
+                for path, name in files:
+                    try:
+                        content_hash = file_hash(path)
+                    except OSError as e:
+                        stats.errors[name] = str(e)
+                        report(f"{name}: {e}")
+                        continue
+                    if content_hash in known_files:
+                        stats.skipped_files += 1
+                        report(f"{name}: unchanged, skipped")
+                        continue
+                    if content_hash in names:
+                        # The same content uploaded twice in this run
+                        stats.skipped_files += 1
+                        report(f"{name}: unchanged, skipped")
+                        continue
+                    names[content_hash] = name
+                    parsing[pool.submit(self.parse, path, name, content_hash)] = content_hash
+
+                for future in as_completed(parsing):
+                    content_hash = parsing[future]
+                    name = names[content_hash]
+                    try:
+                        chunks = future.result()
+                    except Exception as e:
+                        stats.errors[name] = str(e)
+                        report(f"{name}: {e}")
+                        continue
+                    stats.chunks += len(chunks)
+                    fresh = 0
+                    unstored = set()
+                    for text, metadata in chunks:
+                        text_id = chunk_id(text)
+                        if text_id not in stored:
+                            unstored.add(text_id)
+                        if text_id in seen:
+                            stats.duplicate_chunks += 1
+                            continue
+                        seen.add(text_id)
+                        pending.append((text, metadata))
+                        fresh += 1
+                    for text_id in unstored:
+                        waiting.setdefault(text_id, set()).add(content_hash)
+                    if unstored:
+                        remaining[content_hash] = len(unstored)
+                    else:
+                        complete(content_hash)
+                    report(f"{name}: {len(chunks)} chunks, {fresh} new")
+                    while len(pending) >= self.batch_size:
+                        submit(executor, pending[:self.batch_size])
+                        del pending[:self.batch_size]
+                if pending:
+                    submit(executor, pending)
+                finish(set(in_flight))
+            finally:
+                if owns_executor:
+                    executor.shutdown()
+
+        stats.seconds = time.perf_counter() - start
+        return stats
@@ -5,24 +5,17 @@ from typing import List, Dict
 from langchain_openai import OpenAI
 from langchain.document_loaders import UnstructuredFileLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain.chains import RetrievalQA
 from langchain_community.document_loaders import DirectoryLoader
-from langchain.vectorstores import MongoDBAtlasVectorSearch
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from vector_store import LocalVectorStore, chunk_id, get_embeddings
+from ingest import Ingestor
 
 # Load environment variables
 load_dotenv()
 
-# MongoDB Atlas setup
-client = os.getenv("MONGO_URI")
-dbName = "orixadb"
-COLLECTION_NAME = "your_collection_name"
-
-client = MongoClient("MONGODB_ATLAS_CLUSTER_URI")
-db = client["DB_NAME"]
-collection = db["COLLECTION_NAME"]
+# Local vector store setup; RAG_EMBEDDINGS picks the embedder (openai or hashing)
+STORE_DIR = os.getenv("RAG_STORE_DIR", "rag_store")
 
 # File processing function
 def process_file(file_path: str) -> List[Dict[str, str]]:
@@ -43,44 +36,69 @@ def process_file(file_path: str) -> List[Dict[str, str]]:
     return documents
 
 # Text splitting and embedding
-def create_vector_store(documents: List[Dict[str, str]]) -> MongoDBAtlasVectorSearch:
+def create_vector_store(documents: List[Dict[str, str]]) -> LocalVectorStore:
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
     texts = text_splitter.split_documents(documents)
     
-    embeddings = OpenAIEmbeddings()
-    
-    vector_store = MongoDBAtlasVectorSearch.from_documents(
-        texts,
-        embeddings,
-        collection=collection,
-        index_name="default"  # Make sure this index exists in your MongoDB Atlas cluster
-    )
+    vector_store = LocalVectorStore(STORE_DIR, get_embeddings())
+    # Only embed chunks the store doesn't have yet
+    known = vector_store.ids()
+    new_texts = []
+    for text in texts:
+        if chunk_id(text.page_content) not in known:
+            known.add(chunk_id(text.page_content))
+            new_texts.append(text)
+    vector_store.add_documents(new_texts)
     
     return vector_store
 
+# Retrieval over the stored chunks
+def search_vector_store(query: str, k: int = 4):
+    vector_store = LocalVectorStore(STORE_DIR, get_embeddings())
+    return vector_store.similarity_search_with_score(query, k=k)
+
 # Streamlit file uploader
 def file_uploader():
     uploaded_files = st.file_uploader("Choose files", accept_multiple_files=True)
     if uploaded_files:
-        for uploaded_file in uploaded_files:
-            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                tmp_file_path = tmp_file.name
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = []
+            for i, uploaded_file in enumerate(uploaded_files):
+                # Keep the extension; the loader picks the parser from it
+                tmp_file_path = os.path.join(tmp_dir, f"{i}{os.path.splitext(uploaded_file.name)[1]}")
+                with open(tmp_file_path, "wb") as tmp_file:
+                    tmp_file.write(uploaded_file.getvalue())
+                files.append((tmp_file_path, uploaded_file.name))
 
-            try:
-                st.write(f"Processing {uploaded_file.name}...")
-                documents = process_file(tmp_file_path)
-                vector_store = create_vector_store(documents)
-                st.success(f"Successfully processed and stored {uploaded_file.name}")
-            except Exception as e:
-                st.error(f"Error processing {uploaded_file.name}: {str(e)}")
-            finally:
-                os.unlink(tmp_file_path)
+            with st.status(f"Processing {len(files)} files...") as status:
+                try:
+                    ingestor = Ingestor(LocalVectorStore(STORE_DIR, get_embeddings()))
+                    stats = ingestor.ingest(files, progress=st.write)
+                except Exception as e:
+                    # Files whose chunks weren't all stored are retried on the next upload
+                    status.update(state="error")
+                    st.error(f"Error processing files: {str(e)}")
+                    return
+                status.update(state="error" if stats.errors else "complete")
+
+        for name, error in stats.errors.items():
+            st.error(f"Error processing {name}: {error}")
+        st.success(
+            f"Stored {stats.new_chunks} new chunks from {stats.files - stats.skipped_files - len(stats.errors)} files "
+            f"({stats.duplicate_chunks} duplicate chunks and {stats.skipped_files} unchanged files skipped) "
+            f"in {stats.seconds:.1f}s"
+        )
 
 # Main function
 def main():
     st.title("RAG File Upload and Processing")
     file_uploader()
+    
+    query = st.text_input("Search the uploaded files")
+    if query:
+        for doc, score in search_vector_store(query):
+            st.markdown(f"**{doc.metadata.get('filename', 'unknown')}** (similarity {score:.2f})")
+            st.write(doc.page_content)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,432 @@
+"""Local on-disk vector store for the RAG pipeline.
+
+Embeddings live in a memory-mapped float32 matrix (``vectors.f32``) next to a
+JSON-lines file of chunk texts and metadata (``chunks.jsonl``), so a store
+opens instantly and is searched without loading it into RAM. Vectors are
+L2-normalized on insert, which makes cosine similarity a plain dot product:
+small and medium stores are searched exhaustively with NumPy, large ones can
+build an inverted-file (IVF) index that only scores the closest clusters.
+
+    store = LocalVectorStore("rag_store", get_embeddings())
+    store.add_documents(chunks)
+    store.similarity_search("Which campaigns converted best?", k=4)
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.jsonl"
+INDEX_FILE = "index.json"
+IVF_FILE = "ivf.npz"
+
+# Rows scored per block, bounding the temporary score array of brute-force search
+SEARCH_BLOCK_ROWS = 65536
+# Below this many vectors a full scan is as fast as probing an IVF index
+IVF_MIN_ROWS = 50000
+
+class HashingEmbeddings(Embeddings):
+    """
+    Offline embedder: signed feature hashing of words and word pairs.
+
+    Needs no model or network and is deterministic across processes, so a
+    store built with it can be searched anywhere. It matches shared
+    vocabulary rather than meaning; use a neural embedder where that matters.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    @property
+    def name(self) -> str:
+        return f"hashing-{self.dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+def chunk_id(text: str) -> str:
+    """Content-derived id, so the same chunk always gets the same id."""
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+def embeddings_name(embeddings: Embeddings) -> str:
+    """Identify an embedder, so a store is never queried with a different one."""
+    name = getattr(embeddings, "name", None)
+    if isinstance(name, str):
+        return name
+    model = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None)
+    return f"{type(embeddings).__name__}:{model}" if model else type(embeddings).__name__
+
+def get_embeddings(kind: Optional[str] = None) -> Embeddings:
+    """
+    Get the embedder selected by RAG_EMBEDDINGS ("openai" or "hashing").
+
+    Defaults to OpenAI embeddings when OPENAI_API_KEY is set and to the
+    offline hashing embedder otherwise.
+    """
+    kind = (kind or os.getenv("RAG_EMBEDDINGS", "")).strip().lower()
+    if not kind:
+        kind = "openai" if os.getenv("OPENAI_API_KEY") else "hashing"
+    if kind == "hashing":
+        return HashingEmbeddings(int(os.getenv("RAG_EMBEDDING_DIMENSIONS", "512")))
+    if kind == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings()
+    raise ValueError(f"Unknown embeddings: {kind}. Use 'openai' or 'hashing'.")
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def _kmeans(vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids of unit vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for list_id in range(n_lists):
+            members = vectors[assignment == list_id]
+            if len(members):
+                centroids[list_id] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+class LocalVectorStore(VectorStore):
+    """
+    LangChain vector store kept in a local directory.
+
+    Usable anywhere a VectorStore is expected, e.g. ``as_retriever()``.
+    Scores are cosine similarities in [-1, 1]; higher is closer.
+    """
+
+    def __init__(self, directory: str, embedding: Embeddings):
+        """
+        Args:
+            directory: Store directory, created if missing
+            embedding: Embedder for documents and queries; must match the
+                one the store was built with
+
+        Raises:
+            ValueError: If the store was built with a different embedder
+        """
+        self.directory = directory
+        self.embedding = embedding
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._chunks: Optional[List[Dict[str, Any]]] = None
+        self._ivf: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        os.makedirs(directory, exist_ok=True)
+
+        self._index = self._read_index()
+        name = embeddings_name(embedding)
+        if self._index.get("embeddings") not in (None, name):
+            raise ValueError(
+                f"Store {directory} was built with {self._index['embeddings']}, not {name}. "
+                "Rebuild it or use the same embeddings."
+            )
+        self._index["embeddings"] = name
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self) -> int:
+        return self._index.get("count", 0)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self._path(INDEX_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "dimensions": None}
+
+    def _write_index(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._path(INDEX_FILE))
+
+    def _vectors(self) -> np.ndarray:
+        """The stored vectors as a read-only memory map."""
+        if self._matrix is None or len(self._matrix) != len(self):
+            if not len(self):
+                return np.zeros((0, self._index.get("dimensions") or 0), dtype=np.float32)
+            self._matrix = np.memmap(
+                self._path(VECTORS_FILE),
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self), self._index["dimensions"])
+            )
+        return self._matrix
+
+    def _chunk_records(self) -> List[Dict[str, Any]]:
+        if self._chunks is None or len(self._chunks) != len(self):
+            records = []
+            if os.path.exists(self._path(CHUNKS_FILE)):
+                # Bytes past the recorded size are from an interrupted write
+                with open(self._path(CHUNKS_FILE), "rb") as f:
+                    content = f.read(self._index.get("chunks_bytes", -1))
+                records = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+            self._chunks = records[:len(self)]
+        return self._chunks
+
+    def ids(self) -> Set[str]:
+        """Ids of all stored chunks."""
+        return {chunk["id"] for chunk in self._chunk_records()}
+
+    def metadata_values(self, key: str) -> Set[Any]:
+        """Distinct values of a metadata field across the stored chunks."""
+        return {chunk["metadata"][key] for chunk in self._chunk_records() if key in chunk["metadata"]}
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed texts and append them to the store.
+
+        Returns:
+            The ids of the added texts (by default a hash of each text)
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: Any,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Append texts whose embeddings were computed elsewhere, e.g. in batches.
+
+        Args:
+            texts: Chunk texts
+            embeddings: One vector per text, from this store's embedder
+            metadatas: Metadata per text
+            ids: Id per text (default: a hash of the text)
+
+        Returns:
+            The ids of the added texts
+        """
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [chunk_id(text) for text in texts]
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            dimensions = self._index.get("dimensions") or vectors.shape[1]
+            if vectors.shape[1] != dimensions:
+                raise ValueError(f"Embedding has {vectors.shape[1]} dimensions, the store has {dimensions}")
+            count = len(self)
+            # Truncate leftovers of an interrupted write before appending
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.truncate(count * dimensions * 4)
+                f.write(vectors.tobytes())
+            records = [
+                {"id": text_id, "text": text, "metadata": metadata}
+                for text_id, text, metadata in zip(ids, texts, metadatas)
+            ]
+            chunks = self._chunk_records()
+            encoded = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+            chunks_bytes = self._index.get("chunks_bytes")
+            if chunks_bytes is None:
+                chunks_bytes = sum(len(json.dumps(chunk) + "\n") for chunk in chunks) if count else 0
+            with open(self._path(CHUNKS_FILE), "ab") as f:
+                f.truncate(chunks_bytes)
+                f.write(encoded)
+            if self._ivf is not None or os.path.exists(self._path(IVF_FILE)):
+                self._extend_ivf(vectors)
+            self._index.update(
+                count=count + len(texts),
+                dimensions=dimensions,
+                chunks_bytes=chunks_bytes + len(encoded)
+            )
+            # The count is written last; it is what makes the new rows visible
+            self._write_index()
+            chunks.extend(records)
+        return ids
+
+    def build_ivf(self, n_lists: Optional[int] = None, sample_size: int = 100000) -> None:
+        """
+        Build an inverted-file index over the stored vectors.
+
+        Args:
+            n_lists: Number of clusters (default: about sqrt(count))
+            sample_size: Vectors used to train the clusters
+        """
+        vectors = self._vectors()
+        if not len(vectors):
+            raise ValueError("Cannot build an index over an empty store")
+        n_lists = min(n_lists or max(1, int(np.sqrt(len(vectors)))), len(vectors))
+        rng = np.random.default_rng(0)
+        sample = vectors[np.sort(rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False))]
+        centroids = _kmeans(np.asarray(sample), n_lists)
+        assignment = np.concatenate([
+            np.argmax(vectors[start:start + SEARCH_BLOCK_ROWS] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), SEARCH_BLOCK_ROWS)
+        ]).astype(np.int32)
+        with self._lock:
+            self._ivf = (centroids, assignment)
+            self._save_ivf()
+
+    def _load_ivf(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self._ivf is None and os.path.exists(self._path(IVF_FILE)):
+            with np.load(self._path(IVF_FILE)) as data:
+                self._ivf = (data["centroids"], data["assignment"])
+        return self._ivf
+
+    def _save_ivf(self) -> None:
+        centroids, assignment = self._ivf
+        tmp_path = self._path(IVF_FILE + ".tmp.npz")
+        np.savez(tmp_path, centroids=centroids, assignment=assignment)
+        os.replace(tmp_path, self._path(IVF_FILE))
+
+    def _extend_ivf(self, vectors: np.ndarray) -> None:
+        """Assign newly added vectors to their nearest existing cluster."""
+        centroids, assignment = self._load_ivf()
+        new = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        self._ivf = (centroids, np.concatenate([assignment[:len(self)], new]))
+        self._save_ivf()
+
+    def _candidate_rows(self, query: np.ndarray, n_probe: int) -> Optional[np.ndarray]:
+        """Rows in the n_probe clusters closest to the query, or None to scan everything."""
+        ivf = self._load_ivf()
+        if ivf is None or len(self) < IVF_MIN_ROWS:
+            return None
+        centroids, assignment = ivf
+        lists = _top_k(centroids @ query, n_probe)
+        return np.flatnonzero(np.isin(assignment[:len(self)], lists))
+
+    def _search(
+        self,
+        query: np.ndarray,
+        k: int,
+        n_probe: int = 8,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[int, float]]:
+        vectors = self._vectors()
+        if not len(vectors):
+            return []
+        query = query.astype(np.float32)
+        norm = np.linalg.norm(query)
+        query = query / norm if norm else query
+
+        rows = self._candidate_rows(query, n_probe)
+        if filter:
+            chunks = self._chunk_records()
+            matching = np.array([
+                i for i, chunk in enumerate(chunks)
+                if all(chunk["metadata"].get(key) == value for key, value in filter.items())
+            ], dtype=np.int64)
+            rows = matching if rows is None else np.intersect1d(rows, matching)
+
+        if rows is not None:
+            if not len(rows):
+                return []
+            scores = vectors[rows] @ query
+            best = _top_k(scores, k)
+            return [(int(rows[i]), float(scores[i])) for i in best]
+
+        # Exhaustive scan in blocks, merging each block's top k
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            scores = vectors[start:start + SEARCH_BLOCK_ROWS] @ query
+            top = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+        order = _top_k(best_scores, k)
+        return [(int(best_rows[i]), float(best_scores[i])) for i in order]
+
+    def _documents(self, hits: List[Tuple[int, float]]) -> List[Tuple[Document, float]]:
+        chunks = self._chunk_records()
+        return [
+            (Document(page_content=chunks[row]["text"], metadata=chunks[row]["metadata"], id=chunks[row]["id"]), score)
+            for row, score in hits
+        ]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        n_probe: int = 8,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Find the k chunks most similar to a query.
+
+        Args:
+            query: Query text
+            k: Number of results
+            filter: Only consider chunks whose metadata has these values
+            n_probe: Clusters searched when the store has an IVF index
+        """
+        vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        return self._documents(self._search(vector, k, n_probe, filter))
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        hits = self._search(vector, k, kwargs.get("n_probe", 8), kwargs.get("filter"))
+        return [doc for doc, _ in self._documents(hits)]
+
+    def _select_relevance_score_fn(self):
+        # Map cosine similarity to [0, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        directory: str = "rag_store",
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        store = cls(directory, embedding)
+        store.add_texts(texts, metadatas, ids=kwargs.get("ids"))
+        return store
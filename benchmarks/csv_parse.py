@@ -0,0 +1,100 @@
+"""CSV parsing benchmark: Arrow and pandas readers on plain and compressed exports.
+
+Repeats the bundled sample export (191 columns, most of them empty) to the
+requested size, writes it plain and gzip/zstd/bzip2 compressed, and times:
+
+- ``pd.read_csv`` of every column (the loading path before core.reader)
+- ``read_ga4_csv`` with the pandas engine
+- ``read_ga4_csv`` with the pyarrow engine
+
+Exits 1 if the engines return different frames or the pyarrow engine is
+slower than ``--min-speedup`` times the baseline. Run from the repository root:
+
+    python benchmarks/csv_parse.py --rows 500000 --compression plain,gz,zst
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Variant -> Arrow codec used to write it
+CODECS: Dict[str, Optional[str]] = {"plain": None, "gz": "gzip", "zst": "zstd", "bz2": "bz2"}
+
+def best_of(runs: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def write_variants(data: str, rows: int, directory: str, variants: List[str]) -> Dict[str, str]:
+    """Write the sample repeated to ``rows`` rows in each requested compression."""
+    import pandas as pd
+    import pyarrow as pa
+
+    sample = pd.read_csv(data)
+    repeats = -(-rows // len(sample))
+    raw = pd.concat([sample] * repeats, ignore_index=True).head(rows).to_csv(index=False).encode()
+
+    paths = {}
+    for variant in variants:
+        if variant not in CODECS:
+            raise ValueError(f"Unknown compression: {variant}")
+        suffix = "" if variant == "plain" else f".{variant}"
+        paths[variant] = os.path.join(directory, f"export.csv{suffix}")
+        with pa.output_stream(paths[variant], compression=CODECS[variant]) as f:
+            f.write(raw)
+    return paths
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=os.path.join(ROOT, "data", "sample.csv"))
+    parser.add_argument("--rows", type=int, default=200000, help="rows of the synthetic export")
+    parser.add_argument("--compression", default="plain,gz,zst,bz2",
+                        help="comma-separated variants: plain, gz, zst, bz2")
+    parser.add_argument("--runs", type=int, default=3, help="best-of runs per reader")
+    parser.add_argument("--min-speedup", type=float, default=0.0,
+                        help="fail if pyarrow is less than this many times faster than the baseline")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from core.reader import read_ga4_csv
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_variants(args.data, args.rows, directory, args.compression.split(","))
+        print(f"{args.rows:,} rows, {os.cpu_count()} CPUs, best of {args.runs}")
+        print(f"{'input':<8} {'MB':>7} {'pd.read_csv':>12} {'pandas':>8} {'pyarrow':>8} {'speedup':>8}")
+        for codec, path in paths.items():
+            baseline = best_of(args.runs, lambda: pd.read_csv(path))
+            projected = best_of(args.runs, lambda: read_ga4_csv(path, engine="pandas"))
+            arrow = best_of(args.runs, lambda: read_ga4_csv(path, engine="pyarrow"))
+            speedup = baseline / arrow
+            print(
+                f"{codec:<8} {os.path.getsize(path) / 2**20:>7.2f} {baseline:>11.2f}s "
+                f"{projected:>7.2f}s {arrow:>7.2f}s {speedup:>7.1f}x"
+            )
+
+            expected = read_ga4_csv(path, engine="pandas")
+            try:
+                # Arrow rounds decimal strings correctly; pandas' fast parser may be 1 ulp off
+                pd.testing.assert_frame_equal(read_ga4_csv(path, engine="pyarrow"), expected, rtol=1e-12)
+            except AssertionError as e:
+                print(f"FAIL: {codec}: engines disagree: {str(e).splitlines()[0]}")
+                failed = True
+            if args.min_speedup and speedup < args.min_speedup:
+                print(f"FAIL: {codec}: {speedup:.1f}x is below {args.min_speedup:.1f}x")
+                failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
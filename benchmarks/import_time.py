@@ -0,0 +1,97 @@
+"""Import-time benchmark for the analyzer's cold start.
+
+Runs ``python -X importtime`` in a fresh interpreter, reports the slowest
+imports and fails (exit code 1) if provider SDKs are imported eagerly or
+the total exceeds the budget. Run from the repository root:
+
+    python benchmarks/import_time.py --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a provider or the agent is used
+LAZY_MODULES = [
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_experimental",
+]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(module: str) -> Tuple[Dict[str, Tuple[int, int, int]], int]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Tuple of {module: (self_us, cumulative_us, depth)} and the total
+        cumulative microseconds of top-level imports
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings: Dict[str, Tuple[int, int, int]] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us = int(match.group(1)), int(match.group(2))
+        depth = len(match.group(3)) // 2
+        timings[match.group(4)] = (self_us, cumulative_us, depth)
+        if depth == 0:
+            total += cumulative_us
+    return timings, total
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="core.analyzer", help="module to import")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if the total import time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="best-of runs")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(max(args.runs, 1))]
+    timings, total = min(runs, key=lambda run: run[1])
+
+    print(f"Import of {args.module}: {total / 1000:.1f} ms (best of {len(runs)})")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    top_level = sorted(
+        ((name, t) for name, t in timings.items() if t[2] <= 1),
+        key=lambda item: item[1][1],
+        reverse=True
+    )
+    for name, (self_us, cumulative_us, _) in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in timings]
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total / 1000 > args.budget_ms:
+        print(f"FAIL: {total / 1000:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""End-to-end benchmark of the analyze/ask pipeline with an offline LLM.
+
+Runs DataAnalyzer on the bundled sample export against the fake provider
+(synthetic latency and token rate) or replayed recordings of a real
+model, so no API keys or network are needed. Reports per-operation
+latency and throughput and exits 1 if the p95 budget is exceeded. Run
+from the repository root:
+
+    python benchmarks/pipeline.py --profile fast --questions 40 --concurrency 8
+
+To benchmark against real model behaviour, record once with API keys,
+then replay anywhere:
+
+    ORIXA_REPLAY_MODE=record python benchmarks/pipeline.py --provider replay
+    ORIXA_REPLAY_MODE=replay python benchmarks/pipeline.py --provider replay
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUESTIONS = [
+    "What are the top pages?",
+    "How many events of each type are there?",
+    "Which traffic sources bring the most users?",
+    "Why do mobile users view fewer pages than desktop users?",
+    "Which countries have the highest engagement per session?",
+    "What should we change on the landing page to keep visitors longer?",
+]
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def report(name: str, latencies: List[float], elapsed: float) -> None:
+    print(
+        f"{name:<16} {len(latencies):>4} runs  {len(latencies) / elapsed:>7.2f} /s  "
+        f"p50 {percentile(latencies, 50):.3f}s  p95 {percentile(latencies, 95):.3f}s  "
+        f"max {max(latencies):.3f}s"
+    )
+
+async def ask_async(analyzer, questions: List[str], concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ask(question: str) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await analyzer.aask(question)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(ask(question) for question in questions))
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--provider", choices=["fake", "replay"], default="fake")
+    parser.add_argument("--profile", default="fast", help="fake LLM profile (instant, fast, typical, slow)")
+    parser.add_argument("--questions", type=int, default=24, help="ask() calls in the concurrent phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--data", default=os.path.join(ROOT, "data", "sample.csv"))
+    parser.add_argument("--budget-p95", type=float, default=0.0, help="fail if ask() p95 exceeds this (s)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run the questions with aask() on one event loop instead of threads")
+    parser.add_argument("--verbose", action="store_true", help="show agent output")
+    args = parser.parse_args(argv)
+
+    if args.provider == "fake":
+        os.environ["ORIXA_FAKE_PROFILE"] = args.profile
+    elif not os.getenv("ORIXA_REPLAY_MODE"):
+        os.environ["ORIXA_REPLAY_MODE"] = "replay"
+    # Measure cold analyses rather than background prefetches
+    os.environ["ORIXA_PREFETCH"] = "false"
+
+    import pandas as pd
+    from core.analyzer import DataAnalyzer
+    from core.callbacks import METRICS_REGISTRY
+    from core.prompts import ANALYSIS_TYPES
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    df = pd.read_csv(args.data)
+    analyzer = DataAnalyzer(args.provider)
+    results: Dict[str, List[float]] = {}
+
+    with quiet:
+        results["load_data"] = [timed(lambda: analyzer.load_data(df))]
+        results["analyze"] = [timed(lambda t=t: analyzer.analyze(t)) for t in ANALYSIS_TYPES]
+        # A second analyzer, so the batch doesn't reuse the results above
+        batch_analyzer = DataAnalyzer(args.provider)
+        batch_analyzer.load_data(df)
+        results["analyze_batch"] = [timed(batch_analyzer.analyze_batch)]
+
+        questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.questions)]
+        start = time.perf_counter()
+        if args.use_async:
+            results["ask"] = asyncio.run(ask_async(analyzer, questions, args.concurrency))
+        else:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                results["ask"] = list(executor.map(lambda q: timed(lambda: analyzer.ask(q)), questions))
+        ask_elapsed = time.perf_counter() - start
+
+    mode = "async" if args.use_async else "threads"
+    print(f"provider {args.provider}" + (f" ({args.profile})" if args.provider == "fake" else "") + f", {mode}")
+    for name, latencies in results.items():
+        elapsed = ask_elapsed if name == "ask" else sum(latencies)
+        report(name, latencies, elapsed)
+
+    calls = sum(series["value"] for series in METRICS_REGISTRY.snapshot().get("orixa_llm_calls_total", []))
+    print(f"LLM calls: {calls:.0f}")
+
+    p95 = percentile(results["ask"], 95)
+    if args.budget_p95 and p95 > args.budget_p95:
+        print(f"FAIL: ask() p95 {p95:.3f}s exceeds budget {args.budget_p95:.3f}s")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
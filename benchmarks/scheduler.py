@@ -0,0 +1,72 @@
+"""Offline throughput and tail-latency benchmark for the request scheduler.
+
+Drives core.scheduler.RequestScheduler with local mock models, so no API
+keys or network are needed. Run from the repository root:
+
+    python benchmarks/scheduler.py --requests 200 --concurrency 16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.mock_llm import MockChatModel  # noqa: E402
+from core.scheduler import ProviderLimits, RequestScheduler  # noqa: E402
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def run_scenario(name: str, args, rate_limit_rate: float, hedge: bool) -> None:
+    scheduler = RequestScheduler(base_delay=0.05, max_delay=1.0, hedge_min_samples=20)
+    scheduler.configure("primary", ProviderLimits(requests_per_minute=args.rpm))
+    scheduler.configure("secondary", ProviderLimits(requests_per_minute=args.rpm))
+    primary = MockChatModel(
+        latency_seconds=args.latency, slow_rate=args.slow_rate,
+        rate_limit_rate=rate_limit_rate, seed=1
+    )
+    secondary = MockChatModel(latency_seconds=args.latency, slow_rate=args.slow_rate, seed=2)
+
+    def request(i: int) -> float:
+        start = time.perf_counter()
+        scheduler.call(
+            "primary",
+            lambda: primary.invoke(f"request {i}").content,
+            estimated_tokens=10,
+            hedge=("secondary", lambda: secondary.invoke(f"request {i}").content) if hedge else None
+        )
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<22} {args.requests / elapsed:>8.1f} req/s  "
+        f"p50 {percentile(latencies, 50):.3f}s  p95 {percentile(latencies, 95):.3f}s  "
+        f"p99 {percentile(latencies, 99):.3f}s  retries {scheduler.stats['retries']}  "
+        f"hedged {scheduler.stats['hedged']} (won {scheduler.stats['hedge_wins']})"
+    )
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.1, help="median mock latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of 10x slow calls")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.1, help="share of mock 429s")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute limit (0 = none)")
+    args = parser.parse_args(argv)
+
+    run_scenario("baseline", args, rate_limit_rate=0.0, hedge=False)
+    run_scenario("429s + retries", args, rate_limit_rate=args.rate_limit_rate, hedge=False)
+    run_scenario("429s + retries + hedge", args, rate_limit_rate=args.rate_limit_rate, hedge=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""Entry point for `python -m core`; see core/batch.py."""
+import sys
+from core.batch import main
+
+sys.exit(main())
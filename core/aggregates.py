@@ -0,0 +1,140 @@
+"""Precomputed GA4 aggregates shared by prompts, routing and reporting."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import pandas as pd
+
+# Breakdown name -> candidate source columns, in order of preference
+BREAKDOWN_COLUMNS: Dict[str, tuple] = {
+    "events": ("event_name",),
+    "pages": ("page_path", "param_page_location"),
+    "sources": ("source_medium", "traffic_source.source"),
+    "devices": ("device.category",),
+    "countries": ("geo.country",),
+}
+
+# Breakdowns taken from flattened event_params, which live on every row
+PARAM_BREAKDOWNS = {"pages"}
+
+@dataclass
+class GA4Aggregates:
+    """Breakdowns of a preprocessed GA4 dataset."""
+    total_events: int
+    unique_users: Optional[int]
+    date_start: Optional[str]
+    date_end: Optional[str]
+    breakdowns: Dict[str, pd.Series] = field(default_factory=dict)
+    daily_events: pd.Series = field(default_factory=lambda: pd.Series(dtype="int64"))
+    daily_users: pd.Series = field(default_factory=lambda: pd.Series(dtype="int64"))
+
+    def top(self, name: str, k: int) -> pd.Series:
+        """Get the top-k values of a breakdown (empty if unavailable)."""
+        series = self.breakdowns.get(name)
+        if series is None:
+            return pd.Series(dtype="int64")
+        return series.head(k)
+
+_CACHE: "OrderedDict[str, GA4Aggregates]" = OrderedDict()
+_CACHE_SIZE = 16
+_CACHE_LOCK = threading.Lock()
+# Per-version locks, so concurrent callers wait for one computation
+_COMPUTE_LOCKS: Dict[str, threading.Lock] = {}
+
+def _format_date(value) -> Optional[str]:
+    """Render a GA4 event_date (e.g. 20241019 or 20241019.0) as YYYY-MM-DD."""
+    if pd.isna(value):
+        return None
+    text = str(int(value)) if isinstance(value, float) else str(value)
+    if len(text) == 8 and text.isdigit():
+        return f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    return text
+
+def compute_aggregates(df: pd.DataFrame) -> GA4Aggregates:
+    """
+    Compute all breakdowns of a preprocessed GA4 DataFrame.
+
+    Each breakdown is a single vectorized ``value_counts`` over one column,
+    so the frame is scanned once per breakdown with no Python-level loops.
+
+    Args:
+        df: Preprocessed GA4 DataFrame
+
+    Returns:
+        GA4Aggregates with full (sorted) value counts for every breakdown
+    """
+    # Unnested exports only carry event fields on the first row of each event
+    if 'event_name' in df.columns:
+        events = df[df['event_name'].notna()]
+    else:
+        events = df
+
+    breakdowns: Dict[str, pd.Series] = {}
+    for name, candidates in BREAKDOWN_COLUMNS.items():
+        column = next((col for col in candidates if col in df.columns), None)
+        if column is None:
+            continue
+        values = df[column] if name in PARAM_BREAKDOWNS else events[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values[values != '']
+        counts = values.value_counts()
+        if not counts.empty:
+            breakdowns[name] = counts
+
+    daily_events = pd.Series(dtype="int64")
+    daily_users = pd.Series(dtype="int64")
+    date_start = date_end = None
+    if 'event_date' in events.columns:
+        dates = events['event_date'].dropna()
+        if not dates.empty:
+            daily_events = dates.value_counts().sort_index()
+            if 'user_pseudo_id' in events.columns:
+                daily_users = events.groupby('event_date')['user_pseudo_id'].nunique()
+                daily_users = daily_users.reindex(daily_events.index, fill_value=0)
+                daily_users.index = [_format_date(value) for value in daily_users.index]
+            daily_events.index = [_format_date(value) for value in daily_events.index]
+            date_start, date_end = daily_events.index[0], daily_events.index[-1]
+
+    unique_users = None
+    if 'user_pseudo_id' in df.columns:
+        unique_users = int(df['user_pseudo_id'].nunique())
+
+    return GA4Aggregates(
+        total_events=int(len(events)),
+        unique_users=unique_users,
+        date_start=date_start,
+        date_end=date_end,
+        breakdowns=breakdowns,
+        daily_events=daily_events,
+        daily_users=daily_users
+    )
+
+def get_aggregates(df: pd.DataFrame, dataset_version: str) -> GA4Aggregates:
+    """
+    Get aggregates for a dataset, computing them once per dataset version.
+
+    Args:
+        df: Preprocessed GA4 DataFrame
+        dataset_version: Fingerprint of the dataset (see GA4Preprocessor.dataset_version)
+
+    Returns:
+        Cached or freshly computed GA4Aggregates
+    """
+    with _CACHE_LOCK:
+        if dataset_version in _CACHE:
+            _CACHE.move_to_end(dataset_version)
+            return _CACHE[dataset_version]
+        compute_lock = _COMPUTE_LOCKS.setdefault(dataset_version, threading.Lock())
+
+    with compute_lock:
+        with _CACHE_LOCK:
+            if dataset_version in _CACHE:
+                return _CACHE[dataset_version]
+        aggregates = compute_aggregates(df)
+
+        with _CACHE_LOCK:
+            _CACHE[dataset_version] = aggregates
+            _COMPUTE_LOCKS.pop(dataset_version, None)
+            while len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return aggregates
@@ -1,21 +1,111 @@
 """Core data analysis functionality for Google Analytics data."""
+import asyncio
+import copy
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 import pandas as pd
-from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
-from langchain.agents.agent_types import AgentType
 from .preprocessor import GA4Preprocessor
 from .models import AVAILABLE_MODELS, get_default_model, get_available_models
 from .config import Config
+from .digest import build_digest, estimate_tokens
+from .aggregates import get_aggregates
+from .facts import get_fact_index
+from .quality import get_quality_report
+from .router import IntentRouter
+from .prompts import ANALYSIS_TYPES, ANALYSIS_PROMPTS, ASK_PROMPT, FACT_CARDS_PROMPT, INSUFFICIENT_FACTS
+from .scheduler import get_scheduler, is_retryable
+from .context import AgentContext
+from .memory import ConversationMemory
+
+@dataclass
+class LoadedData:
+    """A validated, preprocessed GA4 export, independent of any model."""
+    raw_df: pd.DataFrame
+    df: pd.DataFrame
+    agent_df: pd.DataFrame
+    context: AgentContext
+    dataset_version: str
+    dataset_path: Optional[str] = None
+
+@dataclass
+class ModelComparison:
+    """Result of running one prompt against a single model."""
+    model_name: str
+    display_name: str
+    output: Optional[str]
+    latency_seconds: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        """Total tokens used by the model for this prompt."""
+        return self.prompt_tokens + self.completion_tokens
+
+# Agent failures the columns hidden from the pruned frame can cause
+PRUNING_ERROR_NAMES = ("ToolException", "OutputParserException")
+PRUNING_ERROR_MESSAGES = ("not in index", "column", "keyerror")
+
+def is_pruning_error(error: Exception) -> bool:
+    """
+    Check if an agent failure may come from the pruned frame rather than the provider.
+    
+    Rate limits, timeouts and other provider errors are never retried on
+    the full frame; the scheduler retries those with backoff.
+    """
+    if is_retryable(error):
+        return False
+    if isinstance(error, KeyError) or type(error).__name__ in PRUNING_ERROR_NAMES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in PRUNING_ERROR_MESSAGES)
+
+_PREFETCH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_PREFETCH_LOCK = threading.Lock()
+
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor for speculative work, bounded across sessions."""
+    global _PREFETCH_EXECUTOR
+    with _PREFETCH_LOCK:
+        if _PREFETCH_EXECUTOR is None:
+            _PREFETCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=Config.get_int("ORIXA_PREFETCH_WORKERS", 4),
+                thread_name_prefix="prefetch"
+            )
+        return _PREFETCH_EXECUTOR
 
 class DataAnalyzer:
     """Handles Google Analytics data analysis with LLM integration."""
     
+    # Loaded-data state shared with analyzers for other models
+    DATA_ATTRIBUTES = (
+        "raw_df", "df", "agent_df", "context", "dataset_version", "dataset_path"
+    )
+    
     def __init__(self, model_name: Optional[str] = None):
         """Initialize the analyzer with specified LLM model."""
         self.df: Optional[pd.DataFrame] = None
         self.raw_df: Optional[pd.DataFrame] = None
+        self.agent_df: Optional[pd.DataFrame] = None
+        self.context: Optional[AgentContext] = None
+        self.dataset_version: Optional[str] = None
+        self.dataset_path: Optional[str] = None
         self.agent = None
+        self._full_agent = None
+        self.router = IntentRouter()
+        self._model_analyzers: Dict[str, "DataAnalyzer"] = {}
+        self.memory = ConversationMemory(
+            max_turns=Config.get_int("ORIXA_MEMORY_TURNS", 3),
+            token_budget=Config.get_int("ORIXA_MEMORY_TOKEN_BUDGET", 600)
+        )
+        # Analysis results and in-flight runs by (dataset version, model, type)
+        self._jobs: Dict[Tuple[str, str, str], Future] = {}
+        self._jobs_lock = threading.Lock()
         
         # Get available models
         available_models = get_available_models()
@@ -59,171 +149,960 @@ class DataAnalyzer:
             )
         
         try:
-            self.current_model_name = model_name
-            self.model_config = model_config
-            self.llm = self.model_config.create_instance()
+            switched = copy.copy(self)
+            switched.current_model_name = model_name
+            switched.model_config = model_config
+            switched.llm = model_config.create_instance()
             
             # Recreate agent if data is loaded
+            switched._full_agent = None
             if self.df is not None:
-                if self.model_config.supports_functions:
-                    self.agent = create_pandas_dataframe_agent(
-                        self.llm,
-                        self.df,
-                        verbose=True,
-                        agent_type=AgentType.OPENAI_FUNCTIONS,
-                        allow_dangerous_code=True
-                    )
-                else:
-                    # For models that don't support function calling (like Claude),
-                    # we'll use direct prompting
-                    self.agent = self.llm
+                switched.agent = switched._build_agent()
         except Exception as e:
             raise ValueError(f"Error switching to {model_config.display_name}: {str(e)}")
+        
+        # Swapped together, so jobs claimed meanwhile see one model or the other
+        with self._jobs_lock:
+            for attribute in ("current_model_name", "model_config", "llm", "agent", "_full_agent"):
+                setattr(self, attribute, getattr(switched, attribute))
     
-    def validate_ga4_data(self, df: pd.DataFrame) -> bool:
+    @staticmethod
+    def validate_ga4_data(df: pd.DataFrame) -> bool:
         """Validate that the DataFrame contains minimum required GA4 fields."""
-        required_fields = [
-            'event_date',
-            'event_name',
-            'event_timestamp'
-        ]
-        
-        return all(field in df.columns for field in required_fields)
+        return all(field in df.columns for field in GA4Preprocessor.REQUIRED_COLUMNS)
     
-    def load_data(self, df: pd.DataFrame) -> None:
-        """Load and preprocess GA4 data."""
-        if not self.validate_ga4_data(df):
+    @staticmethod
+    def prepare_data(df: pd.DataFrame, preprocessed: Optional[pd.DataFrame] = None) -> LoadedData:
+        """
+        Validate and preprocess GA4 data without building a model.
+        
+        Args:
+            df: Raw GA4 export
+            preprocessed: The export already run through GA4Preprocessor
+                (e.g. in a worker process); skips preprocessing
+            
+        Returns:
+            LoadedData that any number of analyzers can attach to
+        """
+        if not DataAnalyzer.validate_ga4_data(df):
             raise ValueError(
                 "Invalid GA4 data format. Please ensure your export includes: "
                 "event_date, event_name, and event_timestamp"
             )
         
         try:
-            self.raw_df = df
-            self.df = GA4Preprocessor.preprocess_ga4_data(df)
-            
-            if self.model_config.supports_functions:
-                self.agent = create_pandas_dataframe_agent(
-                    self.llm,
-                    self.df,
-                    verbose=True,
-                    agent_type=AgentType.OPENAI_FUNCTIONS,
-                    allow_dangerous_code=True
+            version = GA4Preprocessor.dataset_version(df)
+            if preprocessed is None:
+                preprocessed = GA4Preprocessor.preprocess_ga4_data(df)
+            
+            # The agent only sees informative columns; the full frame is the fallback
+            context = AgentContext.from_dataframe(preprocessed)
+            agent_df = preprocessed[context.columns]
+            
+            dataset_path = None
+            if Config.get_str("ORIXA_EXECUTION_BACKEND", "inprocess") == "sandbox":
+                from .sandbox import publish_dataset
+                dataset_path = publish_dataset(agent_df, f"{version}-agent")
+        except Exception as e:
+            raise ValueError(f"Error processing data: {str(e)}")
+        
+        return LoadedData(
+            raw_df=df,
+            df=preprocessed,
+            agent_df=agent_df,
+            context=context,
+            dataset_version=version,
+            dataset_path=dataset_path
+        )
+    
+    def attach_data(self, data: LoadedData, prefetch: Optional[bool] = None) -> None:
+        """
+        Use prepared data with this analyzer's model.
+        
+        Args:
+            data: Result of prepare_data
+            prefetch: Start the background aggregates and overview analysis
+                (defaults to ORIXA_PREFETCH)
+        """
+        if data.dataset_version != self.dataset_version:
+            # Follow-up questions and analyses only make sense about the same data
+            self.memory.clear()
+            self._clear_jobs()
+        for attribute in self.DATA_ATTRIBUTES:
+            setattr(self, attribute, getattr(data, attribute))
+        
+        try:
+            self._model_analyzers = {}
+            self._full_agent = None
+            self.agent = self._build_agent()
+        except Exception as e:
+            raise ValueError(f"Error processing data: {str(e)}")
+        
+        if prefetch is None:
+            prefetch = Config.get_bool("ORIXA_PREFETCH", True)
+        if prefetch:
+            self._prefetch()
+    
+    def load_data(
+        self,
+        df: pd.DataFrame,
+        preprocessed: Optional[pd.DataFrame] = None,
+        prefetch: Optional[bool] = None
+    ) -> None:
+        """
+        Load and preprocess GA4 data.
+        
+        Args:
+            df: Raw GA4 export
+            preprocessed: The export already run through GA4Preprocessor
+                (e.g. in a worker process); skips preprocessing
+            prefetch: Start the background aggregates and overview analysis
+                (defaults to ORIXA_PREFETCH)
+        """
+        self.attach_data(self.prepare_data(df, preprocessed), prefetch)
+    
+    async def aload_data(
+        self,
+        df: pd.DataFrame,
+        preprocessed: Optional[pd.DataFrame] = None,
+        prefetch: Optional[bool] = None
+    ) -> None:
+        """Async version of load_data; preprocessing runs in the loop's executor."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.load_data, df, preprocessed, prefetch)
+    
+    def _prefetch(self) -> None:
+        """Start the aggregates, fact cards and the overview analysis in the background."""
+        get_prefetch_executor().submit(get_aggregates, self.df, self.dataset_version)
+        if Config.get_bool("ORIXA_FACT_CARDS", True):
+            get_prefetch_executor().submit(self._fact_index)
+        self._analysis_job("overview", background=True)
+    
+    def _clear_jobs(self) -> None:
+        """Forget stored analyses, cancelling those that have not started."""
+        with self._jobs_lock:
+            for future in self._jobs.values():
+                future.cancel()
+            self._jobs = {}
+    
+    @staticmethod
+    def _is_reusable(future: Future) -> bool:
+        """Check if a job finished successfully or is still running."""
+        if future.cancelled():
+            return False
+        return not future.done() or future.exception() is None
+    
+    def _analysis_job(self, analysis_type: str, background: bool = False) -> Future:
+        """
+        Get the job for an analysis, starting it unless one already exists.
+        
+        Repeated requests for the same data, model and analysis type attach
+        to the finished or in-flight job instead of calling the LLM again;
+        failed jobs are retried.
+        
+        Args:
+            analysis_type: Type of analysis to run
+            background: Run on the prefetch executor instead of this thread
+            
+        Returns:
+            Future resolving to the analysis text
+        """
+        future, runner = self._claim_job(analysis_type)
+        if runner is None:
+            return future
+        
+        operation = "prefetch" if background else "analyze"
+        if background:
+            get_prefetch_executor().submit(runner._run_job, future, analysis_type, operation)
+        else:
+            runner._run_job(future, analysis_type, operation)
+        return future
+    
+    def _claim_job(self, analysis_type: str) -> Tuple[Future, Optional["DataAnalyzer"]]:
+        """
+        Get the reusable job for an analysis or register a new one.
+        
+        Returns:
+            Tuple of (future, runner). For a new job, runner is a snapshot of
+            this analyzer with the model, LLM and agent of the job's key; the
+            caller must run the job with it, so a model switched before the
+            job starts can't answer under the old model's key. None for
+            reused jobs.
+        """
+        with self._jobs_lock:
+            key = (self.dataset_version, self.current_model_name, analysis_type)
+            future = self._jobs.get(key)
+            if future is not None and self._is_reusable(future):
+                return future, None
+            future = Future()
+            self._jobs[key] = future
+            return future, copy.copy(self)
+    
+    async def _aanalysis_job(self, analysis_type: str) -> str:
+        """Async version of _analysis_job: attach to an existing job or run it on the event loop."""
+        future, runner = self._claim_job(analysis_type)
+        if runner is None:
+            return await asyncio.wrap_future(future)
+        
+        if not future.set_running_or_notify_cancel():
+            raise ValueError("Analysis cancelled because new data was loaded")
+        try:
+            # Profiling on first use is CPU work, so keep it off the loop
+            prompt = await asyncio.to_thread(runner._precomputed_prompt, analysis_type)
+            if prompt is not None:
+                result = await runner._acall_llm(prompt, "analyze")
+            else:
+                result = await runner._ainvoke(
+                    runner._analysis_prompt(analysis_type),
+                    "Here's the data summary to analyze:",
+                    operation="analyze"
                 )
+        except BaseException as e:
+            # Also on cancellation, so later requests retry instead of waiting forever
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+    
+    def _run_job(self, future: Future, analysis_type: str, operation: str) -> None:
+        """Run an analysis into its future."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            prompt = self._precomputed_prompt(analysis_type)
+            if prompt is not None:
+                future.set_result(self._call_llm(prompt, operation))
             else:
-                self.agent = self.llm
+                future.set_result(self._invoke(
+                    self._analysis_prompt(analysis_type),
+                    "Here's the data summary to analyze:",
+                    operation=operation
+                ))
         except Exception as e:
-            raise ValueError(f"Error processing data: {str(e)}")
+            future.set_exception(e)
+    
+    def _build_agent(self, full_frame: bool = False) -> Any:
+        """
+        Build the agent for the current model and loaded data.
+        
+        Args:
+            full_frame: Give the agent every column and df.head() instead of
+                the pruned frame and its schema digest
+        """
+        if self.model_config.supports_functions:
+            # Agent tooling is imported on first use to keep cold start fast
+            from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
+            from langchain.agents.agent_types import AgentType
+            from .sandbox import SandboxedPythonTool
+            from .tool_cache import CachedPythonTool
+            
+            if full_frame or self.context is None:
+                agent_df, scope, prompt_kwargs = self.df, "full", {}
+            else:
+                # Schema digest of the pruned columns replaces df.head() in the prompt
+                agent_df, scope = self.agent_df, "pruned"
+                prompt_kwargs = {
+                    "prefix": self.context.agent_prefix(),
+                    "suffix": "",
+                    "include_df_in_prompt": False
+                }
+            
+            agent = create_pandas_dataframe_agent(
+                self.llm,
+                # The agent's code may change df; with copy-on-write that stays in this copy
+                agent_df.copy(deep=False),
+                verbose=True,
+                agent_type=AgentType.OPENAI_FUNCTIONS,
+                allow_dangerous_code=True,
+                **prompt_kwargs
+            )
+            if self.dataset_path is not None:
+                dataset_path = self.dataset_path
+                if full_frame:
+                    from .sandbox import publish_dataset
+                    dataset_path = publish_dataset(self.df, self.dataset_version)
+                # Same tool name and schema, so the agent's prompt is unchanged
+                agent.tools = [SandboxedPythonTool(dataset_path=dataset_path)]
+            if Config.get_int("ORIXA_TOOL_CACHE_SIZE", 256) > 0:
+                agent.tools = [
+                    CachedPythonTool(tool=tool, dataset_version=self.dataset_version, scope=scope)
+                    for tool in agent.tools
+                ]
+            return agent
+        # For models that don't support function calling (like Claude),
+        # we'll use direct prompting
+        return self.llm
     
     def get_data_summary(self) -> str:
-        """Get a basic summary of the data for non-function models."""
+        """Get a token-budgeted statistical digest of the data for non-function models."""
         if self.df is None:
             return ""
-            
-        total_events = len(self.df)
-        date_range = f"{self.df['event_date'].min()} to {self.df['event_date'].max()}"
-        event_types = self.df['event_name'].value_counts().to_dict()
         
-        summary = (
-            f"Data Summary:\n"
-            f"- Total Events: {total_events}\n"
-            f"- Date Range: {date_range}\n"
-            f"- Event Types: {event_types}\n"
+        return build_digest(
+            self.df,
+            self.dataset_version,
+            top_k=Config.get_int("ORIXA_DIGEST_TOP_K", 10),
+            token_budget=Config.get_int("ORIXA_DIGEST_TOKEN_BUDGET", 1500)
+        )
+    
+    def _analysis_prompt(self, analysis_type: str) -> str:
+        """Build the prompt for a predefined analysis type."""
+        if analysis_type not in ANALYSIS_PROMPTS:
+            raise ValueError(
+                f"Unknown analysis type: {analysis_type}. "
+                f"Choose from: {', '.join(ANALYSIS_TYPES)}"
+            )
+        return ANALYSIS_PROMPTS[analysis_type]
+    
+    def _precomputed_prompt(self, analysis_type: str) -> Optional[str]:
+        """
+        Build a single-call prompt for analyses whose figures are computed locally.
+        
+        Returns:
+            The prompt with the figures, or None if the analysis needs the agent
+        """
+        if analysis_type != "missing_values" or self.raw_df is None:
+            return None
+        # Null rates and duplicates are exact and vectorized; no agent scan needed
+        report = get_quality_report(self.raw_df, self.dataset_version)
+        return (
+            f"{self._analysis_prompt(analysis_type)}\n"
+            "Use these precomputed figures for the full export:\n"
+            f"{report.summary()}"
         )
-        return summary
     
     def analyze(self, analysis_type: str) -> str:
         """Run predefined GA4 analysis types."""
         if not self.agent:
             raise ValueError("No data loaded. Please upload your GA4 data first.")
             
-        base_prompt = """
-            Analyze this Google Analytics 4 data and provide insights in the following format:
-
-            ### 📊 Overview
-            {One-sentence summary of data period and total events}
-
-            ### 🎯 Key Metrics
-            - Total Events: {number}
-            - Date Range: {date range}
-            - Unique Users: {number if available}
-
-            ### 📈 Event Analysis
-            {List top event types with percentages}
-
-            ### 🌐 Top Pages
-            {List most viewed pages with view counts}
-
-            ### 💡 Key Insights
-            - {Key insight 1}
-            - {Key insight 2}
-            - {Key insight 3}
-
-            ### 📱 Device & Location
-            {Brief device and location summary}
-
-            Keep the response concise and marketing-friendly.
-            Focus on actionable insights.
-        """
+        self._analysis_prompt(analysis_type)  # Unknown types fail fast
         
         try:
-            if self.model_config.supports_functions:
-                response = self.agent.invoke(base_prompt)
-                return response["output"]
-            else:
-                # For non-function models, provide data summary in prompt
-                enhanced_prompt = f"""
-                    {base_prompt}
-                    
-                    Here's the data summary to analyze:
-                    {self.get_data_summary()}
-                """
-                response = self.agent.invoke(enhanced_prompt)
-                return response.content
-                
+            # Returns the prefetched result or waits for the in-flight run
+            return self._analysis_job(analysis_type).result()
         except Exception as e:
             raise ValueError(f"Error during analysis: {str(e)}")
     
-    def ask(self, question: str) -> str:
-        """Ask a custom question about GA4 data."""
+    async def aanalyze(self, analysis_type: str) -> str:
+        """Async version of analyze, using the LLM's and agent's native async calls."""
         if not self.agent:
             raise ValueError("No data loaded. Please upload your GA4 data first.")
+        
+        self._analysis_prompt(analysis_type)  # Unknown types fail fast
+        
+        try:
+            return await self._aanalysis_job(analysis_type)
+        except Exception as e:
+            raise ValueError(f"Error during analysis: {str(e)}")
+    
+    def analyze_batch(
+        self,
+        analysis_types: Optional[List[str]] = None,
+        max_concurrency: Optional[int] = None
+    ) -> str:
+        """
+        Run several predefined analyses concurrently and combine them.
+        
+        Args:
+            analysis_types: Analysis types to run (defaults to all of them)
+            max_concurrency: Maximum analyses in flight at once
+                (defaults to ORIXA_MAX_CONCURRENCY)
             
-        base_prompt = f"""
-        Analyze the GA4 data to answer: "{question}"
+        Returns:
+            Markdown report with one section per analysis
+        """
+        if not self.agent:
+            raise ValueError("No data loaded. Please upload your GA4 data first.")
         
-        Format your response like this:
+        analysis_types = analysis_types or list(ANALYSIS_TYPES)
+        for analysis_type in analysis_types:
+            self._analysis_prompt(analysis_type)
+        if max_concurrency is None:
+            max_concurrency = Config.get_int("ORIXA_MAX_CONCURRENCY", 4)
         
-        ### 💡 Answer
-        {{Clear, concise answer}}
+        # Reuse prefetched or in-flight analyses; the rest run together as
+        # stored jobs, so later analyze() calls reuse them too
+        jobs = {analysis_type: self._claim_job(analysis_type) for analysis_type in analysis_types}
+        created = [(t, future, runner) for t, (future, runner) in jobs.items() if runner is not None]
+        if created:
+            self._run_jobs(created, "batch", config={"max_concurrency": max(max_concurrency, 1)})
         
-        ### 📊 Supporting Data
-        {{Key metrics and numbers}}
+        results: Dict[str, Any] = {}
+        for analysis_type, (future, _) in jobs.items():
+            try:
+                results[analysis_type] = future.result()
+            except Exception as e:
+                results[analysis_type] = e
+        return self.combine_report(results)
+    
+    async def aanalyze_batch(
+        self,
+        analysis_types: Optional[List[str]] = None,
+        max_concurrency: Optional[int] = None
+    ) -> str:
+        """
+        Async version of analyze_batch; analyses run as jobs on the event loop.
         
-        ### 🎯 Recommendation
-        {{Brief, actionable recommendation}}
+        Args:
+            analysis_types: Analysis types to run (defaults to all of them)
+            max_concurrency: Maximum analyses in flight at once
+                (defaults to ORIXA_MAX_CONCURRENCY)
+            
+        Returns:
+            Markdown report with one section per analysis
+        """
+        if not self.agent:
+            raise ValueError("No data loaded. Please upload your GA4 data first.")
+        
+        analysis_types = analysis_types or list(ANALYSIS_TYPES)
+        for analysis_type in analysis_types:
+            self._analysis_prompt(analysis_type)
+        if max_concurrency is None:
+            max_concurrency = Config.get_int("ORIXA_MAX_CONCURRENCY", 4)
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
         
-        Keep the response marketing-friendly and focused on business insights.
-        Be concise and clear.
+        async def run(analysis_type: str) -> str:
+            async with semaphore:
+                return await self._aanalysis_job(analysis_type)
+        
+        results = await asyncio.gather(
+            *(run(analysis_type) for analysis_type in analysis_types),
+            return_exceptions=True
+        )
+        return self.combine_report(dict(zip(analysis_types, results)))
+    
+    @staticmethod
+    def combine_report(results: Dict[str, Any]) -> str:
         """
+        Combine analysis results into one Markdown report.
         
-        try:
-            if self.model_config.supports_functions:
-                response = self.agent.invoke(base_prompt)
-                return response["output"]
+        Args:
+            results: Analysis type -> output text (or the exception it raised)
+            
+        Returns:
+            Markdown report
+        """
+        sections = []
+        for analysis_type, result in results.items():
+            title = ANALYSIS_TYPES.get(analysis_type, analysis_type)
+            if isinstance(result, Exception):
+                body = f"❌ Error during analysis: {str(result)}"
             else:
-                # For non-function models, provide data summary in prompt
-                enhanced_prompt = f"""
-                    {base_prompt}
-                    
-                    Here's the data summary to help answer the question:
-                    {self.get_data_summary()}
-                """
-                response = self.agent.invoke(enhanced_prompt)
-                return response.content
-                
+                body = result
+            sections.append(f"## {title}\n\n{body}")
+        return "\n\n---\n\n".join(sections)
+    
+    def _ask_prompt(
+        self,
+        question: str,
+        memory: Optional[ConversationMemory] = None,
+        include_columns: bool = True
+    ) -> str:
+        """Build the prompt for a custom question, with the conversation so far."""
+        memory = memory if memory is not None else self.memory
+        prompt = ASK_PROMPT.format(question=question)
+        history = memory.render()
+        if history:
+            prompt = (
+                f"{history}\n\nUse the conversation above to resolve references "
+                f"in the new question.\n{prompt}"
+            )
+        if include_columns and self.model_config.supports_functions and self.context is not None:
+            # Include the previous question so follow-ups keep its columns
+            columns = self.context.select_columns(f"{question} {memory.last_question}")
+            prompt += (
+                "\nMost relevant columns of `df` (name | dtype | distinct | null% | examples):\n"
+                + self.context.describe_columns(columns)
+            )
+        return prompt
+    
+    def ask(self, question: str, memory: Optional[ConversationMemory] = None) -> str:
+        """
+        Ask a custom question about GA4 data.
+        
+        Args:
+            question: The user's question
+            memory: Conversation to continue (defaults to this analyzer's own)
+            
+        Returns:
+            Markdown answer
+        """
+        if not self.agent:
+            raise ValueError("No data loaded. Please upload your GA4 data first.")
+        memory = memory if memory is not None else self.memory
+            
+        answer = None
+        try:
+            answer = self._fast_path_answer(question, memory)
+        except Exception as e:
+            print(f"Warning: Fast path failed, falling back to agent: {e}")
+        
+        if answer is None and Config.get_bool("ORIXA_FACT_CARDS", True):
+            try:
+                answer = self._fact_card_answer(question, memory)
+            except Exception as e:
+                print(f"Warning: Fact card answer failed, falling back to agent: {e}")
+        
+        if answer is None:
+            base_prompt = self._ask_prompt(question, memory)
+            try:
+                answer = self._invoke(
+                    base_prompt,
+                    "Here's the data summary to help answer the question:",
+                    operation="ask"
+                )
+            except Exception as e:
+                raise ValueError(f"Error processing question: {str(e)}")
+        
+        memory.add(question, answer)
+        return answer
+    
+    async def aask(self, question: str, memory: Optional[ConversationMemory] = None) -> str:
+        """Async version of ask, using the LLM's and agent's native async calls."""
+        if not self.agent:
+            raise ValueError("No data loaded. Please upload your GA4 data first.")
+        memory = memory if memory is not None else self.memory
+        
+        answer = None
+        try:
+            # Aggregates may need computing on first use, so keep them off the loop
+            answer = await asyncio.to_thread(self._fast_path_answer, question, memory)
         except Exception as e:
-            raise ValueError(f"Error processing question: {str(e)}")
+            print(f"Warning: Fast path failed, falling back to agent: {e}")
+        
+        if answer is None and Config.get_bool("ORIXA_FACT_CARDS", True):
+            try:
+                answer = await self._afact_card_answer(question, memory)
+            except Exception as e:
+                print(f"Warning: Fact card answer failed, falling back to agent: {e}")
+        
+        if answer is None:
+            base_prompt = self._ask_prompt(question, memory)
+            try:
+                answer = await self._ainvoke(
+                    base_prompt,
+                    "Here's the data summary to help answer the question:",
+                    operation="ask"
+                )
+            except Exception as e:
+                raise ValueError(f"Error processing question: {str(e)}")
+        
+        memory.add(question, answer)
+        return answer
+    
+    def _fast_path_answer(
+        self,
+        question: str,
+        memory: Optional[ConversationMemory] = None
+    ) -> Optional[str]:
+        """
+        Answer common questions directly from precomputed aggregates.
+        
+        Args:
+            question: The user's question
+            memory: Conversation included when the LLM phrases the answer
+            
+        Returns:
+            Markdown answer, or None if the question needs the agent
+        """
+        aggregates = get_aggregates(self.df, self.dataset_version)
+        intent = self.router.match(question, aggregates)
+        if intent is None:
+            return None
+        
+        top_k = Config.get_int("ORIXA_DIGEST_TOP_K", 10)
+        if not Config.get_bool("ORIXA_FASTPATH_PHRASING", False):
+            return self.router.answer(intent, aggregates, top_k)
+        
+        # Single LLM call to phrase the precomputed numbers, no agent loop
+        prompt = f"""
+        {self._ask_prompt(question, memory)}
+        
+        Answer using only these precomputed figures ({intent.title}):
+        {self.router.supporting_data(intent, aggregates, top_k)}
+        """
+        return get_scheduler().call(
+            self.model_config.provider,
+            lambda: self.llm.invoke(prompt).content,
+            estimated_tokens=estimate_tokens(prompt),
+            operation="llm:ask"
+        )
+    
+    def _fact_index(self) -> Any:
+        """Get the fact cards of the loaded data, building them on first use."""
+        return get_fact_index(
+            self.df,
+            self.dataset_version,
+            per_kind=Config.get_int("ORIXA_FACT_CARDS_PER_KIND", 50)
+        )
+    
+    def _fact_card_prompt(self, question: str, memory: Optional[ConversationMemory] = None) -> str:
+        """Build a single-call prompt from the fact cards most relevant to the question."""
+        # Include the previous question so follow-ups retrieve the same cards
+        query = f"{question} {(memory if memory is not None else self.memory).last_question}"
+        cards = self._fact_index().search(query, k=Config.get_int("ORIXA_FACT_CARDS_TOP_K", 8))
+        facts = "\n".join(f"- {card.text}" for card in cards)
+        return self._ask_prompt(question, memory, include_columns=False) + FACT_CARDS_PROMPT.format(facts=facts)
+    
+    def _fact_card_answer(
+        self,
+        question: str,
+        memory: Optional[ConversationMemory] = None
+    ) -> Optional[str]:
+        """
+        Answer a question in one LLM call from retrieved fact cards, with no agent loop.
+        
+        Args:
+            question: The user's question
+            memory: Conversation included in the prompt
+            
+        Returns:
+            Markdown answer, or None if the cards don't cover the question
+        """
+        answer = self._call_llm(self._fact_card_prompt(question, memory), "ask")
+        return None if INSUFFICIENT_FACTS in answer else answer
+    
+    async def _afact_card_answer(
+        self,
+        question: str,
+        memory: Optional[ConversationMemory] = None
+    ) -> Optional[str]:
+        """Async version of _fact_card_answer."""
+        # Building the cards on first use is CPU work, so keep it off the loop
+        prompt = await asyncio.to_thread(self._fact_card_prompt, question, memory)
+        answer = await self._acall_llm(prompt, "ask")
+        return None if INSUFFICIENT_FACTS in answer else answer
+    
+    def _call_llm(self, prompt: str, operation: str) -> str:
+        """Send a self-contained prompt straight to the LLM, through the scheduler."""
+        config = self._run_config(None, operation)
+        return get_scheduler().call(
+            self.model_config.provider,
+            lambda: self.llm.invoke(prompt, config=config).content,
+            estimated_tokens=estimate_tokens(prompt),
+            operation=f"llm:{operation}"
+        )
+    
+    async def _acall_llm(self, prompt: str, operation: str) -> str:
+        """Async version of _call_llm."""
+        config = self._run_config(None, operation)
+        
+        async def call() -> str:
+            response = await self.llm.ainvoke(prompt, config=config)
+            return response.content
+        
+        return await get_scheduler().acall(
+            self.model_config.provider,
+            call,
+            estimated_tokens=estimate_tokens(prompt),
+            operation=f"llm:{operation}"
+        )
+    
+    def _with_summary(self, base_prompt: str, summary_intro: str) -> str:
+        """Append the data summary to a prompt for non-function models."""
+        return f"""
+            {base_prompt}
+            
+            {summary_intro}
+            {self.get_data_summary()}
+        """
+    
+    def _run_prompt(
+        self,
+        base_prompt: str,
+        summary_intro: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Send a prompt to the agent (or directly to the LLM).
+        
+        Args:
+            base_prompt: Prompt describing the task and response format
+            summary_intro: Line introducing the data summary for non-function models
+            config: Optional LangChain runnable config (callbacks, tags, ...)
+            
+        Returns:
+            The model's text response
+        """
+        if self.model_config.supports_functions:
+            if self._needs_full_frame(base_prompt):
+                return self._get_full_agent().invoke(base_prompt, config=config)["output"]
+            try:
+                response = self.agent.invoke(base_prompt, config=config)
+            except Exception as e:
+                if self.context is None or not self.context.dropped or not is_pruning_error(e):
+                    raise
+                # Retry with every column in case the pruned view was the problem
+                print(f"Warning: Agent failed on pruned columns, retrying with full frame: {e}")
+                response = self._get_full_agent().invoke(base_prompt, config=config)
+            return response["output"]
+        
+        # For non-function models, provide data summary in prompt
+        response = self.agent.invoke(
+            self._with_summary(base_prompt, summary_intro), config=config
+        )
+        return response.content
+    
+    async def _arun_prompt(
+        self,
+        base_prompt: str,
+        summary_intro: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Async version of _run_prompt."""
+        if self.model_config.supports_functions:
+            if self._needs_full_frame(base_prompt):
+                response = await self._get_full_agent().ainvoke(base_prompt, config=config)
+                return response["output"]
+            try:
+                response = await self.agent.ainvoke(base_prompt, config=config)
+            except Exception as e:
+                if self.context is None or not self.context.dropped or not is_pruning_error(e):
+                    raise
+                print(f"Warning: Agent failed on pruned columns, retrying with full frame: {e}")
+                response = await self._get_full_agent().ainvoke(base_prompt, config=config)
+            return response["output"]
+        
+        # The digest is computed on first use, so build the prompt off the loop
+        prompt = await asyncio.to_thread(self._with_summary, base_prompt, summary_intro)
+        response = await self.agent.ainvoke(prompt, config=config)
+        return response.content
+    
+    def _needs_full_frame(self, prompt: str) -> bool:
+        """Check if a prompt mentions a column hidden from the pruned agent."""
+        if self.context is None:
+            return False
+        return any(column in prompt for column in self.context.dropped if len(column) > 3)
+    
+    def _get_full_agent(self) -> Any:
+        """Get the agent over the full frame, building it on first use."""
+        if self._full_agent is None:
+            self._full_agent = self._build_agent(full_frame=True)
+        return self._full_agent
+    
+    def _run_jobs(
+        self,
+        jobs: List[Tuple[str, Future, "DataAnalyzer"]],
+        operation: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Run several claimed analysis jobs at once using LangChain's batch support.
+        
+        Args:
+            jobs: (analysis type, future, runner) per job created by _claim_job
+            operation: Operation name recorded in the call metrics
+            config: Optional LangChain runnable config (e.g. max_concurrency)
+        """
+        from langchain_core.runnables import RunnableLambda
+        
+        runner = RunnableLambda(
+            lambda job: job[2]._run_job(job[1], job[0], operation)
+        )
+        runner.batch(jobs, config=config, return_exceptions=True)
+    
+    def _invoke(
+        self,
+        base_prompt: str,
+        summary_intro: str,
+        config: Optional[Dict[str, Any]] = None,
+        operation: str = "prompt"
+    ) -> str:
+        """
+        Run a prompt through the provider-aware scheduler.
+        
+        Applies the provider's rate limits, retries rate-limit and transient
+        errors with backoff, and hedges to a second model when configured.
+        
+        Args:
+            base_prompt: Prompt describing the task and response format
+            summary_intro: Line introducing the data summary for non-function models
+            config: Optional LangChain runnable config (callbacks, tags, ...)
+            operation: Label for the request in latency metrics
+            
+        Returns:
+            The model's text response
+        """
+        config = self._run_config(config, operation)
+        
+        hedge = None
+        hedge_analyzer = self._hedge_analyzer()
+        if hedge_analyzer is not None:
+            hedge = (
+                hedge_analyzer.model_config.provider,
+                lambda: hedge_analyzer._run_prompt(base_prompt, summary_intro, config)
+            )
+        
+        return get_scheduler().call(
+            self.model_config.provider,
+            lambda: self._run_prompt(base_prompt, summary_intro, config),
+            estimated_tokens=estimate_tokens(base_prompt),
+            hedge=hedge,
+            # Agent runs take several steps; hedge against their own p95
+            operation=f"agent:{operation}"
+        )
+    
+    async def _ainvoke(
+        self,
+        base_prompt: str,
+        summary_intro: str,
+        config: Optional[Dict[str, Any]] = None,
+        operation: str = "prompt"
+    ) -> str:
+        """Async version of _invoke: rate limits, retries and hedging on the event loop."""
+        config = self._run_config(config, operation)
+        
+        hedge = None
+        hedge_analyzer = self._hedge_analyzer()
+        if hedge_analyzer is not None:
+            hedge = (
+                hedge_analyzer.model_config.provider,
+                lambda: hedge_analyzer._arun_prompt(base_prompt, summary_intro, config)
+            )
+        
+        return await get_scheduler().acall(
+            self.model_config.provider,
+            lambda: self._arun_prompt(base_prompt, summary_intro, config),
+            estimated_tokens=estimate_tokens(base_prompt),
+            hedge=hedge,
+            # Agent runs take several steps; hedge against their own p95
+            operation=f"agent:{operation}"
+        )
+    
+    def _run_config(self, config: Optional[Dict[str, Any]], operation: str) -> Dict[str, Any]:
+        """Add request metrics to a LangChain runnable config."""
+        from .callbacks import RunMetricsHandler
+        
+        config = dict(config or {})
+        config["callbacks"] = list(config.get("callbacks") or []) + [
+            RunMetricsHandler(operation, self.current_model_name)
+        ]
+        return config
+    
+    def _hedge_analyzer(self) -> Optional["DataAnalyzer"]:
+        """Get the analyzer for hedged requests, if hedging is enabled."""
+        hedge_model = self._hedge_model_name()
+        return self.for_model(hedge_model) if hedge_model is not None else None
+    
+    def _hedge_model_name(self) -> Optional[str]:
+        """
+        Get the model used for hedged requests, if hedging is enabled.
+        
+        ORIXA_HEDGE_MODEL names a model, or "auto" picks the first other
+        available model.
+        """
+        setting = Config.get_str("ORIXA_HEDGE_MODEL", "")
+        available = [name for name in get_available_models() if name != self.current_model_name]
+        if setting == "auto":
+            # Never race a real provider against a fake or replayed one
+            available = [
+                name for name in available
+                if AVAILABLE_MODELS[name].is_offline == self.model_config.is_offline
+            ]
+            return available[0] if available else None
+        return setting if setting in available else None
+    
+    def for_model(self, model_name: str) -> "DataAnalyzer":
+        """Create an analyzer for another model that shares the loaded data."""
+        if model_name == self.current_model_name:
+            return self
+        
+        # Reuse analyzers from earlier comparisons on the same data
+        if model_name not in self._model_analyzers:
+            analyzer = DataAnalyzer(model_name)
+            for attribute in self.DATA_ATTRIBUTES:
+                setattr(analyzer, attribute, getattr(self, attribute))
+            if self.df is not None:
+                analyzer.agent = analyzer._build_agent()
+            self._model_analyzers[model_name] = analyzer
+        return self._model_analyzers[model_name]
+    
+    def for_request(self) -> "DataAnalyzer":
+        """
+        Create an analyzer for one request that shares this one's data, LLM and stored analyses.
+        
+        The agent is the request's own, so the variables and changes to df
+        of its code are not seen by concurrent requests, and sandboxed code
+        runs in its own session rather than queueing behind theirs.
+        """
+        analyzer = copy.copy(self)
+        analyzer._full_agent = None
+        analyzer._model_analyzers = {}
+        if self.df is not None:
+            analyzer.agent = analyzer._build_agent()
+        return analyzer
+    
+    def compare_models(
+        self,
+        question: Optional[str] = None,
+        analysis_type: str = "overview",
+        model_names: Optional[List[str]] = None
+    ) -> Dict[str, ModelComparison]:
+        """
+        Run the same analysis or question against several models concurrently.
+        
+        Every model runs in its own thread, so the total wait is roughly the
+        latency of the slowest model rather than the sum of all of them.
+        
+        Args:
+            question: Question to pass to ``ask``; runs ``analyze`` when omitted
+            analysis_type: Analysis type used when no question is given
+            model_names: Models to compare (defaults to all available models)
+            
+        Returns:
+            Dictionary of model names and their comparison results, in the
+            order the models were requested
+        """
+        if not self.agent:
+            raise ValueError("No data loaded. Please upload your GA4 data first.")
+        
+        if model_names is None:
+            model_names = list(get_available_models().keys())
+        if not model_names:
+            raise ValueError("No AI models available for comparison")
+        
+        from .callbacks import TokenUsageHandler
+        
+        def run(model_name: str) -> ModelComparison:
+            display_name = AVAILABLE_MODELS[model_name].display_name \
+                if model_name in AVAILABLE_MODELS else model_name
+            usage = TokenUsageHandler()
+            start = time.perf_counter()
+            try:
+                analyzer = self.for_model(model_name)
+                if question is not None:
+                    base_prompt = analyzer._ask_prompt(question)
+                    summary_intro = "Here's the data summary to help answer the question:"
+                else:
+                    base_prompt = analyzer._analysis_prompt(analysis_type)
+                    summary_intro = "Here's the data summary to analyze:"
+                output = analyzer._invoke(
+                    base_prompt, summary_intro, config={"callbacks": [usage]}, operation="compare"
+                )
+                error = None
+            except Exception as e:
+                output, error = None, str(e)
+            
+            return ModelComparison(
+                model_name=model_name,
+                display_name=display_name,
+                output=output,
+                latency_seconds=time.perf_counter() - start,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                error=error
+            )
+        
+        with ThreadPoolExecutor(max_workers=len(model_names)) as executor:
+            results = list(executor.map(run, model_names))
+        
+        return {result.model_name: result for result in results}
+    
+    @property
+    def execution_backend(self) -> str:
+        """Where agent code runs: "inprocess" (default) or "sandbox"."""
+        return Config.get_str("ORIXA_EXECUTION_BACKEND", "inprocess")
     
     @property
     def current_model(self) -> str:
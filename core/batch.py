@@ -0,0 +1,343 @@
+"""Batch report generation over a directory of GA4 exports.
+
+Usage (from the repository root):
+
+    python -m core exports/ --output reports/ --analyses overview,summary
+
+Exports are preprocessed in a process pool while earlier ones are being
+analyzed; LLM calls across all exports share one concurrency limit, and
+only a bounded number of exports is loaded at a time.
+Inputs whose content and model configuration match the manifest of a
+previous run are skipped.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from .config import Config
+from .models import AVAILABLE_MODELS, get_default_model
+from .preprocessor import GA4Preprocessor
+from .prompts import ANALYSIS_PROMPTS, ANALYSIS_TYPES
+from .reader import COMPRESSED_SUFFIXES, read_ga4_csv
+
+MANIFEST_NAME = "manifest.json"
+
+@dataclass
+class BatchStats:
+    """Counters for the end-of-run summary."""
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    preprocess_seconds: float = 0.0
+    analysis_seconds: float = 0.0
+    rows: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def config_hash(model_name: str, analysis_types: List[str]) -> str:
+    """Fingerprint of everything besides the data that shapes a report."""
+    model = AVAILABLE_MODELS[model_name]
+    payload = {
+        "model": [model.provider, model.model_id, model.temperature],
+        "prompts": {t: ANALYSIS_PROMPTS[t] for t in analysis_types},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def prepare_export(path: str) -> Tuple[pd.DataFrame, pd.DataFrame, float]:
+    """
+    Read and preprocess one export; runs in a worker process.
+
+    Returns:
+        Tuple of (raw frame, preprocessed frame, seconds spent)
+
+    Raises:
+        ValueError: If the file is not a GA4 export
+    """
+    start = time.perf_counter()
+    df = read_ga4_csv(path)
+    return df, GA4Preprocessor.preprocess_ga4_data(df), time.perf_counter() - start
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def write_atomic(path: str, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+class BatchRunner:
+    """Runs the selected analyses over many exports and writes their reports."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        model_name: str,
+        analysis_types: List[str],
+        formats: List[str],
+        workers: int,
+        concurrency: int,
+        force: bool = False,
+        max_exports: Optional[int] = None
+    ):
+        """
+        Args:
+            output_dir: Directory for reports and the manifest
+            model_name: Model used for every analysis
+            analysis_types: Analyses run per export
+            formats: Report formats ("md" and/or "json")
+            workers: Processes used for reading and preprocessing
+            concurrency: Maximum LLM requests in flight across all exports
+            force: Regenerate reports even if the manifest matches
+            max_exports: Exports loaded or being analyzed at once (default:
+                workers + concurrency, enough to keep both busy)
+        """
+        self.output_dir = output_dir
+        self.model_name = model_name
+        self.analysis_types = analysis_types
+        self.formats = formats
+        self.workers = workers
+        self.concurrency = concurrency
+        self.force = force
+        self.max_exports = max_exports or workers + concurrency
+        self.config_hash = config_hash(model_name, analysis_types)
+        self.manifest = load_manifest(output_dir)
+        self.stats = BatchStats()
+
+    def _is_current(self, name: str, content_hash: str) -> bool:
+        entry = self.manifest.get(name)
+        if self.force or not entry:
+            return False
+        return (
+            entry.get("content_hash") == content_hash
+            and entry.get("config_hash") == self.config_hash
+            and all(os.path.exists(os.path.join(self.output_dir, report)) for report in entry["reports"])
+        )
+
+    def _write_reports(self, name: str, content_hash: str, results: Dict[str, Any]) -> List[str]:
+        from .analyzer import DataAnalyzer
+
+        stem = name[:-len(os.path.splitext(name)[1])] if name.endswith(COMPRESSED_SUFFIXES) else name
+        stem = os.path.splitext(stem)[0]
+        reports = []
+        if "md" in self.formats:
+            reports.append(f"{stem}.md")
+            write_atomic(
+                os.path.join(self.output_dir, reports[-1]),
+                f"# {name}\n\n" + DataAnalyzer.combine_report(results)
+            )
+        if "json" in self.formats:
+            reports.append(f"{stem}.json")
+            analyses = {
+                analysis_type: {"error": str(result)} if isinstance(result, Exception) else result
+                for analysis_type, result in results.items()
+            }
+            write_atomic(os.path.join(self.output_dir, reports[-1]), json.dumps({
+                "input": name,
+                "content_hash": content_hash,
+                "model": self.model_name,
+                "model_id": AVAILABLE_MODELS[self.model_name].model_id,
+                "generated_at": time.time(),
+                "analyses": analyses,
+            }, indent=2))
+        return reports
+
+    async def _run_one(
+        self,
+        path: str,
+        content_hash: str,
+        pool: ProcessPoolExecutor,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        from .analyzer import DataAnalyzer
+
+        name = os.path.basename(path)
+        loop = asyncio.get_running_loop()
+        try:
+            raw_df, df, seconds = await loop.run_in_executor(pool, prepare_export, path)
+            self.stats.preprocess_seconds += seconds
+            self.stats.rows += len(raw_df)
+
+            analyzer = DataAnalyzer(self.model_name)
+            # Analyses run explicitly under the concurrency limit, not as prefetches
+            await analyzer.aload_data(raw_df, preprocessed=df, prefetch=False)
+
+            async def run(analysis_type: str) -> str:
+                async with semaphore:
+                    return await analyzer.aanalyze(analysis_type)
+
+            start = time.perf_counter()
+            outputs = await asyncio.gather(
+                *(run(analysis_type) for analysis_type in self.analysis_types),
+                return_exceptions=True
+            )
+            self.stats.analysis_seconds += time.perf_counter() - start
+            results = dict(zip(self.analysis_types, outputs))
+            reports = self._write_reports(name, content_hash, results)
+        except Exception as e:
+            self.stats.failed += 1
+            self.stats.errors[name] = str(e)
+            print(f"✗ {name}: {e}")
+            return
+
+        failures = [t for t, result in results.items() if isinstance(result, Exception)]
+        if failures:
+            # Keep the partial report but retry the export on the next run
+            self.stats.failed += 1
+            self.stats.errors[name] = f"failed analyses: {', '.join(failures)}"
+            print(f"✗ {name}: failed analyses: {', '.join(failures)}")
+            return
+
+        self.manifest[name] = {
+            "content_hash": content_hash,
+            "config_hash": self.config_hash,
+            "reports": reports,
+            "completed_at": time.time(),
+        }
+        write_atomic(
+            os.path.join(self.output_dir, MANIFEST_NAME),
+            json.dumps(self.manifest, indent=2, sort_keys=True)
+        )
+        self.stats.processed += 1
+        print(f"✓ {name} → {', '.join(reports)}")
+
+    async def run(self, paths: List[str]) -> BatchStats:
+        """Generate reports for every export that changed since the last run."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        pending = []
+        for path in paths:
+            content_hash = file_hash(path)
+            if self._is_current(os.path.basename(path), content_hash):
+                self.stats.skipped += 1
+                print(f"- {os.path.basename(path)} (unchanged)")
+            else:
+                pending.append((path, content_hash))
+        if not pending:
+            return self.stats
+
+        semaphore = asyncio.Semaphore(max(self.concurrency, 1))
+        # Each export holds its raw and preprocessed frames until its reports
+        # are written, so bound the exports in flight to bound memory
+        exports = asyncio.Semaphore(max(self.max_exports, 1))
+
+        async def run_one(path: str, content_hash: str) -> None:
+            async with exports:
+                await self._run_one(path, content_hash, pool, semaphore)
+
+        # Spawned workers don't inherit this process's threads and locks
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            await asyncio.gather(*(run_one(path, content_hash) for path, content_hash in pending))
+        return self.stats
+
+def llm_totals() -> Tuple[float, float, float]:
+    """Total LLM calls, tokens and estimated cost recorded in this process."""
+    from .callbacks import METRICS_REGISTRY
+
+    snapshot = METRICS_REGISTRY.snapshot()
+    calls = sum(series["value"] for series in snapshot.get("orixa_llm_calls_total", []))
+    cost = sum(series["value"] for series in snapshot.get("orixa_llm_cost_usd_total", []))
+    tokens = sum(
+        series["sum"]
+        for name in ("orixa_llm_prompt_tokens", "orixa_llm_completion_tokens")
+        for series in snapshot.get(name, [])
+    )
+    return calls, tokens, cost
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Generate GA4 analysis reports for a directory of exports."
+    )
+    parser.add_argument("input_dir", help="directory of GA4 CSV exports")
+    parser.add_argument("-o", "--output", default="reports", help="report directory (default: reports)")
+    parser.add_argument("--pattern", default=".csv,.csv.gz,.csv.zst,.csv.bz2",
+                        help="comma-separated file name suffixes to include (default: plain and compressed CSV)")
+    parser.add_argument("--analyses", default="overview",
+                        help=f"comma-separated analyses: {', '.join(ANALYSIS_TYPES)} (default: overview)")
+    parser.add_argument("--model", help="model name (default: first available)")
+    parser.add_argument("--format", default="md,json", help="comma-separated report formats: md, json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="preprocessing processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int,
+                        default=Config.get_int("ORIXA_MAX_CONCURRENCY", 4),
+                        help="LLM requests in flight across all exports")
+    parser.add_argument("--max-exports", type=int,
+                        help="exports loaded at once (default: workers + concurrency)")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and regenerate everything")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    Config.setup_environment()
+
+    analysis_types = [t.strip() for t in args.analyses.split(",") if t.strip()]
+    unknown = [t for t in analysis_types if t not in ANALYSIS_TYPES]
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    if unknown or not analysis_types:
+        print(f"Error: Unknown analysis type(s): {', '.join(unknown)}. Choose from: {', '.join(ANALYSIS_TYPES)}")
+        return 2
+    if not formats or any(f not in ("md", "json") for f in formats):
+        print("Error: --format must list md and/or json")
+        return 2
+
+    model = AVAILABLE_MODELS.get(args.model) if args.model else get_default_model()
+    if model is None or not model.is_available:
+        print(f"Error: Model {args.model or ''} is not available. Please configure the API key.")
+        return 2
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: Not a directory: {args.input_dir}")
+        return 2
+
+    paths = sorted(
+        os.path.join(args.input_dir, name)
+        for name in os.listdir(args.input_dir)
+        if name.endswith(tuple(args.pattern.split(","))) and os.path.isfile(os.path.join(args.input_dir, name))
+    )
+
+    runner = BatchRunner(
+        output_dir=args.output,
+        model_name=model.name,
+        analysis_types=analysis_types,
+        formats=formats,
+        workers=max(1, min(args.workers, len(paths) or 1)),
+        concurrency=args.concurrency,
+        force=args.force,
+        max_exports=args.max_exports
+    )
+    start = time.perf_counter()
+    stats = asyncio.run(runner.run(paths))
+    elapsed = time.perf_counter() - start
+
+    calls, tokens, cost = llm_totals()
+    print(
+        f"\n{len(paths)} exports in {elapsed:.1f}s: {stats.processed} processed, "
+        f"{stats.skipped} unchanged, {stats.failed} failed"
+    )
+    if stats.processed:
+        print(
+            f"Throughput: {stats.processed / elapsed * 60:.1f} exports/min, "
+            f"{stats.rows / elapsed:.0f} rows/s; preprocessing {stats.preprocess_seconds:.1f}s "
+            f"on {runner.workers} workers, analyses {stats.analysis_seconds:.1f}s (summed over exports)"
+        )
+    print(f"LLM: {calls:.0f} calls, {tokens:.0f} tokens, ~${cost:.4f}")
+    return 1 if stats.failed else 0
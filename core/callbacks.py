@@ -0,0 +1,299 @@
+"""LangChain callback handlers used by the analyzer."""
+import bisect
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 5000, 10000, 25000, 50000)
+STEP_BUCKETS = (1, 2, 3, 5, 8, 13, 21)
+
+# Metric name -> (help text, histogram buckets or None for counters)
+METRICS: Dict[str, Tuple[str, Optional[tuple]]] = {
+    "orixa_llm_latency_seconds": ("Total latency of one LLM call", LATENCY_BUCKETS),
+    "orixa_llm_time_to_first_token_seconds": ("Time until the first token arrived", LATENCY_BUCKETS),
+    "orixa_llm_prompt_tokens": ("Prompt tokens per LLM call", TOKEN_BUCKETS),
+    "orixa_llm_completion_tokens": ("Completion tokens per LLM call", TOKEN_BUCKETS),
+    "orixa_llm_cost_usd_total": ("Estimated cost of LLM calls in USD", None),
+    "orixa_llm_calls_total": ("LLM calls", None),
+    "orixa_llm_errors_total": ("Failed LLM calls", None),
+    "orixa_request_latency_seconds": ("End-to-end latency of an analysis or question", LATENCY_BUCKETS),
+    "orixa_agent_steps": ("Agent tool-calling steps per request", STEP_BUCKETS),
+    "orixa_tool_latency_seconds": ("Execution time of one agent tool call", LATENCY_BUCKETS),
+}
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Get (upper bound, cumulative count) pairs including +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            pairs.append((str(bound), total))
+        return pairs
+
+class MetricsRegistry:
+    """Thread-safe in-process store of histograms and counters."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, tuple]:
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in a histogram."""
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(METRICS[name][1])
+            self._histograms[key].observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add to a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get all metrics as plain data.
+
+        Returns:
+            Metric name -> list of series with labels and values
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                result.setdefault(name, []).append({
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "buckets": dict(histogram.cumulative()),
+                })
+            for (name, labels), value in sorted(self._counters.items()):
+                result.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return result
+
+    def to_json(self) -> str:
+        """Export all metrics as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        def render_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+            items = list(labels.items()) + ([extra] if extra else [])
+            if not items:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in items)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+        lines = []
+        for name, series in self.snapshot().items():
+            help_text, buckets = METRICS[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {'histogram' if buckets else 'counter'}")
+            for entry in series:
+                labels = entry["labels"]
+                if buckets:
+                    for bound, count in entry["buckets"].items():
+                        lines.append(f"{name}_bucket{render_labels(labels, ('le', bound))} {count}")
+                    lines.append(f"{name}_sum{render_labels(labels)} {entry['sum']}")
+                    lines.append(f"{name}_count{render_labels(labels)} {entry['count']}")
+                else:
+                    lines.append(f"{name}{render_labels(labels)} {entry['value']}")
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry shared by all models and sessions
+METRICS_REGISTRY = MetricsRegistry()
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Accumulates prompt and completion token counts across LLM calls."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        """Total tokens used across all recorded calls."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Record token usage reported by the provider."""
+        prompt, completion = extract_token_usage(response)
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+
+def extract_token_usage(response: LLMResult) -> tuple:
+    """
+    Extract (prompt_tokens, completion_tokens) from an LLM result.
+
+    Providers report usage in different places: OpenAI puts it in
+    ``llm_output['token_usage']`` while newer integrations attach
+    ``usage_metadata`` to each generated message.
+
+    Args:
+        response: The result passed to ``on_llm_end``
+
+    Returns:
+        Tuple of prompt and completion token counts (0 if unknown)
+    """
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage: Optional[Dict[str, Any]] = getattr(message, "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0) or 0
+                completion += usage.get("output_tokens", 0) or 0
+
+    if not (prompt or completion) and response.llm_output:
+        usage = response.llm_output.get("token_usage") or response.llm_output.get("usage") or {}
+        prompt = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+        completion = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+
+    return prompt, completion
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records latency, time to first token, tokens and cost of every call to one model."""
+
+    def __init__(
+        self,
+        provider: str,
+        model_id: str,
+        input_cost_per_mtok: float = 0.0,
+        output_cost_per_mtok: float = 0.0,
+        registry: MetricsRegistry = METRICS_REGISTRY
+    ):
+        self.labels = {"provider": provider, "model": model_id}
+        self.input_cost_per_mtok = input_cost_per_mtok
+        self.output_cost_per_mtok = output_cost_per_mtok
+        self.registry = registry
+        self._started: Dict[UUID, float] = {}
+        self._first_token: Dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._first_token.setdefault(run_id, time.perf_counter())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        end = time.perf_counter()
+        start = self._started.pop(run_id, end)
+        # Without streaming the first token arrives with the full response
+        first_token = self._first_token.pop(run_id, end)
+        prompt, completion = extract_token_usage(response)
+        cost = (prompt * self.input_cost_per_mtok + completion * self.output_cost_per_mtok) / 1_000_000
+
+        self.registry.observe("orixa_llm_latency_seconds", end - start, **self.labels)
+        self.registry.observe("orixa_llm_time_to_first_token_seconds", first_token - start, **self.labels)
+        self.registry.observe("orixa_llm_prompt_tokens", prompt, **self.labels)
+        self.registry.observe("orixa_llm_completion_tokens", completion, **self.labels)
+        self.registry.increment("orixa_llm_calls_total", **self.labels)
+        self.registry.increment("orixa_llm_cost_usd_total", cost, **self.labels)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+        self._first_token.pop(run_id, None)
+        self.registry.increment("orixa_llm_errors_total", **self.labels)
+
+class RunMetricsHandler(BaseCallbackHandler):
+    """Records end-to-end latency, agent steps and tool time of one request."""
+
+    def __init__(self, operation: str, model_name: str, registry: MetricsRegistry = METRICS_REGISTRY):
+        self.labels = {"operation": operation, "model": model_name}
+        self.registry = registry
+        self.steps = 0
+        self._root: Optional[UUID] = None
+        self._started: Optional[float] = None
+        self._tools: Dict[UUID, Tuple[float, str]] = {}
+
+    def _begin(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        if parent_run_id is None and self._root is None:
+            self._root = run_id
+            self._started = time.perf_counter()
+
+    def _finish(self, run_id: UUID) -> None:
+        if run_id != self._root or self._started is None:
+            return
+        self.registry.observe("orixa_request_latency_seconds", time.perf_counter() - self._started, **self.labels)
+        self.registry.observe("orixa_agent_steps", self.steps, **self.labels)
+        self._root = self._started = None
+        self.steps = 0
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._begin(run_id, parent_run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID,
+                            parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._begin(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self.steps += 1
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._tools[run_id] = (time.perf_counter(), name)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._tools.pop(run_id, None)
+        if started is not None:
+            self.registry.observe(
+                "orixa_tool_latency_seconds", time.perf_counter() - started[0],
+                tool=started[1], **self.labels
+            )
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_tool_end(None, run_id=run_id, **kwargs)
@@ -32,6 +32,80 @@ class Config:
             
         return os.getenv(env_var)
     
+    @staticmethod
+    def get_str(name: str, default: str) -> str:
+        """
+        Get a string setting from the environment.
+        
+        Args:
+            name: Environment variable name
+            default: Value used when the variable is unset or empty
+            
+        Returns:
+            The configured value, stripped and lower-cased
+        """
+        value = os.getenv(name, "").strip()
+        return value.lower() if value else default
+    
+    @staticmethod
+    def get_int(name: str, default: int) -> int:
+        """
+        Get an integer setting from the environment.
+        
+        Args:
+            name: Environment variable name
+            default: Value used when the variable is unset or invalid
+            
+        Returns:
+            The configured integer value
+        """
+        value = os.getenv(name)
+        if value is None or value.strip() == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            print(f"Warning: Invalid value for {name}: {value!r}, using {default}")
+            return default
+    
+    @staticmethod
+    def get_float(name: str, default: float) -> float:
+        """
+        Get a float setting from the environment.
+        
+        Args:
+            name: Environment variable name
+            default: Value used when the variable is unset or invalid
+        
+        Returns:
+            The configured float value
+        """
+        value = os.getenv(name)
+        if value is None or value.strip() == "":
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            print(f"Warning: Invalid value for {name}: {value!r}, using {default}")
+            return default
+    
+    @staticmethod
+    def get_bool(name: str, default: bool) -> bool:
+        """
+        Get a boolean setting from the environment.
+        
+        Args:
+            name: Environment variable name
+            default: Value used when the variable is unset
+            
+        Returns:
+            True for "1", "true", "yes" or "on" (case-insensitive)
+        """
+        value = os.getenv(name)
+        if value is None or value.strip() == "":
+            return default
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    
     @staticmethod
     def validate_api_keys() -> Dict[str, bool]:
         """
@@ -49,8 +123,9 @@ class Config:
     @staticmethod
     def setup_environment() -> None:
         """Setup required environment variables."""
-        # Set up LangChain environment
-        os.environ["LANGCHAIN_TRACING_V2"] = "true"
+        # Remote LangChain tracing is opt-in; local metrics are always recorded
+        tracing = Config.get_bool("LANGCHAIN_TRACING_V2", False) and bool(os.getenv("LANGCHAIN_API_KEY"))
+        os.environ["LANGCHAIN_TRACING_V2"] = "true" if tracing else "false"
         os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGCHAIN_API_KEY", "")
         os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT", "default")
         
@@ -72,15 +147,15 @@ class Config:
     @staticmethod
     def get_available_models() -> Dict[str, bool]:
         """
-        Get available models based on API keys.
+        Get available models based on API keys and the offline model settings.
         
         Returns:
-            Dictionary of model names and their availability
+            Dictionary of model display names and their availability
         """
-        api_keys = Config.validate_api_keys()
+        # models imports this module, so import it on use
+        from .models import AVAILABLE_MODELS
         
         return {
-            "OpenAI GPT-4": api_keys["openai"],
-            "Anthropic Claude": api_keys["anthropic"],
-            "Google Gemini": api_keys["google"]
+            model.display_name: model.is_available
+            for model in AVAILABLE_MODELS.values()
         }
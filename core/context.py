@@ -0,0 +1,151 @@
+"""Column pruning and schema digests for the pandas agent's context."""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+import pandas as pd
+
+# Columns always exposed to the agent when present
+CORE_COLUMNS = [
+    'event_date', 'event_timestamp', 'event_name', 'user_pseudo_id',
+    'ga_session_id', 'is_session_start', 'is_page_view', 'page_path',
+    'source_medium', 'device.category', 'geo.country',
+]
+
+# Constant columns listed by value in the agent prompt
+MAX_LISTED_CONSTANTS = 20
+
+AGENT_PREFIX = """
+You are working with a pandas dataframe of Google Analytics 4 events in Python.
+The name of the dataframe is `df`. Empty and constant columns were removed from it.
+"""
+
+@dataclass
+class ColumnProfile:
+    """Compact description of one column."""
+    name: str
+    dtype: str
+    cardinality: int
+    null_rate: float
+    samples: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.null_rate >= 1.0
+
+    @property
+    def is_constant(self) -> bool:
+        return not self.is_empty and self.cardinality <= 1
+
+    def describe(self) -> str:
+        """One-line summary: name | dtype | distinct | null% | examples."""
+        samples = ", ".join(self.samples)
+        return (
+            f"{self.name} | {self.dtype} | {self.cardinality} distinct | "
+            f"{self.null_rate:.0%} null | e.g. {samples}"
+        )
+
+def _truncate(value, length: int = 40) -> str:
+    text = str(value)
+    return text if len(text) <= length else text[:length - 1] + "…"
+
+def profile_columns(df: pd.DataFrame, sample_values: int = 3) -> List[ColumnProfile]:
+    """
+    Profile every column of a DataFrame.
+
+    Args:
+        df: DataFrame to profile
+        sample_values: Number of most common values kept per column
+
+    Returns:
+        One ColumnProfile per column, in column order
+    """
+    null_rates = df.isna().mean() if len(df) else pd.Series(1.0, index=df.columns)
+    profiles = []
+    for column in df.columns:
+        null_rate = float(null_rates[column])
+        values = df[column].dropna()
+        if null_rate >= 1.0 or values.empty:
+            profiles.append(ColumnProfile(column, str(df[column].dtype), 0, 1.0))
+            continue
+        try:
+            counts = values.value_counts()
+        except TypeError:  # unhashable values such as lists
+            counts = values.astype(str).value_counts()
+        profiles.append(ColumnProfile(
+            name=column,
+            dtype=str(df[column].dtype),
+            cardinality=len(counts),
+            null_rate=null_rate,
+            samples=[_truncate(value) for value in counts.index[:sample_values]]
+        ))
+    return profiles
+
+class AgentContext:
+    """Decides which columns the agent sees and how they are described."""
+
+    def __init__(self, profiles: List[ColumnProfile]):
+        self.profiles = {profile.name: profile for profile in profiles}
+        # Core columns stay even when constant, e.g. a single-day export's event_date
+        self.columns = [
+            p.name for p in profiles
+            if not p.is_empty and (not p.is_constant or p.name in CORE_COLUMNS)
+        ]
+        self.constants = [p for p in profiles if p.is_constant and p.name not in self.columns]
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "AgentContext":
+        return cls(profile_columns(df))
+
+    @property
+    def dropped(self) -> List[str]:
+        """Columns hidden from the agent (all-null or constant)."""
+        return [name for name in self.profiles if name not in self.columns]
+
+    def agent_prefix(self) -> str:
+        """System prompt describing the exposed columns, replacing df.head()."""
+        lines = [AGENT_PREFIX, "Columns (name | dtype):"]
+        lines += [f"- {name} | {self.profiles[name].dtype}" for name in self.columns]
+        if self.constants:
+            shown = self.constants[:MAX_LISTED_CONSTANTS]
+            constants = ", ".join(f"{p.name}={p.samples[0]}" for p in shown)
+            if len(self.constants) > len(shown):
+                constants += f" (and {len(self.constants) - len(shown)} more)"
+            lines.append(f"\nRemoved constant columns (same value in every row): {constants}")
+        return "\n".join(lines)
+
+    def select_columns(self, question: str, max_columns: int = 25) -> List[str]:
+        """
+        Pick the columns most relevant to a question.
+
+        Core GA4 columns come first; others are ranked by how many words of
+        the question appear in their name or their most common values.
+
+        Args:
+            question: The user's question
+            max_columns: Maximum number of columns returned
+
+        Returns:
+            Column names in order of relevance
+        """
+        words: Set[str] = {w for w in re.findall(r"[a-z0-9]+", question.lower()) if len(w) > 2}
+        # Crude singular forms so "pages" matches "page_path"
+        words |= {w[:-1] for w in words if w.endswith("s")}
+
+        selected = [name for name in CORE_COLUMNS if name in self.columns]
+        scored = []
+        for name in self.columns:
+            if name in selected:
+                continue
+            parts = set(re.findall(r"[a-z0-9]+", name.lower()))
+            samples = " ".join(self.profiles[name].samples).lower()
+            score = 2 * len(words & parts) + sum(1 for w in words if w in samples)
+            if score:
+                scored.append((score, name))
+        scored.sort(key=lambda item: -item[0])
+        selected += [name for _, name in scored]
+        return selected[:max_columns]
+
+    def describe_columns(self, columns: Optional[List[str]] = None) -> str:
+        """Schema digest lines for the given columns (all exposed columns by default)."""
+        columns = columns if columns is not None else self.columns
+        return "\n".join(f"- {self.profiles[name].describe()}" for name in columns)
@@ -0,0 +1,124 @@
+"""Chart-ready KPI tables built from precomputed aggregates."""
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from .aggregates import GA4Aggregates
+
+# Breakdown name -> chart title, in display order
+SPLITS: Dict[str, str] = {
+    "pages": "Top Pages",
+    "sources": "Source / Medium",
+    "devices": "Devices",
+    "countries": "Countries",
+}
+
+@dataclass
+class Dashboard:
+    """KPIs and small frames, ready to hand to chart widgets."""
+    kpis: Dict[str, str]
+    trend: pd.DataFrame
+    splits: Dict[str, pd.Series] = field(default_factory=dict)
+    trend_days: int = 0
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Pick the points of a series that preserve its shape (Largest-Triangle-Three-Buckets).
+
+    Points are assumed evenly spaced. The first and last points are always
+    kept; each bucket in between contributes the point forming the largest
+    triangle with the previous pick and the next bucket's average.
+
+    Args:
+        y: Series values
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picks = np.empty(threshold, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = (end + next_end - 1) / 2
+        next_y = y[end:next_end].mean()
+        x = np.arange(start, end)
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        areas = np.abs(
+            (previous - next_x) * (y[start:end] - y[previous])
+            - (previous - x) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        picks[bucket + 1] = previous
+    return picks
+
+def downsample(frame: pd.DataFrame, max_points: int, column: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reduce a time-indexed frame to at most max_points rows with LTTB.
+
+    Args:
+        frame: Frame sorted by its index
+        max_points: Rows to keep
+        column: Column whose shape is preserved (default: the first)
+    """
+    if len(frame) <= max_points:
+        return frame
+    values = frame[column or frame.columns[0]].to_numpy(dtype=float)
+    return frame.iloc[lttb_indices(values, max_points)]
+
+def _short_label(value: str) -> str:
+    """Drop the scheme and host of page URLs so chart labels stay readable."""
+    text = str(value)
+    if "://" in text:
+        rest = text.split("://", 1)[1]
+        text = "/" + rest.split("/", 1)[1] if "/" in rest else "/"
+    return text
+
+def build_dashboard(aggregates: GA4Aggregates, top_k: int = 10, max_points: int = 500) -> Dashboard:
+    """
+    Build the dashboard of a dataset from its aggregates, without touching the data.
+
+    Args:
+        aggregates: Precomputed aggregates (see get_aggregates)
+        top_k: Values shown per split
+        max_points: Maximum points of the trend chart
+
+    Returns:
+        Dashboard with KPIs, the downsampled daily trend and the top-k splits
+    """
+    kpis = {"Events": f"{aggregates.total_events:,}"}
+    if aggregates.unique_users is not None:
+        kpis["Users"] = f"{aggregates.unique_users:,}"
+        if aggregates.unique_users:
+            kpis["Events per user"] = f"{aggregates.total_events / aggregates.unique_users:.1f}"
+    if aggregates.date_start:
+        kpis["Days"] = f"{len(aggregates.daily_events):,}"
+
+    trend = pd.DataFrame({"Events": aggregates.daily_events})
+    if not aggregates.daily_users.empty:
+        trend["Users"] = aggregates.daily_users
+    trend.index = pd.to_datetime(trend.index, errors="coerce")
+    trend = trend[trend.index.notna()].sort_index()
+    trend_days = len(trend)
+
+    splits = {}
+    for name, title in SPLITS.items():
+        top = aggregates.top(name, top_k)
+        if not top.empty:
+            if name == "pages":
+                top = top.groupby(top.index.map(_short_label), sort=False).sum()
+            splits[title] = top
+
+    return Dashboard(
+        kpis=kpis,
+        trend=downsample(trend, max_points),
+        splits=splits,
+        trend_days=trend_days
+    )
@@ -0,0 +1,165 @@
+"""Token-budgeted statistical digest of GA4 data for direct LLM prompts."""
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+import pandas as pd
+from .aggregates import GA4Aggregates, get_aggregates
+
+_ENCODING: Any = None
+_ENCODING_LOADED = False
+
+# Sections in order of importance; the least important are dropped first
+SECTIONS: List[Tuple[str, str]] = [
+    ("events", "Top Events"),
+    ("pages", "Top Pages"),
+    ("sources", "Top Traffic Sources"),
+    ("devices", "Devices"),
+    ("countries", "Top Countries"),
+    ("daily", "Daily Events"),
+]
+
+_CACHE: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_CACHE_SIZE = 64
+_CACHE_LOCK = threading.Lock()
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Uses tiktoken when installed, otherwise the ~4 characters per token
+    rule of thumb, which is close enough for budgeting across providers.
+    """
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # tiktoken missing or its encoding files unavailable
+            _ENCODING = None
+        _ENCODING_LOADED = True
+
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+def _format_counts(counts: pd.Series, total: int) -> str:
+    """Render value counts as compact 'value: count (pct%)' lines."""
+    lines = []
+    for value, count in counts.items():
+        share = f" ({count / total:.1%})" if total else ""
+        lines.append(f"  - {value}: {count:,}{share}")
+    return "\n".join(lines)
+
+def _sample_daily(daily: pd.Series, points: int) -> pd.Series:
+    """Evenly sample a daily series down to at most `points` entries."""
+    if len(daily) <= points:
+        return daily
+    step = (len(daily) - 1) / (points - 1) if points > 1 else len(daily)
+    positions = sorted({round(i * step) for i in range(points)})
+    return daily.iloc[positions]
+
+def render_digest(
+    aggregates: GA4Aggregates,
+    top_k: int,
+    sections: Optional[List[str]] = None
+) -> str:
+    """
+    Render aggregates as a plain-text digest.
+
+    Args:
+        aggregates: Precomputed dataset aggregates
+        top_k: Number of values listed per breakdown
+        sections: Section keys to include (defaults to all)
+
+    Returns:
+        Digest text
+    """
+    sections = sections or [key for key, _ in SECTIONS]
+    lines = [
+        "Data Summary:",
+        f"- Total Events: {aggregates.total_events:,}",
+        f"- Date Range: {aggregates.date_start} to {aggregates.date_end}",
+    ]
+    if aggregates.unique_users is not None:
+        lines.append(f"- Unique Users: {aggregates.unique_users:,}")
+
+    for key, title in SECTIONS:
+        if key not in sections:
+            continue
+        if key == "daily":
+            if aggregates.daily_events.empty:
+                continue
+            daily = _sample_daily(aggregates.daily_events, max(top_k, 2))
+            lines.append(f"- {title} ({len(aggregates.daily_events)} days):")
+            lines.append(_format_counts(daily, 0))
+            continue
+
+        counts = aggregates.top(key, top_k)
+        if counts.empty:
+            continue
+        total = int(aggregates.breakdowns[key].sum())
+        distinct = len(aggregates.breakdowns[key])
+        lines.append(f"- {title} (top {len(counts)} of {distinct}):")
+        lines.append(_format_counts(counts, total))
+
+    return "\n".join(lines)
+
+def fit_digest(aggregates: GA4Aggregates, top_k: int, token_budget: int) -> str:
+    """
+    Render the most detailed digest that fits within a token budget.
+
+    Shrinks the number of values per breakdown first, then drops the least
+    important sections until the estimate is within budget.
+
+    Args:
+        aggregates: Precomputed dataset aggregates
+        top_k: Maximum number of values listed per breakdown
+        token_budget: Maximum estimated tokens for the digest
+
+    Returns:
+        Digest text
+    """
+    sections = [key for key, _ in SECTIONS]
+    k = max(top_k, 1)
+    while True:
+        digest = render_digest(aggregates, k, sections)
+        if estimate_tokens(digest) <= token_budget:
+            return digest
+        if k > 3:
+            k = max(3, k // 2)
+        elif len(sections) > 1:
+            sections.pop()
+        else:
+            return digest
+
+def build_digest(
+    df: pd.DataFrame,
+    dataset_version: str,
+    top_k: int = 10,
+    token_budget: int = 1500
+) -> str:
+    """
+    Build (or fetch from cache) the digest for a dataset version.
+
+    Args:
+        df: Preprocessed GA4 DataFrame
+        dataset_version: Fingerprint of the dataset
+        top_k: Maximum number of values listed per breakdown
+        token_budget: Maximum estimated tokens for the digest
+
+    Returns:
+        Digest text
+    """
+    key = (dataset_version, top_k, token_budget)
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+
+    digest = fit_digest(get_aggregates(df, dataset_version), top_k, token_budget)
+
+    with _CACHE_LOCK:
+        _CACHE[key] = digest
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return digest
@@ -0,0 +1,246 @@
+"""Precomputed GA4 fact cards and a keyword index for answering questions in one call."""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .aggregates import _format_date
+
+# Card kind -> (label, candidate event-level columns, in order of preference)
+DIMENSIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "event": ("Event", ("event_name",)),
+    "page": ("Page", ("page_path", "param_page_location")),
+    "source": ("Traffic source", ("source_medium", "traffic_source.source")),
+    "device": ("Device", ("device.category",)),
+    "country": ("Country", ("geo.country",)),
+    "day": ("Day", ("event_date",)),
+}
+
+# Other dimensions summarized on each card, as (kind, phrase)
+RELATED: List[Tuple[str, str]] = [
+    ("event", "top events"),
+    ("page", "top pages"),
+    ("source", "top sources"),
+    ("device", "devices"),
+    ("country", "top countries"),
+]
+
+# Dates stay one token so a day can be asked about directly
+TOKEN_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}|[a-z0-9]+")
+
+# Term weight of a card's subject (e.g. "Device mobile") relative to its body
+SUBJECT_WEIGHT = 3
+
+@dataclass
+class FactCard:
+    """A short, self-contained statement of precomputed metrics."""
+    kind: str
+    key: str
+    text: str
+
+    @property
+    def subject(self) -> str:
+        return self.text.split(":", 1)[0]
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with a plural "s" removed, so "pages" matches "page"."""
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in TOKEN_PATTERN.findall(text.lower())
+    ]
+
+def event_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get one row per event with its page, source and session.
+
+    Unnested exports put event fields on the first row of each event and
+    parameters such as the page on the following rows, so every row is
+    assigned to the event row before it (in original row order).
+    """
+    df = df.sort_index()
+    if 'event_name' not in df.columns:
+        return df
+    is_event = df['event_name'].notna()
+    group = is_event.cumsum()
+    events = df[is_event].copy()
+    events.index = group[is_event].to_numpy()
+
+    # Take row-level values (pages, sources) from any row of the event
+    for _, candidates in DIMENSIONS.values():
+        for column in candidates:
+            if column in df.columns and column not in ('event_name', 'event_date'):
+                values = df[column]
+                if not pd.api.types.is_numeric_dtype(values):
+                    values = values.where(~values.isin(['', 'nan / nan']))
+                events[column] = values.groupby(group).first().reindex(events.index)
+                break
+    for column in ('ga_session_id', 'param_ga_session_id'):
+        if column in df.columns:
+            events['_session'] = df[column].groupby(group).first().reindex(events.index)
+            break
+    if 'event_date' in events.columns:
+        events['event_date'] = events['event_date'].map(_format_date)
+    return events
+
+def _dimension_column(events: pd.DataFrame, kind: str) -> Optional[str]:
+    return next((col for col in DIMENSIONS[kind][1] if col in events.columns), None)
+
+def _session_count(events: pd.DataFrame) -> Optional[int]:
+    if '_session' not in events.columns or 'user_pseudo_id' not in events.columns:
+        return None
+    sessions = events[['user_pseudo_id', '_session']].dropna()
+    return int(len(sessions.drop_duplicates()))
+
+def _describe(events: pd.DataFrame, total_events: int, exclude: str, top: int = 3) -> str:
+    """Metrics of a slice of events as one sentence-like line."""
+    parts = [f"{len(events):,} events ({len(events) / total_events:.1%} of all)"]
+    if 'user_pseudo_id' in events.columns:
+        parts.append(f"{events['user_pseudo_id'].nunique():,} users")
+    sessions = _session_count(events)
+    if sessions:
+        parts.append(f"{sessions:,} sessions, {len(events) / sessions:.1f} events per session")
+    if 'event_name' in events.columns:
+        page_views = int((events['event_name'] == 'page_view').sum())
+        if page_views:
+            parts.append(f"{page_views:,} page views")
+    for kind, phrase in RELATED:
+        column = _dimension_column(events, kind)
+        if kind == exclude or column is None:
+            continue
+        counts = events[column].dropna().value_counts().head(top)
+        if not counts.empty:
+            parts.append(f"{phrase}: " + ", ".join(f"{value} ({count:,})" for value, count in counts.items()))
+    if exclude != "day" and 'event_date' in events.columns:
+        dates = events['event_date'].dropna()
+        if not dates.empty:
+            parts.append(f"dates {dates.min()} to {dates.max()}")
+    return "; ".join(parts)
+
+def build_fact_cards(df: pd.DataFrame, per_kind: int = 50) -> List[FactCard]:
+    """
+    Build fact cards for the dataset and its largest pages, sources, events, devices, countries and days.
+
+    Args:
+        df: Preprocessed GA4 DataFrame
+        per_kind: Maximum cards per kind (days keep the most recent)
+
+    Returns:
+        The dataset overview card followed by the per-dimension cards
+    """
+    events = event_frame(df)
+    total = len(events)
+    if not total:
+        return []
+    cards = [FactCard("dataset", "all", "Whole dataset: " + _describe(events, total, exclude=""))]
+
+    for kind, (label, _) in DIMENSIONS.items():
+        column = _dimension_column(events, kind)
+        if column is None:
+            continue
+        counts = events[column].dropna().value_counts()
+        keys = counts.sort_index().index[-per_kind:] if kind == "day" else counts.index[:per_kind]
+        selected = events[events[column].isin(keys)]
+        for key, group in selected.groupby(column, sort=False):
+            cards.append(FactCard(kind, str(key), f"{label} {key}: " + _describe(group, total, exclude=kind)))
+    return cards
+
+class FactIndex:
+    """BM25 keyword index over fact cards."""
+
+    def __init__(self, cards: List[FactCard], k1: float = 1.2, b: float = 0.75):
+        self.cards = cards
+        self.k1 = k1
+        self.b = b
+        # Cards are indexed without their numbers, which only add noise to matching;
+        # every card mentions other dimensions, so its own subject weighs more
+        documents = [
+            [
+                token
+                for token in tokenize(card.subject) * (SUBJECT_WEIGHT - 1) + tokenize(card.text)
+                if not token.isdigit()
+            ]
+            for card in cards
+        ]
+        self.lengths = np.array([len(tokens) for tokens in documents], dtype=np.float64)
+        self.average_length = float(self.lengths.mean()) if cards else 0.0
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        term_docs: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, tokens in enumerate(documents):
+            for term, count in Counter(tokens).items():
+                term_docs.setdefault(term, []).append((doc_id, count))
+        for term, entries in term_docs.items():
+            ids, counts = zip(*entries)
+            self.postings[term] = (np.array(ids), np.array(counts, dtype=np.float64))
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.cards))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            ids, counts = self.postings[term]
+            idf = math.log(1 + (len(self.cards) - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[ids] / self.average_length)
+            scores[ids] += idf * counts * (self.k1 + 1) / (counts + norm)
+        return scores
+
+    def search(self, query: str, k: int = 8) -> List[FactCard]:
+        """
+        Get the cards most relevant to a query, always starting with the dataset overview.
+
+        Questions that match no card get the largest card of each kind instead.
+        """
+        if not self.cards:
+            return []
+        scores = self.scores(query)
+        scores[0] = 0.0
+        if not scores.any():
+            seen = set()
+            best = []
+            for card in self.cards[1:]:
+                if card.kind not in seen:
+                    seen.add(card.kind)
+                    best.append(card)
+            return [self.cards[0]] + best[:k - 1]
+        order = np.argsort(-scores, kind="stable")[:k - 1]
+        return [self.cards[0]] + [self.cards[i] for i in order if scores[i] > 0]
+
+_CACHE: "OrderedDict[str, FactIndex]" = OrderedDict()
+_CACHE_SIZE = 16
+_CACHE_LOCK = threading.Lock()
+# Per-version locks, so concurrent callers wait for one computation
+_COMPUTE_LOCKS: Dict[str, threading.Lock] = {}
+
+def get_fact_index(df: pd.DataFrame, dataset_version: str, per_kind: int = 50) -> FactIndex:
+    """
+    Get the fact index of a dataset, building it once per dataset version.
+
+    Args:
+        df: Preprocessed GA4 DataFrame
+        dataset_version: Fingerprint of the dataset (see GA4Preprocessor.dataset_version)
+        per_kind: Maximum cards per kind
+
+    Returns:
+        Cached or freshly built FactIndex
+    """
+    key = f"{dataset_version}:{per_kind}"
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+        compute_lock = _COMPUTE_LOCKS.setdefault(key, threading.Lock())
+
+    with compute_lock:
+        with _CACHE_LOCK:
+            if key in _CACHE:
+                return _CACHE[key]
+        index = FactIndex(build_fact_cards(df, per_kind))
+
+        with _CACHE_LOCK:
+            _CACHE[key] = index
+            _COMPUTE_LOCKS.pop(key, None)
+            while len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return index
@@ -0,0 +1,105 @@
+"""Bounded conversation memory for follow-up questions."""
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List
+from .digest import estimate_tokens
+
+@dataclass
+class Turn:
+    """One question and its answer."""
+    question: str
+    answer: str
+
+def _first_sentence(text: str, max_chars: int = 200) -> str:
+    """Get the first sentence of the answer's main section, without markdown."""
+    # Prefer the "### 💡 Answer" section when the answer follows ASK_PROMPT
+    match = re.search(r"###[^\n]*Answer[^\n]*\n(.*?)(?:\n###|\Z)", text, re.S)
+    body = match.group(1) if match else text
+    body = re.sub(r"[#*_`>|-]+", " ", body)
+    body = " ".join(body.split())
+    sentence = re.split(r"(?<=[.!?])\s", body, maxsplit=1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 1] + "…"
+
+class ConversationMemory:
+    """
+    Keeps the last few turns verbatim and folds older ones into a summary.
+
+    The rendered state stays under a token budget however long the session
+    runs: the oldest verbatim turns are folded first, then the oldest summary
+    lines are dropped, and finally the remaining answers are truncated.
+    """
+
+    def __init__(self, max_turns: int = 3, token_budget: int = 600, max_answer_chars: int = 1200):
+        """
+        Args:
+            max_turns: Turns kept verbatim
+            token_budget: Maximum estimated tokens of the rendered memory
+            max_answer_chars: Longest answer kept verbatim
+        """
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_answer_chars = max_answer_chars
+        self.turns: Deque[Turn] = deque()
+        self.summary: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.turns) + len(self.summary)
+
+    @property
+    def last_question(self) -> str:
+        return self.turns[-1].question if self.turns else ""
+
+    def add(self, question: str, answer: str) -> None:
+        """Record a turn, folding older turns to stay within the limits."""
+        answer = answer.strip()
+        if len(answer) > self.max_answer_chars:
+            answer = answer[:self.max_answer_chars - 1] + "…"
+        with self._lock:
+            if self.turns and self.turns[-1] == Turn(question, answer):
+                return
+            self.turns.append(Turn(question, answer))
+            while len(self.turns) > self.max_turns:
+                self._fold()
+            while estimate_tokens(self._render()) > self.token_budget:
+                if len(self.turns) > 1:
+                    self._fold()
+                elif self.summary:
+                    self.summary.pop(0)
+                else:
+                    self._shrink_last()
+                    break
+
+    def _fold(self) -> None:
+        turn = self.turns.popleft()
+        self.summary.append(f"Q: {turn.question} → {_first_sentence(turn.answer)}")
+
+    def _shrink_last(self) -> None:
+        """Cut the only remaining answer down to what fits the budget."""
+        turn = self.turns[-1]
+        overhead = estimate_tokens(self._render()) - estimate_tokens(turn.answer)
+        keep = max(0, (self.token_budget - overhead) * 4)
+        self.turns[-1] = Turn(turn.question, turn.answer[:keep])
+
+    def _render(self) -> str:
+        if not self.turns and not self.summary:
+            return ""
+        lines = ["Earlier in this conversation:"]
+        if self.summary:
+            lines.append("Summary of earlier questions:")
+            lines += [f"- {line}" for line in self.summary]
+        for turn in self.turns:
+            lines += [f"User: {turn.question}", f"Assistant: {turn.answer}"]
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        """The compact conversation state to send with the next question."""
+        with self._lock:
+            return self._render()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.turns.clear()
+            self.summary.clear()
@@ -0,0 +1,112 @@
+"""Local mock chat model for offline throughput and latency testing."""
+import asyncio
+import math
+import random
+import threading
+import time
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+class MockRateLimitError(Exception):
+    """Raised by the mock model to simulate an HTTP 429 from a provider."""
+    status_code = 429
+
+class MockChatModel(BaseChatModel):
+    """
+    Chat model that answers locally with simulated provider behaviour.
+
+    Latency follows a log-normal distribution around ``latency_seconds``,
+    a fraction of calls are slow (tail latency) and a fraction fail with a
+    429, so rate limiting, retries and hedging can be tested offline.
+    With ``tokens_per_second`` set, generating ``output_tokens`` adds decode
+    time on top of that latency, like a streaming provider.
+    """
+
+    response: str = "Mock response"
+    output_tokens: int = 0
+    tokens_per_second: float = 0.0
+    latency_seconds: float = 0.5
+    latency_sigma: float = 0.25
+    slow_rate: float = 0.0
+    slow_factor: float = 10.0
+    rate_limit_rate: float = 0.0
+    seed: Optional[int] = None
+
+    _random: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    def _sample(self) -> tuple:
+        """Draw (latency, rate_limited) for one call."""
+        with self._lock:
+            latency = self.latency_seconds * math.exp(self._random.gauss(0, self.latency_sigma))
+            if self._random.random() < self.slow_rate:
+                latency *= self.slow_factor
+            rate_limited = self._random.random() < self.rate_limit_rate
+        return latency, rate_limited
+
+    def _response_text(self) -> str:
+        """The response padded with filler text to about ``output_tokens``."""
+        filler = " Sessions, events and page views follow the usual weekly pattern."
+        text = self.response
+        while len(text) // 4 < self.output_tokens:
+            text += filler
+        return text
+
+    def _respond(self, messages: List[BaseMessage]) -> tuple:
+        """Draw one call's outcome: (latency, result or None when rate limited)."""
+        latency, rate_limited = self._sample()
+        if rate_limited:
+            return min(latency, 0.05), None
+
+        content = self._response_text()
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        if self.tokens_per_second > 0:
+            latency += completion_tokens / self.tokens_per_second
+
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        )
+        return latency, ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        latency, result = self._respond(messages)
+        time.sleep(latency)
+        if result is None:
+            raise MockRateLimitError("Rate limit exceeded (mock 429)")
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        latency, result = self._respond(messages)
+        await asyncio.sleep(latency)
+        if result is None:
+            raise MockRateLimitError("Rate limit exceeded (mock 429)")
+        return result
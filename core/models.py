@@ -1,11 +1,94 @@
 """LLM models configuration for the application."""
+import importlib
+import os
+import threading
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, Optional, Tuple
 from .config import Config
 
+# Provider -> (module, class); imported only when a provider is first used
+PROVIDER_CLASSES: Dict[str, Tuple[str, str]] = {
+    "openai": ("langchain_openai", "ChatOpenAI"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic"),
+    "google": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "fake": (".mock_llm", "MockChatModel"),
+    "replay": (".replay", "RecordReplayChatModel"),
+}
+
+# Local providers that need no API key or network (benchmarks and CI)
+OFFLINE_PROVIDERS = ("fake", "replay")
+
+# ORIXA_FAKE_PROFILE -> MockChatModel settings (latency is before the first token)
+FAKE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "instant": {"latency_seconds": 0.0, "tokens_per_second": 0.0, "output_tokens": 50},
+    "fast": {"latency_seconds": 0.3, "tokens_per_second": 150.0, "output_tokens": 250},
+    "typical": {"latency_seconds": 0.8, "tokens_per_second": 60.0, "output_tokens": 400},
+    "slow": {"latency_seconds": 2.0, "tokens_per_second": 25.0, "output_tokens": 600, "slow_rate": 0.05},
+}
+
+def load_provider_class(provider: str) -> Any:
+    """
+    Import the LangChain chat model class for a provider.
+    
+    Args:
+        provider: The provider name
+        
+    Returns:
+        The chat model class
+        
+    Raises:
+        ValueError: If provider is unknown
+    """
+    if provider not in PROVIDER_CLASSES:
+        raise ValueError(f"Unknown provider: {provider}")
+    module_name, class_name = PROVIDER_CLASSES[provider]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
+
+# Shared clients keyed by (provider, model_id, temperature)
+_CLIENT_POOL: Dict[Tuple[str, str, float], Any] = {}
+# Re-entrant: a replay client creates its source client while holding it
+_CLIENT_POOL_LOCK = threading.RLock()
+
+def _http_clients() -> Tuple[Any, Any]:
+    """
+    Create keep-alive HTTP clients for providers that accept them.
+    
+    Returns:
+        Tuple of (sync, async) httpx clients with connection pooling
+    """
+    import httpx
+    
+    limits = httpx.Limits(
+        max_connections=Config.get_int("ORIXA_HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=Config.get_int("ORIXA_HTTP_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=Config.get_int("ORIXA_HTTP_KEEPALIVE_SECONDS", 60)
+    )
+    timeout = httpx.Timeout(Config.get_int("ORIXA_HTTP_TIMEOUT", 120), connect=10)
+    return (
+        httpx.Client(limits=limits, timeout=timeout),
+        httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+
+def replay_settings() -> Tuple[str, str, str]:
+    """
+    Get the record/replay settings.
+    
+    Returns:
+        Tuple of (mode, recording directory, name of the recorded model);
+        mode is "off" unless ORIXA_REPLAY_MODE is record, replay or auto
+    """
+    mode = Config.get_str("ORIXA_REPLAY_MODE", "off")
+    return (
+        mode if mode in ("record", "replay", "auto") else "off",
+        os.getenv("ORIXA_REPLAY_DIR", "").strip() or "recordings",
+        Config.get_str("ORIXA_REPLAY_SOURCE", "openai")
+    )
+
+def clear_client_pool() -> None:
+    """Drop all pooled clients (e.g. after API keys change)."""
+    with _CLIENT_POOL_LOCK:
+        _CLIENT_POOL.clear()
+
 @dataclass
 class ModelConfig:
     """Configuration for a LLM model."""
@@ -14,10 +97,29 @@ class ModelConfig:
     provider: str
     model_id: str
     temperature: float
+    input_cost_per_mtok: float = 0.0   # USD per million prompt tokens
+    output_cost_per_mtok: float = 0.0  # USD per million completion tokens
+    
+    @property
+    def pool_key(self) -> Tuple[str, str, float]:
+        """Key identifying interchangeable clients in the shared pool."""
+        # Offline clients change with their settings rather than the model id
+        if self.provider == "fake":
+            settings = ":".join(
+                Config.get_str(name, "")
+                for name in ("ORIXA_FAKE_PROFILE", "ORIXA_FAKE_LATENCY", "ORIXA_FAKE_TOKENS_PER_SECOND")
+            )
+            return (self.provider, settings, self.temperature)
+        if self.provider == "replay":
+            return (self.provider, ":".join(replay_settings()), self.temperature)
+        return (self.provider, self.model_id, self.temperature)
     
     def create_instance(self) -> Optional[Any]:
         """
-        Create an instance of the LLM model.
+        Get the shared LLM client for this model, creating it on first use.
+        
+        Clients are thread-safe and shared across sessions, so switching
+        models is a lookup and concurrent sessions reuse warm connections.
         
         Returns:
             LLM instance if API key is available, None otherwise
@@ -25,47 +127,148 @@ class ModelConfig:
         Raises:
             ValueError: If provider is unknown
         """
+        key = self.pool_key
+        client = _CLIENT_POOL.get(key)
+        if client is not None:
+            return client
+        
+        with _CLIENT_POOL_LOCK:
+            if key not in _CLIENT_POOL:
+                _CLIENT_POOL[key] = self._create_client()
+            return _CLIENT_POOL[key]
+    
+    def _create_client(self) -> Any:
+        """
+        Create a new instance of the LLM model.
+        
+        Returns:
+            LLM instance
+        
+        Raises:
+            ValueError: If the API key is missing or provider is unknown
+        """
+        if self.provider in OFFLINE_PROVIDERS:
+            return self._create_offline_client()
+        
         # Check if API key is available
         api_key = Config.get_api_key(self.provider)
         if not api_key:
             raise ValueError(f"API key not configured for {self.display_name}")
         
+        callbacks = self._metrics_callbacks(self.model_id, self.input_cost_per_mtok, self.output_cost_per_mtok)
+        
         # Create appropriate model instance
         try:
             if self.provider == "openai":
+                ChatOpenAI = load_provider_class("openai")
+                http_client, http_async_client = _http_clients()
                 return ChatOpenAI(
                     model=self.model_id,
                     temperature=self.temperature,
-                    openai_api_key=api_key
+                    openai_api_key=api_key,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                    callbacks=callbacks
                 )
             elif self.provider == "anthropic":
+                ChatAnthropic = load_provider_class("anthropic")
                 return ChatAnthropic(
                     model=self.model_id,
                     temperature=self.temperature,
                     anthropic_api_key=api_key,
-                    max_tokens=8192  # Add token limit
+                    max_tokens=8192,  # Add token limit
+                    callbacks=callbacks
                 )
             elif self.provider == "google":
+                ChatGoogleGenerativeAI = load_provider_class("google")
                 return ChatGoogleGenerativeAI(
                     model=self.model_id,
                     temperature=self.temperature,
                     google_api_key=api_key,
-                    convert_system_message_to_human=True  # Handle system messages
+                    convert_system_message_to_human=True,  # Handle system messages
+                    callbacks=callbacks
                 )
             else:
                 raise ValueError(f"Unknown provider: {self.provider}")
         except Exception as e:
             raise ValueError(f"Error initializing {self.display_name}: {str(e)}")
     
+    def _metrics_callbacks(self, model_id: str, input_cost: float, output_cost: float) -> list:
+        """Every pooled client reports into the process-wide metrics registry."""
+        from .callbacks import LLMMetricsHandler
+        return [LLMMetricsHandler(self.provider, model_id, input_cost, output_cost)]
+    
+    def _create_offline_client(self) -> Any:
+        """
+        Create the fake or record/replay model.
+        
+        Returns:
+            LLM instance
+        
+        Raises:
+            ValueError: If the offline provider is not configured
+        """
+        if self.provider == "fake":
+            profile_name = Config.get_str("ORIXA_FAKE_PROFILE", "")
+            if profile_name not in FAKE_PROFILES:
+                raise ValueError(f"Unknown fake LLM profile: {profile_name!r}")
+            profile = dict(FAKE_PROFILES[profile_name])
+            profile["latency_seconds"] = Config.get_float("ORIXA_FAKE_LATENCY", profile["latency_seconds"])
+            profile["tokens_per_second"] = Config.get_float(
+                "ORIXA_FAKE_TOKENS_PER_SECOND", profile["tokens_per_second"]
+            )
+            MockChatModel = load_provider_class("fake")
+            return MockChatModel(
+                response=f"Fake {profile_name} response.",
+                seed=0,
+                callbacks=self._metrics_callbacks(f"fake-{profile_name}", 0.0, 0.0),
+                **profile
+            )
+        
+        mode, recording_dir, source_name = replay_settings()
+        source = AVAILABLE_MODELS.get(source_name)
+        if mode == "off" or source is None or source.provider in OFFLINE_PROVIDERS:
+            raise ValueError(f"Record/replay is not configured for {self.display_name}")
+        
+        RecordReplayChatModel = load_provider_class("replay")
+        return RecordReplayChatModel(
+            recording_dir=recording_dir,
+            mode=mode,
+            model_id=source.model_id,
+            speed=Config.get_float("ORIXA_REPLAY_SPEED", 1.0),
+            # Pure replay never touches the network, so no API key is needed
+            inner=source.create_instance() if mode != "replay" else None,
+            callbacks=self._metrics_callbacks(
+                source.model_id, source.input_cost_per_mtok, source.output_cost_per_mtok
+            )
+        )
+    
+    @property
+    def is_offline(self) -> bool:
+        """Check if the model runs locally without API calls."""
+        return self.provider in OFFLINE_PROVIDERS
+    
     @property
     def is_available(self) -> bool:
         """Check if the model is available (has API key configured)."""
+        if self.provider == "fake":
+            return Config.get_str("ORIXA_FAKE_PROFILE", "") in FAKE_PROFILES
+        if self.provider == "replay":
+            mode, _, source_name = replay_settings()
+            source = AVAILABLE_MODELS.get(source_name)
+            if mode == "off" or source is None or source.is_offline:
+                return False
+            return mode == "replay" or source.is_available
         return bool(Config.get_api_key(self.provider))
     
     @property
     def supports_functions(self) -> bool:
         """Check if the model supports function calling."""
-        return self.provider in ["openai", "google"]
+        if self.provider == "replay":
+            # Recordings only match if prompts are built as for the recorded model
+            source = AVAILABLE_MODELS.get(replay_settings()[2])
+            return source is not None and source.supports_functions
+        return self.provider in ["openai", "google", "fake"]
 
 # Available models configuration
 AVAILABLE_MODELS: Dict[str, ModelConfig] = {
@@ -74,21 +277,42 @@ AVAILABLE_MODELS: Dict[str, ModelConfig] = {
         display_name="OpenAI GPT-4",
         provider="openai",
         model_id="gpt-4o-mini",
-        temperature=0.1
+        temperature=0.1,
+        input_cost_per_mtok=0.15,
+        output_cost_per_mtok=0.60
     ),
     "anthropic": ModelConfig(
         name="anthropic",
         display_name="Anthropic Claude",
         provider="anthropic",
         model_id="claude-3-5-haiku-20241022",
-        temperature=0.1
+        temperature=0.1,
+        input_cost_per_mtok=0.80,
+        output_cost_per_mtok=4.00
     ),
     "google": ModelConfig(
         name="google",
         display_name="Google Gemini",
         provider="google",
         model_id="gemini-1.5-flash",
-        temperature=0.1
+        temperature=0.1,
+        input_cost_per_mtok=0.075,
+        output_cost_per_mtok=0.30
+    ),
+    # Offline providers, enabled by ORIXA_FAKE_PROFILE / ORIXA_REPLAY_MODE
+    "fake": ModelConfig(
+        name="fake",
+        display_name="Fake LLM (offline)",
+        provider="fake",
+        model_id="fake",
+        temperature=0.0
+    ),
+    "replay": ModelConfig(
+        name="replay",
+        display_name="Recorded LLM (replay)",
+        provider="replay",
+        model_id="replay",
+        temperature=0.0
     )
 }
 
@@ -1,10 +1,25 @@
 """Preprocessor for Google Analytics 4 data."""
+import hashlib
 import pandas as pd
 from typing import List, Dict, Any
 
 class GA4Preprocessor:
     """Handles preprocessing of GA4 data exports."""
     
+    # Fields every GA4 export must have
+    REQUIRED_COLUMNS = ('event_date', 'event_name', 'event_timestamp')
+    
+    # Fields read by preprocessing, aggregates and quality checks, even when sparse
+    USED_COLUMNS = REQUIRED_COLUMNS + (
+        'user_pseudo_id',
+        'event_bundle_sequence_id',
+        'traffic_source.source',
+        'traffic_source.medium',
+        'device.category',
+        'geo.country'
+    )
+    USED_PREFIXES = ('event_params.',)
+    
     @staticmethod
     def flatten_event_params(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -141,6 +156,22 @@ class GA4Preprocessor:
         
         return processed_df
     
+    @staticmethod
+    def dataset_version(df: pd.DataFrame) -> str:
+        """
+        Compute a content fingerprint for a DataFrame.
+        
+        Args:
+            df: DataFrame to fingerprint
+            
+        Returns:
+            Hex digest that changes whenever columns or values change
+        """
+        digest = hashlib.sha256()
+        digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()[:16]
+    
     @staticmethod
     def preprocess_ga4_data(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -0,0 +1,136 @@
+"""Prompt templates for GA4 analyses and questions."""
+from typing import Dict
+
+# Analysis type -> display name, in the order reports are assembled
+ANALYSIS_TYPES: Dict[str, str] = {
+    "overview": "Data Overview",
+    "missing_values": "Missing/Duplicate Values",
+    "correlation": "Correlation Analysis",
+    "summary": "Data Summarization",
+}
+
+ANALYSIS_PROMPTS: Dict[str, str] = {
+    "overview": """
+            Analyze this Google Analytics 4 data and provide insights in the following format:
+
+            ### 📊 Overview
+            {One-sentence summary of data period and total events}
+
+            ### 🎯 Key Metrics
+            - Total Events: {number}
+            - Date Range: {date range}
+            - Unique Users: {number if available}
+
+            ### 📈 Event Analysis
+            {List top event types with percentages}
+
+            ### 🌐 Top Pages
+            {List most viewed pages with view counts}
+
+            ### 💡 Key Insights
+            - {Key insight 1}
+            - {Key insight 2}
+            - {Key insight 3}
+
+            ### 📱 Device & Location
+            {Brief device and location summary}
+
+            Keep the response concise and marketing-friendly.
+            Focus on actionable insights.
+        """,
+    "missing_values": """
+            Check this Google Analytics 4 data for missing and duplicate values and
+            report in the following format:
+
+            ### 🧹 Data Completeness
+            {One-sentence verdict on overall data quality}
+
+            ### ❓ Missing Values
+            {List the key GA4 fields (event, user, page, traffic source, device, geo)
+            with their share of missing values; ignore fields that are always empty}
+
+            ### 🔁 Duplicate Events
+            {Number of events sharing user_pseudo_id, event_timestamp and event_name,
+            with examples if any}
+
+            ### ⚠️ Impact on Reporting
+            - {Which metrics are affected and how}
+
+            ### 🛠️ Recommendations
+            - {Tracking or export fix 1}
+            - {Tracking or export fix 2}
+
+            Keep the response concise and practical.
+        """,
+    "correlation": """
+            Look for relationships in this Google Analytics 4 data and report in the
+            following format:
+
+            ### 🔗 Key Relationships
+            - {Relationship between two dimensions or metrics, with numbers}
+            - {Relationship 2}
+            - {Relationship 3}
+
+            ### 📱 Device & Source Effects
+            {How device category and traffic source relate to events and page views}
+
+            ### 📅 Time Patterns
+            {How activity varies by day or hour}
+
+            ### 💡 What It Means
+            - {Marketing takeaway 1}
+            - {Marketing takeaway 2}
+
+            Only report relationships supported by the data; say so if the data is
+            too small to tell. Keep the response concise and marketing-friendly.
+        """,
+    "summary": """
+            Summarize this Google Analytics 4 data with descriptive statistics in the
+            following format:
+
+            ### 🧾 Dataset Summary
+            {Rows, events, users, sessions and date range}
+
+            ### 📏 Activity Statistics
+            - Events per User: {mean / median}
+            - Events per Day: {mean / min / max}
+            - Page Views per Session: {if available}
+
+            ### 🏆 Top Values
+            {Most common event, page, traffic source, device and country}
+
+            ### 📝 Notes
+            {Anything unusual in the distributions}
+
+            Keep the response concise and factual.
+        """,
+}
+
+ASK_PROMPT = """
+        Analyze the GA4 data to answer: "{question}"
+
+        Format your response like this:
+
+        ### 💡 Answer
+        {{Clear, concise answer}}
+
+        ### 📊 Supporting Data
+        {{Key metrics and numbers}}
+
+        ### 🎯 Recommendation
+        {{Brief, actionable recommendation}}
+
+        Keep the response marketing-friendly and focused on business insights.
+        Be concise and clear.
+        """
+
+# Reply that sends a question on to the agent when the fact cards can't answer it
+INSUFFICIENT_FACTS = "INSUFFICIENT_FACTS"
+
+FACT_CARDS_PROMPT = """
+        Answer using only these precomputed GA4 facts:
+        {facts}
+
+        If the facts do not contain what the question needs, reply with exactly
+        INSUFFICIENT_FACTS and nothing else.
+        """
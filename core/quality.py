@@ -0,0 +1,250 @@
+"""Chunked missing-value and duplicate-event profiling of GA4 exports."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Fields identifying an event; rows agreeing on all present ones are duplicates
+DUPLICATE_KEY = ("user_pseudo_id", "event_timestamp", "event_name", "event_bundle_sequence_id")
+
+# Repeated fields of unnested exports, which fill every row of an event
+NESTED_PREFIXES = ("event_params.", "user_properties.", "items.")
+
+# Row positions kept per duplicate cluster
+MAX_CLUSTER_ROWS = 10
+
+@dataclass
+class DuplicateCluster:
+    """Events sharing the same key values."""
+    key: Dict[str, Any]
+    count: int
+    rows: List[int] = field(default_factory=list)
+
+@dataclass
+class QualityReport:
+    """
+    Null rates and duplicate events of a dataset.
+
+    Null rates of event fields are over event rows, those of repeated
+    (nested) fields over all rows, so unnested exports aren't reported as
+    mostly empty.
+    """
+    rows: int
+    events: int
+    null_rates: pd.Series
+    duplicate_events: int
+    clusters: List[DuplicateCluster]
+    key_columns: Tuple[str, ...]
+
+    def summary(self, max_columns: int = 30, max_clusters: int = 5) -> str:
+        """
+        Render the report as compact text for prompts.
+
+        Args:
+            max_columns: Partially filled columns listed, most missing first
+            max_clusters: Largest duplicate clusters listed
+        """
+        lines = [f"Rows: {self.rows:,}; events: {self.events:,}"]
+        empty = self.null_rates[self.null_rates >= 1.0]
+        partial = self.null_rates[(self.null_rates > 0) & (self.null_rates < 1.0)]
+        complete = self.null_rates[self.null_rates == 0]
+        lines.append(
+            f"Columns: {len(complete)} complete, {len(partial)} partially missing, "
+            f"{len(empty)} always empty"
+        )
+        if not partial.empty:
+            lines.append("Missing share per partially filled column (most missing first):")
+            lines += [
+                f"  - {column}: {rate:.1%}"
+                for column, rate in partial.sort_values(ascending=False).head(max_columns).items()
+            ]
+        if not self.key_columns:
+            lines.append("Duplicate events: not checked (no event key columns)")
+            return "\n".join(lines)
+        lines.append(
+            f"Duplicate events on ({', '.join(self.key_columns)}): {self.duplicate_events:,} "
+            f"extra copies in {len(self.clusters):,} clusters"
+        )
+        for cluster in sorted(self.clusters, key=lambda c: -c.count)[:max_clusters]:
+            key = ", ".join(f"{name}={value}" for name, value in cluster.key.items())
+            lines.append(f"  - {cluster.count} copies: {key} (rows {', '.join(map(str, cluster.rows))})")
+        return "\n".join(lines)
+
+def _normalize_keys(keys: pd.DataFrame) -> pd.DataFrame:
+    """Give key columns the same dtypes in every chunk, so equal values hash equally."""
+    return pd.DataFrame({
+        column: values.astype("float64") if pd.api.types.is_numeric_dtype(values) else values.astype(str)
+        for column, values in keys.items()
+    })
+
+class _SortedRuns:
+    """
+    Set of 64-bit hashes with the row of their first occurrence.
+
+    Hashes are kept in sorted runs that are merged when they reach similar
+    sizes, so lookups are a few binary searches and inserts are amortized
+    O(log n) per hash, with no Python object per row.
+    """
+
+    def __init__(self):
+        self.runs: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """First-occurrence row of each hash, or -1 where unseen."""
+        found = np.full(len(hashes), -1, dtype=np.int64)
+        for run_hashes, run_rows in self.runs:
+            idx = np.minimum(np.searchsorted(run_hashes, hashes), len(run_hashes) - 1)
+            match = run_hashes[idx] == hashes
+            found[match] = run_rows[idx[match]]
+        return found
+
+    def add(self, hashes: np.ndarray, rows: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        order = np.argsort(hashes, kind="stable")
+        self.runs.append((hashes[order], rows[order]))
+        while len(self.runs) > 1 and len(self.runs[-1][0]) * 2 >= len(self.runs[-2][0]):
+            (h2, r2), (h1, r1) = self.runs.pop(), self.runs.pop()
+            merged = np.concatenate([h1, h2])
+            order = np.argsort(merged, kind="stable")
+            self.runs.append((merged[order], np.concatenate([r1, r2])[order]))
+
+class QualityProfiler:
+    """
+    Accumulates null counts and duplicate events chunk by chunk.
+
+    Feed chunks in row order with update(), e.g. while streaming an export
+    with ``pd.read_csv(..., chunksize=...)``, then call report(). Memory
+    grows with the number of distinct events (16 bytes each), not with the
+    number of columns.
+    """
+
+    def __init__(self, key_columns: Iterable[str] = DUPLICATE_KEY):
+        self.key_columns = tuple(key_columns)
+        self.rows = 0
+        self.events = 0
+        self.null_counts: Optional[pd.Series] = None
+        self.event_null_counts: Optional[pd.Series] = None
+        self.clusters: Dict[int, DuplicateCluster] = {}
+        self._active_key: Optional[Tuple[str, ...]] = None
+        self._seen = _SortedRuns()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the next chunk of rows."""
+        # Unnested exports only carry event fields on the first row of each event
+        if 'event_name' in chunk.columns:
+            is_event = chunk['event_name'].notna().to_numpy()
+        else:
+            is_event = np.ones(len(chunk), dtype=bool)
+
+        missing = chunk.isna()
+        nulls = missing.sum()
+        event_nulls = missing[is_event].sum()
+        if self.null_counts is None:
+            self.null_counts, self.event_null_counts = nulls, event_nulls
+        else:
+            self.null_counts = self.null_counts.add(nulls, fill_value=0)
+            self.event_null_counts = self.event_null_counts.add(event_nulls, fill_value=0)
+
+        if self._active_key is None:
+            self._active_key = tuple(column for column in self.key_columns if column in chunk.columns)
+        key = list(self._active_key)
+        positions = self.rows + np.flatnonzero(is_event)
+        self.rows += len(chunk)
+        self.events += len(positions)
+        if not key or not len(positions):
+            return
+
+        keys = chunk.loc[is_event, key]
+        hashes = pd.util.hash_pandas_object(_normalize_keys(keys), index=False).to_numpy()
+        unique, first_in_chunk, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        # Sorted needles keep the binary searches cache-friendly
+        first_rows = self._seen.lookup(unique)[inverse]
+        is_first = np.zeros(len(hashes), dtype=bool)
+        is_first[first_in_chunk] = True
+        new = is_first & (first_rows < 0)
+        self._seen.add(hashes[new], positions[new])
+
+        duplicates = np.flatnonzero(~new)
+        if not len(duplicates):
+            return
+        originals = np.where(first_rows >= 0, first_rows, positions[first_in_chunk[inverse]])
+        key_values = keys.iloc[duplicates].to_dict("records")
+        for i, values in zip(duplicates, key_values):
+            cluster = self.clusters.get(int(hashes[i]))
+            if cluster is None:
+                cluster = DuplicateCluster(key=values, count=1, rows=[int(originals[i])])
+                self.clusters[int(hashes[i])] = cluster
+            cluster.count += 1
+            if len(cluster.rows) < MAX_CLUSTER_ROWS:
+                cluster.rows.append(int(positions[i]))
+
+    def report(self) -> QualityReport:
+        null_rates = pd.Series(dtype="float64")
+        if self.null_counts is not None and self.rows:
+            nested = self.null_counts.index.str.startswith(NESTED_PREFIXES)
+            null_rates = (self.event_null_counts / max(self.events, 1)).where(
+                ~nested, self.null_counts / self.rows
+            )
+        return QualityReport(
+            rows=self.rows,
+            events=self.events,
+            null_rates=null_rates,
+            duplicate_events=sum(cluster.count - 1 for cluster in self.clusters.values()),
+            clusters=list(self.clusters.values()),
+            key_columns=self._active_key or ()
+        )
+
+def profile_quality(df: pd.DataFrame, chunk_rows: int = 200000) -> QualityReport:
+    """
+    Profile a loaded export in chunks, bounding the temporary memory of wide frames.
+
+    Args:
+        df: Raw GA4 export
+        chunk_rows: Rows per chunk
+
+    Returns:
+        QualityReport with null rates over all rows and duplicate events
+    """
+    profiler = QualityProfiler()
+    for start in range(0, len(df), chunk_rows):
+        profiler.update(df.iloc[start:start + chunk_rows])
+    return profiler.report()
+
+_CACHE: "OrderedDict[str, QualityReport]" = OrderedDict()
+_CACHE_SIZE = 16
+_CACHE_LOCK = threading.Lock()
+# Per-version locks, so concurrent callers wait for one computation
+_COMPUTE_LOCKS: Dict[str, threading.Lock] = {}
+
+def get_quality_report(df: pd.DataFrame, dataset_version: str) -> QualityReport:
+    """
+    Get the quality report of a dataset, profiling it once per dataset version.
+
+    Args:
+        df: Raw GA4 export
+        dataset_version: Fingerprint of the dataset (see GA4Preprocessor.dataset_version)
+
+    Returns:
+        Cached or freshly computed QualityReport
+    """
+    with _CACHE_LOCK:
+        if dataset_version in _CACHE:
+            _CACHE.move_to_end(dataset_version)
+            return _CACHE[dataset_version]
+        compute_lock = _COMPUTE_LOCKS.setdefault(dataset_version, threading.Lock())
+
+    with compute_lock:
+        with _CACHE_LOCK:
+            if dataset_version in _CACHE:
+                return _CACHE[dataset_version]
+        report = profile_quality(df)
+
+        with _CACHE_LOCK:
+            _CACHE[dataset_version] = report
+            _COMPUTE_LOCKS.pop(dataset_version, None)
+            while len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return report
@@ -0,0 +1,240 @@
+"""Projected, typed reading of GA4 CSV exports.
+
+GA4 exports carry hundreds of columns, most of them empty for any given
+property. The header and a sample of rows are read first: the file is
+validated before the full parse, and the full parse then pins the dtypes
+the sample shows and drops the columns that turn out to be empty across the
+whole file, so memory follows the useful columns rather than the export's
+width. Sparse fields such as ecommerce.* are only set on rare events, so a
+column empty in the sample is never dropped on the sample's evidence alone.
+
+With pyarrow installed the full parse uses Arrow's multithreaded CSV
+reader and hands its columns to pandas without an intermediate copy.
+Gzip, zstd and bzip2 exports are recognized by their magic bytes and
+decompressed while streaming, whatever their file name.
+"""
+import os
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from .config import Config
+from .preprocessor import GA4Preprocessor
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+# Leading bytes -> codec name (the same in pandas and pyarrow)
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"BZh": "bz2",
+}
+
+# File name suffixes of compressed exports
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".bz2")
+
+# pandas dtype -> Arrow type name for the columns pinned by plan_columns
+ARROW_TYPES = {"int64": "int64", "float64": "float64", "str": "string"}
+
+def _rewind(source: Source) -> Source:
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+def detect_compression(source: Source) -> Optional[str]:
+    """Codec of a compressed file from its magic bytes, None for plain text."""
+    if hasattr(source, "read"):
+        head = _rewind(source).read(4)
+        _rewind(source)
+    else:
+        with open(source, "rb") as f:
+            head = f.read(4)
+    return next((codec for magic, codec in MAGIC_BYTES.items() if head.startswith(magic)), None)
+
+def _arrow_available() -> bool:
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _resolve_engine(engine: Optional[str]) -> str:
+    engine = engine or Config.get_str("ORIXA_CSV_ENGINE", "auto")
+    if engine not in ("auto", "pyarrow", "pandas"):
+        print(f"Warning: Unknown CSV engine {engine!r}, using auto")
+        engine = "auto"
+    if engine == "auto":
+        return "pyarrow" if _arrow_available() else "pandas"
+    if engine == "pyarrow" and not _arrow_available():
+        print("Warning: pyarrow is not installed, parsing CSV with pandas")
+        return "pandas"
+    return engine
+
+def _arrow_stream(source: Source, compression: Optional[str]):
+    """Open a (decompressing) Arrow input stream, without copying in-memory uploads."""
+    import pyarrow as pa
+
+    if hasattr(source, "getbuffer"):
+        source = pa.py_buffer(source.getbuffer())
+    elif hasattr(source, "read"):
+        source = _rewind(source)
+    elif isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    return pa.input_stream(source, compression=compression)
+
+def sniff(
+    source: Source,
+    sample_rows: int,
+    compression: Optional[str] = None,
+    engine: str = "pandas"
+) -> pd.DataFrame:
+    """Read the header and the first sample_rows rows."""
+    if engine == "pyarrow":
+        # Arrow decompresses every codec it was built with, zstd included
+        with _arrow_stream(source, compression) as stream:
+            return pd.read_csv(stream, nrows=sample_rows)
+    return pd.read_csv(_rewind(source), nrows=sample_rows, compression=compression)
+
+def _read_arrow(
+    source: Source,
+    compression: Optional[str],
+    dtypes: Dict[str, str],
+    droppable: List[str]
+) -> pd.DataFrame:
+    """
+    Parse with Arrow's multithreaded CSV reader into the layout pd.read_csv produces.
+
+    Columns in droppable that hold no value anywhere in the file are
+    removed before conversion to pandas.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    def read(column_types: Dict[str, str]) -> "pa.Table":
+        with _arrow_stream(source, compression) as stream:
+            return csv.read_csv(
+                stream,
+                read_options=csv.ReadOptions(use_threads=True),
+                # Quoted values such as page titles may span lines
+                parse_options=csv.ParseOptions(newlines_in_values=True),
+                convert_options=csv.ConvertOptions(
+                    column_types={column: ARROW_TYPES[dtype] for column, dtype in column_types.items()},
+                    strings_can_be_null=True
+                )
+            )
+
+    try:
+        table = read(dtypes)
+    except pa.ArrowInvalid:
+        # A value later in the file doesn't fit the sample's type; let Arrow infer instead
+        try:
+            table = read({})
+        except pa.ArrowInvalid as e:
+            # Malformed rows; raised like pandas' parse errors so callers handle both alike
+            raise pd.errors.ParserError(f"Error parsing CSV: {e}") from e
+
+    # Arrow types columns without any value as null
+    empty = set(droppable)
+    table = table.drop_columns([
+        field.name for field in table.schema if field.name in empty and pa.types.is_null(field.type)
+    ])
+
+    # pandas reads columns without any value as float NaN, Arrow as nulls
+    gappy_bools = []
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        elif pa.types.is_boolean(field.type) and table.column(i).null_count:
+            gappy_bools.append(field.name)
+    # Release Arrow buffers as they're converted, so peak memory stays near one copy
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    # Booleans with gaps become objects either way, holding None rather than NaN
+    for column in gappy_bools:
+        df[column] = df[column].where(df[column].notna(), float("nan"))
+    return df
+
+def plan_columns(sample: pd.DataFrame) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Choose the columns to keep and their dtypes from a sample.
+
+    Columns preprocessing uses are always kept, as are columns the sample
+    has a value in; the others are only dropped if the full parse finds
+    them empty too. Dtypes are pinned for columns whose sample type is
+    unambiguous; empty and boolean columns are left to inference.
+
+    Returns:
+        Tuple of (columns to keep, in file order; dtype per column)
+    """
+    columns = [
+        column for column in sample.columns
+        if column in GA4Preprocessor.USED_COLUMNS
+        or column.startswith(GA4Preprocessor.USED_PREFIXES)
+        or sample[column].notna().any()
+    ]
+    dtypes = {}
+    for column in columns:
+        values = sample[column]
+        if not values.notna().any() or pd.api.types.is_bool_dtype(values):
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            dtypes[column] = "int64"
+        elif pd.api.types.is_float_dtype(values):
+            dtypes[column] = "float64"
+        elif values.dropna().map(type).eq(str).all():
+            dtypes[column] = "str"
+    return columns, dtypes
+
+def read_ga4_csv(
+    source: Source,
+    sample_rows: Optional[int] = None,
+    project: Optional[bool] = None,
+    engine: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Read a GA4 export, validating it and projecting its columns before the full parse.
+
+    Args:
+        source: Path or binary file object (e.g. an upload) of the CSV,
+            optionally gzip, zstd or bzip2 compressed
+        sample_rows: Rows sniffed first (default: ORIXA_CSV_SAMPLE_ROWS)
+        project: Drop columns that are empty throughout the file (default: ORIXA_CSV_PROJECTION)
+        engine: ``pyarrow``, ``pandas`` or ``auto`` (default: ORIXA_CSV_ENGINE)
+
+    Returns:
+        The export's relevant columns
+
+    Raises:
+        pandas.errors.ParserError: If the file is not valid CSV
+        ValueError: If the file is not a GA4 export
+    """
+    if sample_rows is None:
+        sample_rows = Config.get_int("ORIXA_CSV_SAMPLE_ROWS", 5000)
+    sample_rows = max(sample_rows, 1)
+    if project is None:
+        project = Config.get_bool("ORIXA_CSV_PROJECTION", True)
+
+    engine = _resolve_engine(engine)
+    compression = detect_compression(source)
+
+    sample = sniff(source, sample_rows, compression, engine)
+    missing = [column for column in GA4Preprocessor.REQUIRED_COLUMNS if column not in sample.columns]
+    if missing:
+        raise ValueError(
+            "Invalid GA4 data format. Please ensure your export includes: "
+            "event_date, event_name, and event_timestamp"
+        )
+
+    columns, dtypes = plan_columns(sample)
+    # Empty in the sample, but a rare event later in the file may set them
+    droppable = [column for column in sample.columns if column not in columns] if project else []
+    if len(sample) < sample_rows:
+        # The sample is the whole file
+        return sample.drop(columns=droppable)
+
+    if engine == "pyarrow":
+        return _read_arrow(source, compression, dtypes, droppable)
+    try:
+        df = pd.read_csv(_rewind(source), dtype=dtypes, compression=compression)
+    except (ValueError, TypeError):
+        # A value later in the file doesn't fit the sample's type
+        # (e.g. a gap in an integer column); let pandas infer instead
+        df = pd.read_csv(_rewind(source), compression=compression)
+    return df.drop(columns=[column for column in droppable if df[column].isna().all()])
@@ -0,0 +1,143 @@
+"""Record/replay chat model for reproducible offline benchmarks."""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Message fields that differ between identical calls (run ids, provider metadata)
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+def request_key(model_id: str, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> str:
+    """
+    Hash a chat request into a recording key.
+
+    Args:
+        model_id: Model that answers the request
+        messages: Prompt messages
+        stop: Stop sequences
+        **kwargs: Bound call options such as functions or tools
+
+    Returns:
+        Hex digest identifying the request
+    """
+    normalized = []
+    for message in messages:
+        data = message_to_dict(message)["data"]
+        normalized.append({
+            "type": message.type,
+            **{k: v for k, v in data.items() if k not in _VOLATILE_FIELDS}
+        })
+    payload = {"model": model_id, "messages": normalized, "stop": stop, "options": kwargs}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+class RecordReplayChatModel(BaseChatModel):
+    """
+    Chat model that records another model's responses to disk and replays them.
+
+    Each request is stored as one JSON file named by its request key,
+    together with the latency of the live call. Replays sleep for that
+    latency (scaled by ``speed``), so the analyze/ask pipeline can be
+    load-tested without API keys while keeping realistic timings.
+
+    Modes:
+        record: Always call ``inner`` and overwrite recordings
+        replay: Only serve recordings; unknown requests raise ValueError
+        auto: Serve recordings when present, record the rest
+    """
+
+    recording_dir: str
+    mode: str = "replay"
+    model_id: str = ""
+    speed: float = 1.0
+    inner: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "record-replay"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.recording_dir, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, key: str, result: ChatResult, latency: float) -> None:
+        """Write a recording atomically so concurrent recorders never see partial files."""
+        os.makedirs(self.recording_dir, exist_ok=True)
+        recording = {
+            "model": self.model_id,
+            "latency_seconds": latency,
+            "messages": [message_to_dict(generation.message) for generation in result.generations],
+            "llm_output": result.llm_output,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.recording_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(recording, f, default=str)
+        os.replace(tmp_path, self._path(key))
+
+    def _replay(self, key: str) -> Optional[tuple]:
+        """Get (latency, result) of a recorded request, or None if it must be recorded."""
+        recording = self._load(key) if self.mode != "record" else None
+        if recording is not None:
+            generations = [
+                ChatGeneration(message=message)
+                for message in messages_from_dict(recording["messages"])
+            ]
+            result = ChatResult(generations=generations, llm_output=recording.get("llm_output"))
+            return recording["latency_seconds"] * self.speed, result
+
+        if self.mode == "replay" or self.inner is None:
+            raise ValueError(
+                f"No recording for request {key[:12]} in {self.recording_dir}; "
+                "record it first with ORIXA_REPLAY_MODE=record"
+            )
+        return None
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        key = request_key(self.model_id, messages, stop, **kwargs)
+        replayed = self._replay(key)
+        if replayed is not None:
+            latency, result = replayed
+            time.sleep(latency)
+            return result
+
+        start = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        self._save(key, result, time.perf_counter() - start)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        key = request_key(self.model_id, messages, stop, **kwargs)
+        replayed = self._replay(key)
+        if replayed is not None:
+            latency, result = replayed
+            await asyncio.sleep(latency)
+            return result
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+        self._save(key, result, time.perf_counter() - start)
+        return result
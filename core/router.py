@@ -0,0 +1,202 @@
+"""Deterministic fast path for common GA4 questions."""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import pandas as pd
+from .aggregates import GA4Aggregates
+
+@dataclass
+class Intent:
+    """A recognizable question type answered from precomputed aggregates."""
+    name: str
+    breakdown: str
+    title: str
+    subject: str
+    patterns: Tuple[str, ...]
+
+    def matches(self, question: str) -> bool:
+        """Check if the question matches any of the intent's patterns."""
+        return any(re.search(pattern, question) for pattern in self.patterns)
+
+INTENTS: List[Intent] = [
+    Intent(
+        name="top_pages",
+        breakdown="pages",
+        title="Top Pages",
+        subject="page",
+        patterns=(r"\b(top|most|popular|visited|viewed|best)\b.*\bpages?\b",
+                  r"\bpages?\b.*\b(most|top|views?|visited|popular)\b"),
+    ),
+    Intent(
+        name="event_counts",
+        breakdown="events",
+        title="Event Counts",
+        subject="event",
+        patterns=(r"\b(how many|count|number of|top|most|common)\b.*\bevents?\b",
+                  r"\bevents?\b.*\b(counts?|breakdown|distribution|types?)\b"),
+    ),
+    Intent(
+        name="traffic_sources",
+        breakdown="sources",
+        title="Traffic Sources",
+        subject="traffic source",
+        patterns=(r"\b(traffic )?sources?\b", r"\bmedium\b", r"\bwhere .* (come|coming) from\b",
+                  r"\breferr(er|al)s?\b", r"\bchannels?\b"),
+    ),
+    Intent(
+        name="device_split",
+        breakdown="devices",
+        title="Device Split",
+        subject="device",
+        patterns=(r"\bdevices?\b", r"\bmobile (vs|versus|or) desktop\b"),
+    ),
+    Intent(
+        name="countries",
+        breakdown="countries",
+        title="Top Countries",
+        subject="country",
+        patterns=(r"\bcountr(y|ies)\b", r"\bgeo(graphy|graphic)?\b", r"\blocations?\b"),
+    ),
+    Intent(
+        name="daily_trend",
+        breakdown="daily",
+        title="Daily Trend",
+        subject="day",
+        patterns=(r"\b(daily|per day|by day|each day|over time)\b", r"\btrends?\b",
+                  r"\b(busiest|peak) days?\b"),
+    ),
+]
+
+# Questions asking for reasoning, joins or filters need the full agent
+COMPLEX_PATTERNS: Tuple[str, ...] = (
+    r"\bwhy\b", r"\bcompar", r"\bcorrelat", r"\bpredict", r"\bforecast",
+    r"\bconver(t|sion)", r"\bjourney", r"\bfunnel", r"\bengag", r"\bbounce",
+    r"\brevenue", r"\bsessions?\b", r"\bduration\b", r"\busers?\b.*\bwho\b",
+    r"\bexcept\b", r"\bexclud", r"\bwhere\b(?!.* from\b)", r"\band\b.*\b(pages?|events?|sources?|devices?)\b",
+)
+
+# Dates, relative periods and ranges filter the data; aggregates cover the whole export
+DATE_PATTERNS: Tuple[str, ...] = (
+    r"\b\d{8}\b", r"\b\d{4}-\d{1,2}(-\d{1,2})?\b", r"\b\d{1,2}/\d{1,2}(/\d{2,4})?\b", r"\b(19|20)\d{2}\b",
+    r"\b(jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec)\b",
+    r"\b(january|february|march|april|june|july|august|september|october|november|december)\b",
+    r"\bmay\s+\d", r"\d(st|nd|rd|th)?\s+(of\s+)?may\b",
+    r"\b(today|tonight|yesterday|weekends?|ytd|mtd|q[1-4])\b",
+    r"\b(mon|tues|wednes|thurs|fri|satur|sun)days?\b",
+    r"\b(last|this|past|previous|next|prior)\s+(\d+\s+)?(days?|weeks?|months?|quarters?|years?)\b",
+    r"\b\d+\s+(days?|weeks?|months?|years?)\s+ago\b",
+    r"\b(since|until|till|before|after|between|during)\b", r"\bfrom\b.*\bto\b",
+)
+
+# Follow-ups referring to earlier turns ("trend for that page") need the conversation
+BACK_REFERENCE_PATTERNS: Tuple[str, ...] = (
+    r"\b(it|its|they|them|their)\b",
+    r"\b(that|this|those|these|same)\s+(\w+\s+)?(pages?|events?|sources?|devices?|countr(y|ies)|days?|ones?|channels?)\b",
+    r"\b(above|aforementioned|mentioned|previous|earlier)\b",
+)
+
+class IntentRouter:
+    """Maps recognized questions to precomputed aggregations."""
+
+    def __init__(self, intents: Optional[List[Intent]] = None):
+        self.intents = intents if intents is not None else INTENTS
+
+    def match(self, question: str, aggregates: GA4Aggregates) -> Optional[Intent]:
+        """
+        Find the single intent that answers a question.
+
+        Args:
+            question: The user's question
+            aggregates: Aggregates of the loaded dataset
+
+        Returns:
+            The matching intent, or None if the question should go to the agent
+        """
+        text = question.lower().strip()
+        if any(
+            re.search(pattern, text)
+            for pattern in COMPLEX_PATTERNS + DATE_PATTERNS + BACK_REFERENCE_PATTERNS
+        ):
+            return None
+
+        matches = [intent for intent in self.intents if intent.matches(text)]
+        if len(matches) != 1:
+            return None
+        intent = matches[0]
+
+        # Mentioning a value from another breakdown (e.g. "pages on mobile")
+        # means the question filters the data, which aggregates can't do
+        for name, counts in aggregates.breakdowns.items():
+            if name == intent.breakdown:
+                continue
+            for value in counts.index[:50]:
+                value_text = str(value).lower()
+                if len(value_text) > 2 and re.search(rf"\b{re.escape(value_text)}\b", text):
+                    return None
+
+        if intent.breakdown == "daily":
+            return intent if not aggregates.daily_events.empty else None
+        return intent if intent.breakdown in aggregates.breakdowns else None
+
+    @staticmethod
+    def supporting_data(intent: Intent, aggregates: GA4Aggregates, top_k: int) -> str:
+        """Render the aggregate behind an intent as a markdown list."""
+        if intent.breakdown == "daily":
+            # The busiest days, like the top values of the other breakdowns
+            counts = aggregates.daily_events.nlargest(top_k)
+            total = int(aggregates.daily_events.sum())
+        else:
+            counts = aggregates.top(intent.breakdown, top_k)
+            total = int(aggregates.breakdowns[intent.breakdown].sum())
+
+        lines = [
+            f"- **{value}**: {count:,} ({count / total:.1%})" if total else f"- **{value}**: {count:,}"
+            for value, count in counts.items()
+        ]
+        lines.append(f"- Period: {aggregates.date_start} to {aggregates.date_end}")
+        return "\n".join(lines)
+
+    def answer(self, intent: Intent, aggregates: GA4Aggregates, top_k: int = 10) -> str:
+        """
+        Answer an intent directly from aggregates, in the ask() response format.
+
+        Args:
+            intent: Intent returned by ``match``
+            aggregates: Aggregates of the loaded dataset
+            top_k: Number of values to list
+
+        Returns:
+            Markdown answer
+        """
+        supporting = self.supporting_data(intent, aggregates, top_k)
+
+        if intent.breakdown == "daily":
+            daily: pd.Series = aggregates.daily_events
+            peak_day, peak_count = daily.idxmax(), int(daily.max())
+            answer = (
+                f"Across {len(daily)} days there were {int(daily.sum()):,} events, "
+                f"averaging {daily.mean():,.0f} per day. The busiest day was "
+                f"{peak_day} with {peak_count:,} events."
+            )
+            recommendation = (
+                f"Review what drove activity on {peak_day} and repeat it on quieter days."
+            )
+        else:
+            counts = aggregates.breakdowns[intent.breakdown]
+            top_value, top_count = counts.index[0], int(counts.iloc[0])
+            total = int(counts.sum())
+            answer = (
+                f"The top {intent.subject} is **{top_value}** with {top_count:,} "
+                f"({top_count / total:.1%}) of {total:,} in total, across "
+                f"{len(counts)} distinct {intent.subject} values."
+            )
+            recommendation = (
+                f"Prioritize **{top_value}** and look for growth in the "
+                f"{intent.subject} values just below it."
+            )
+
+        return (
+            f"### 💡 Answer\n{answer}\n\n"
+            f"### 📊 Supporting Data\n{supporting}\n\n"
+            f"### 🎯 Recommendation\n{recommendation}"
+        )
@@ -0,0 +1,405 @@
+"""Out-of-process execution of LLM-generated pandas code."""
+import ast
+import atexit
+import multiprocessing as mp
+import os
+import re
+import signal
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict, List, Optional, Set, Type
+import numpy as np
+import pandas as pd
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+try:
+    import resource
+except ImportError:  # Windows has no setrlimit; timeouts still apply
+    resource = None
+
+DATASET_DIR = os.path.join(tempfile.gettempdir(), "orixa-datasets")
+
+# Tool sessions whose variables a worker keeps between calls
+MAX_SESSIONS_PER_WORKER = 32
+
+def publish_dataset(df: pd.DataFrame, dataset_version: str) -> str:
+    """
+    Write a dataset to disk once so worker processes can attach to it.
+
+    Uses the Arrow IPC (Feather) format when pyarrow is installed, which
+    workers open as a memory map, and falls back to a pickle otherwise.
+
+    Args:
+        df: DataFrame to publish
+        dataset_version: Fingerprint of the dataset, used as the file name
+
+    Returns:
+        Path of the published dataset
+    """
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    for extension in (".feather", ".pkl"):
+        path = os.path.join(DATASET_DIR, dataset_version + extension)
+        if os.path.exists(path):
+            return path
+
+    tmp_path = os.path.join(DATASET_DIR, f"{dataset_version}.{os.getpid()}.tmp")
+    try:
+        _arrow_compatible(df).to_feather(tmp_path)
+        path = os.path.join(DATASET_DIR, dataset_version + ".feather")
+    except Exception:
+        # pyarrow missing or columns with mixed types Arrow can't store
+        df.to_pickle(tmp_path)
+        path = os.path.join(DATASET_DIR, dataset_version + ".pkl")
+    os.replace(tmp_path, path)
+    return path
+
+def _arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make mixed-type object columns storable in Arrow.
+
+    Flattened event params mix strings and numbers in one column; these
+    become numeric when every value parses as a number, text otherwise.
+    """
+    import pyarrow as pa
+
+    df = df.reset_index(drop=True)
+    converted = {}
+    for column in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = df[column]
+            try:
+                converted[column] = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                converted[column] = values.where(values.isna(), values.astype(str))
+    return df.assign(**converted) if converted else df
+
+def _load_dataset(path: str) -> pd.DataFrame:
+    """Open a published dataset, memory-mapping it when possible."""
+    if path.endswith(".feather"):
+        from pyarrow import feather
+        # Numeric columns stay views of the mapped file, shared by all workers
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+    return pd.read_pickle(path)
+
+def sanitize_code(code: str) -> str:
+    """Strip markdown fences and a leading 'python' the LLM may add."""
+    code = re.sub(r"^(\s|`)*(?i:python)?\s*", "", code)
+    return re.sub(r"(\s|`)*$", "", code)
+
+def execute_code(code: str, namespace: Dict[str, Any]) -> str:
+    """
+    Execute code like LangChain's PythonAstREPLTool and return its output.
+
+    All statements but the last are executed; the last is evaluated so its
+    value is returned, falling back to captured stdout.
+    """
+    try:
+        tree = ast.parse(sanitize_code(code))
+        exec(ast.unparse(ast.Module(tree.body[:-1], type_ignores=[])), namespace)
+        last = ast.unparse(ast.Module(tree.body[-1:], type_ignores=[]))
+        buffer = StringIO()
+        try:
+            with redirect_stdout(buffer):
+                value = eval(last, namespace)
+            return buffer.getvalue() if value is None else str(value)
+        except Exception:
+            with redirect_stdout(buffer):
+                exec(last, namespace)
+            return buffer.getvalue()
+    except Exception as e:
+        return "{}: {}".format(type(e).__name__, str(e))
+
+def _raise_cpu_limit(signum, frame):
+    raise TimeoutError("CPU time limit exceeded")
+
+def _enable_copy_on_write() -> bool:
+    """Turn on copy-on-write (always on from pandas 3); False if pandas lacks it."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except (KeyError, pd.errors.OptionError):
+        return False
+    return True
+
+def _limit_memory(memory_limit_mb: int, paths: List[str]) -> None:
+    """
+    Cap the worker's address space at memory_limit_mb on top of its datasets.
+
+    RLIMIT_AS counts memory-mapped files, so the datasets' size is added
+    for the limit to apply to the memory user code allocates.
+    """
+    if resource is None or memory_limit_mb <= 0:
+        return
+    limit = memory_limit_mb * 1024 * 1024 + sum(os.path.getsize(path) for path in paths)
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _worker_main(conn, memory_limit_mb: int) -> None:
+    """Worker loop: receive code, run it against the dataset, send output back."""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    # Sessions get shallow copies of the shared frame; with copy-on-write
+    # their changes stay their own, without it they need deep copies
+    copy_on_write = _enable_copy_on_write()
+
+    datasets: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+    # Tool id -> (dataset path, columns, namespace); like the in-process REPL,
+    # variables defined in one agent step are visible in the next
+    sessions: "OrderedDict[str, tuple]" = OrderedDict()
+    conn.send(("ready", None))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        code, path, columns, session_id, cpu_seconds = message
+        try:
+            if path not in datasets:
+                _limit_memory(memory_limit_mb, list(datasets) + [path])
+                datasets[path] = _load_dataset(path)
+                while len(datasets) > 2:
+                    evicted, _ = datasets.popitem(last=False)
+                    for stale in [key for key, (used, _, _) in sessions.items() if used == evicted]:
+                        del sessions[stale]
+                _limit_memory(memory_limit_mb, list(datasets))
+            conn.send(("attached", None))
+
+            scope = tuple(columns) if columns else None
+            session = sessions.get(session_id)
+            if session is None or session[:2] != (path, scope):
+                df = datasets[path]
+                if columns:
+                    df = df[[col for col in columns if col in df.columns]]
+                # Changes one session makes to df must not reach the others
+                df = df.copy(deep=not copy_on_write)
+                session = (path, scope, {"df": df, "pd": pd, "np": np})
+                sessions[session_id] = session
+                while len(sessions) > MAX_SESSIONS_PER_WORKER:
+                    sessions.popitem(last=False)
+            sessions.move_to_end(session_id)
+            namespace = session[2]
+
+            if resource is not None and cpu_seconds > 0:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                used = int(usage.ru_utime + usage.ru_stime)
+                hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+                soft = used + cpu_seconds
+                if hard != resource.RLIM_INFINITY:
+                    soft = min(soft, hard)
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+            output = execute_code(code, namespace)
+        except BaseException as e:
+            output = "{}: {}".format(type(e).__name__, str(e))
+        conn.send(("result", output))
+
+class _Worker:
+    """A sandbox worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_for(self, state: str, timeout: float) -> Any:
+        """Wait for a message of the given state from the worker."""
+        if not self.conn.poll(timeout):
+            raise TimeoutError(state)
+        received, payload = self.conn.recv()
+        if received != state:
+            raise RuntimeError(f"Expected {state!r} from worker, got {received!r}")
+        return payload
+
+    def kill(self) -> None:
+        """Terminate the worker immediately."""
+        try:
+            self.process.kill()
+            self.process.join(timeout=1)
+        finally:
+            self.conn.close()
+
+class SandboxPool:
+    """Pool of worker processes that execute agent code in isolation."""
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float = 30,
+        cpu_seconds: int = 20,
+        memory_limit_mb: int = 2048
+    ):
+        """
+        Start the worker processes.
+
+        Args:
+            workers: Number of worker processes
+            timeout: Wall-clock seconds before a call is abandoned and its worker killed
+            cpu_seconds: CPU seconds allowed per call (POSIX only)
+            memory_limit_mb: Address-space limit per worker in MB, on top of the
+                datasets it has loaded (POSIX only, 0 disables)
+        """
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.startup_timeout = max(timeout, 120)
+        # Forking a threaded Streamlit server is unsafe, so always spawn
+        self._context = mp.get_context("spawn")
+        self._workers = [_Worker(self._context, memory_limit_mb) for _ in range(max(workers, 1))]
+        self._busy: Set[int] = set()
+        # Session id -> worker holding its variables, most recently used last
+        self._affinity: "OrderedDict[str, int]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _acquire(self, session_id: str) -> int:
+        """Wait for the worker of a session, or assign a new session to the least loaded idle worker."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Sandbox pool is shut down")
+                index = self._affinity.get(session_id)
+                if index is None:
+                    idle = [i for i in range(len(self._workers)) if i not in self._busy]
+                    if idle:
+                        load = {i: 0 for i in idle}
+                        for assigned in self._affinity.values():
+                            if assigned in load:
+                                load[assigned] += 1
+                        index = min(idle, key=load.get)
+                        self._affinity[session_id] = index
+                        while len(self._affinity) > MAX_SESSIONS_PER_WORKER * len(self._workers):
+                            self._affinity.popitem(last=False)
+                if index is not None and index not in self._busy:
+                    self._affinity.move_to_end(session_id)
+                    self._busy.add(index)
+                    return index
+                self._condition.wait()
+
+    def _release(self, index: int) -> None:
+        with self._condition:
+            self._busy.discard(index)
+            self._condition.notify_all()
+            closed = self._closed
+        if closed:
+            self._stop(self._workers[index])
+
+    @staticmethod
+    def _stop(worker: _Worker) -> None:
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.kill()
+
+    def run(
+        self,
+        code: str,
+        dataset_path: str,
+        columns: Optional[List[str]] = None,
+        session_id: str = ""
+    ) -> str:
+        """
+        Execute code against a published dataset.
+
+        Calls of a session run in the same worker and share one namespace,
+        so variables from earlier calls stay defined; a timeout or crash
+        replaces the worker and starts its sessions afresh.
+
+        Args:
+            code: Python code generated by the agent
+            dataset_path: Path returned by ``publish_dataset``
+            columns: Optional subset of columns exposed as ``df``
+            session_id: Identifies the caller (e.g. one agent tool) whose variables are kept
+
+        Returns:
+            The code's output, or an error description
+        """
+        index = self._acquire(session_id)
+        worker = self._workers[index]
+        try:
+            # Start-up and dataset loading don't count against the call timeout
+            if not worker.ready:
+                worker.wait_for("ready", self.startup_timeout)
+                worker.ready = True
+            worker.conn.send((code, dataset_path, columns, session_id, self.cpu_seconds))
+            worker.wait_for("attached", self.startup_timeout)
+            return worker.wait_for("result", self.timeout)
+        except TimeoutError:
+            worker.kill()
+            self._workers[index] = _Worker(self._context, self.memory_limit_mb)
+            return f"TimeoutError: Execution exceeded {self.timeout:g} seconds"
+        except (EOFError, OSError, RuntimeError):
+            # The worker died (e.g. killed by the OS); replace it
+            worker.kill()
+            self._workers[index] = _Worker(self._context, self.memory_limit_mb)
+            return "RuntimeError: Execution worker crashed"
+        finally:
+            self._release(index)
+
+    def shutdown(self) -> None:
+        """Stop idle workers now and busy ones when their call returns."""
+        with self._condition:
+            self._closed = True
+            idle = [worker for i, worker in enumerate(self._workers) if i not in self._busy]
+            self._condition.notify_all()
+        for worker in idle:
+            self._stop(worker)
+
+_POOL: Optional[SandboxPool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_sandbox_pool() -> SandboxPool:
+    """Get the process-wide sandbox pool, starting it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from .config import Config
+            _POOL = SandboxPool(
+                workers=Config.get_int("ORIXA_SANDBOX_WORKERS", os.cpu_count() or 2),
+                timeout=Config.get_int("ORIXA_SANDBOX_TIMEOUT", 30),
+                cpu_seconds=Config.get_int("ORIXA_SANDBOX_CPU_SECONDS", 20),
+                memory_limit_mb=Config.get_int("ORIXA_SANDBOX_MEMORY_MB", 2048)
+            )
+            atexit.register(_POOL.shutdown)
+        return _POOL
+
+class PythonInputs(BaseModel):
+    """Input schema matching LangChain's python_repl_ast tool."""
+    query: str = Field(description="code snippet to run")
+
+class SandboxedPythonTool(BaseTool):
+    """Drop-in replacement for python_repl_ast that runs code in the sandbox pool."""
+
+    name: str = "python_repl_ast"
+    description: str = (
+        "A Python shell. Use this to execute python commands. "
+        "Input should be a valid python command. "
+        "When using this tool, sometimes output is abbreviated - "
+        "make sure it does not look abbreviated before using it in your answer."
+    )
+    args_schema: Type[BaseModel] = PythonInputs
+    dataset_path: str
+    columns: Optional[List[str]] = None
+    # Variables persist across calls of this tool, as with python_repl_ast's locals
+    session_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+
+    def _run(self, query: str, run_manager: Any = None) -> str:
+        """Run the code in a sandbox worker."""
+        return get_sandbox_pool().run(query, self.dataset_path, self.columns, self.session_id)
@@ -0,0 +1,379 @@
+"""Provider-aware request scheduling: rate limits, retries and hedging."""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from .config import Config
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            per_minute: Tokens added per minute (0 or less means unlimited)
+            capacity: Maximum burst size (defaults to one minute's worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Take tokens from the bucket, blocking until they are available.
+
+        Requests larger than the capacity are allowed once the bucket is full.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(amount)
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self, amount: float = 1) -> float:
+        """Like acquire, but waits without blocking the event loop."""
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(amount)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def _try_acquire(self, amount: float) -> float:
+        """Take tokens if available; otherwise return the seconds to wait."""
+        if self.unlimited:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+class LatencyTracker:
+    """Rolling window of recent latencies for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Get the q-th percentile (0-100) of recorded latencies."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+@dataclass
+class ProviderLimits:
+    """Rate limits for one provider (0 means unlimited)."""
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+
+    @classmethod
+    def from_env(cls, provider: str) -> "ProviderLimits":
+        """Read ORIXA_<PROVIDER>_RPM and ORIXA_<PROVIDER>_TPM."""
+        prefix = f"ORIXA_{provider.upper()}"
+        return cls(
+            requests_per_minute=Config.get_int(f"{prefix}_RPM", 0),
+            tokens_per_minute=Config.get_int(f"{prefix}_TPM", 0)
+        )
+
+def is_retryable(error: Exception) -> bool:
+    """Check if an error is a rate limit or transient provider failure."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return True
+    name = type(error).__name__
+    transient = ("RateLimit", "Timeout", "APIConnection", "ServiceUnavailable",
+                 "InternalServer", "Overloaded", "ResourceExhausted")
+    if any(marker in name for marker in transient):
+        return True
+    return "429" in str(error) or "rate limit" in str(error).lower()
+
+class RequestScheduler:
+    """Schedules model calls per provider with rate limits, retries and hedging."""
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        hedge_min_samples: int = 20,
+        max_workers: int = 32
+    ):
+        """
+        Args:
+            max_retries: Retries after the first attempt for retryable errors
+            base_delay: Backoff before the first retry, doubled each attempt
+            max_delay: Upper bound for a single backoff
+            hedge_min_samples: Latencies needed before p95 is trusted for hedging
+            max_workers: Threads available for hedged calls
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        # Latencies per (provider, operation): a single completion and a
+        # multi-step agent run have very different p95s
+        self._latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.stats = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0}
+
+    def configure(self, provider: str, limits: ProviderLimits) -> None:
+        """Set (or replace) the rate limits of a provider."""
+        with self._lock:
+            self._buckets[provider] = (
+                TokenBucket(limits.requests_per_minute),
+                TokenBucket(limits.tokens_per_minute)
+            )
+
+    def _provider_state(
+        self,
+        provider: str,
+        operation: str
+    ) -> Tuple[Tuple[TokenBucket, TokenBucket], LatencyTracker]:
+        with self._lock:
+            if provider not in self._buckets:
+                limits = ProviderLimits.from_env(provider)
+                self._buckets[provider] = (
+                    TokenBucket(limits.requests_per_minute),
+                    TokenBucket(limits.tokens_per_minute)
+                )
+            key = (provider, operation)
+            if key not in self._latencies:
+                self._latencies[key] = LatencyTracker()
+            return self._buckets[provider], self._latencies[key]
+
+    def latency_percentile(self, provider: str, q: float, operation: str = "call") -> Optional[float]:
+        """Get a latency percentile for a provider's operation, if any calls were recorded."""
+        _, tracker = self._provider_state(provider, operation)
+        return tracker.percentile(q)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call_with_retries(self, provider: str, fn: Callable[[], Any], tokens: int, operation: str) -> Any:
+        """Run fn under the provider's rate limits, retrying transient errors."""
+        (requests, token_bucket), tracker = self._provider_state(provider, operation)
+        attempt = 0
+        while True:
+            requests.acquire(1)
+            if tokens:
+                token_bucket.acquire(tokens)
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            tracker.record(time.perf_counter() - start)
+            return result
+
+    async def _acall_with_retries(
+        self,
+        provider: str,
+        fn: Callable[[], Awaitable[Any]],
+        tokens: int,
+        operation: str
+    ) -> Any:
+        """Async version of _call_with_retries."""
+        (requests, token_bucket), tracker = self._provider_state(provider, operation)
+        attempt = 0
+        while True:
+            await requests.aacquire(1)
+            if tokens:
+                await token_bucket.aacquire(tokens)
+            start = time.perf_counter()
+            try:
+                result = await fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            tracker.record(time.perf_counter() - start)
+            return result
+
+    def _hedge_delay(self, provider: str, operation: str, hedge: Optional[Tuple[str, Any]]) -> Optional[float]:
+        """Get the p95 of the primary provider's operation once enough latencies were recorded."""
+        if hedge is None:
+            return None
+        _, tracker = self._provider_state(provider, operation)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(95)
+
+    def call(
+        self,
+        provider: str,
+        fn: Callable[[], Any],
+        estimated_tokens: int = 0,
+        hedge: Optional[Tuple[str, Callable[[], Any]]] = None,
+        operation: str = "call"
+    ) -> Any:
+        """
+        Run a model call under the provider's limits.
+
+        A thread can't be cancelled, so when hedging the losing call keeps
+        running, and is billed, until it returns; use acall where possible.
+
+        Args:
+            provider: Provider name used for rate limits and latency tracking
+            fn: Function performing the call
+            estimated_tokens: Tokens debited from the provider's token bucket
+            hedge: Optional (provider, fn) fired if the primary call runs past
+                the p95 latency of the provider's operation; the first result wins
+            operation: Kind of call (e.g. a single completion or an agent run);
+                latencies and the hedging threshold are tracked per operation
+
+        Returns:
+            The result of whichever call finished first successfully
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+
+        p95 = self._hedge_delay(provider, operation, hedge)
+        if p95 is None:
+            return self._call_with_retries(provider, fn, estimated_tokens, operation)
+
+        primary = self._executor.submit(self._call_with_retries, provider, fn, estimated_tokens, operation)
+        done, _ = wait([primary], timeout=p95)
+        if done:
+            return primary.result()
+
+        hedge_provider, hedge_fn = hedge
+        with self._lock:
+            self.stats["hedged"] += 1
+        secondary = self._executor.submit(
+            self._call_with_retries, hedge_provider, hedge_fn, estimated_tokens, operation
+        )
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self._lock:
+                            self.stats["hedge_wins"] += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def acall(
+        self,
+        provider: str,
+        fn: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        hedge: Optional[Tuple[str, Callable[[], Awaitable[Any]]]] = None,
+        operation: str = "call"
+    ) -> Any:
+        """
+        Async version of call: waits for rate limits and backoff on the event
+        loop instead of a thread, and cancels the losing call when hedging.
+
+        Args:
+            provider: Provider name used for rate limits and latency tracking
+            fn: Coroutine function performing the call
+            estimated_tokens: Tokens debited from the provider's token bucket
+            hedge: Optional (provider, coroutine function) raced after the
+                p95 latency of the provider's operation
+            operation: Kind of call; latencies are tracked per operation
+
+        Returns:
+            The result of whichever call finished first successfully
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+
+        p95 = self._hedge_delay(provider, operation, hedge)
+        if p95 is None:
+            return await self._acall_with_retries(provider, fn, estimated_tokens, operation)
+
+        primary = asyncio.ensure_future(self._acall_with_retries(provider, fn, estimated_tokens, operation))
+        done, _ = await asyncio.wait({primary}, timeout=p95)
+        if done:
+            return primary.result()
+
+        hedge_provider, hedge_fn = hedge
+        with self._lock:
+            self.stats["hedged"] += 1
+        secondary = asyncio.ensure_future(
+            self._acall_with_retries(hedge_provider, hedge_fn, estimated_tokens, operation)
+        )
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            with self._lock:
+                                self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+_SCHEDULER: Optional[RequestScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def get_scheduler() -> RequestScheduler:
+    """Get the process-wide scheduler; rate limits apply across all sessions."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = RequestScheduler(
+                max_retries=Config.get_int("ORIXA_MAX_RETRIES", 4),
+                hedge_min_samples=Config.get_int("ORIXA_HEDGE_MIN_SAMPLES", 20)
+            )
+        return _SCHEDULER
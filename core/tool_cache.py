@@ -0,0 +1,193 @@
+"""Memoization of the pandas agent's Python tool."""
+import ast
+import builtins
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Set, Type
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from .sandbox import PythonInputs, sanitize_code
+
+# Names the agent's REPL always provides; anything else may come from an
+# earlier step and make the snippet's output depend on session state
+KNOWN_NAMES: Set[str] = {"df", "pd", "np"} | set(dir(builtins))
+
+# Calls whose result differs between runs or that mutate their target
+UNCACHEABLE_CALLS: Set[str] = {
+    "sample", "shuffle", "random", "rand", "randint", "now", "today", "time",
+    # Change a frame (or a list or dict) without an inplace argument
+    "insert", "pop", "popitem", "update", "clear", "append", "extend", "remove",
+    "setdefault", "sort", "reverse", "discard",
+    # Run arbitrary code (df.eval / df.query with assignments, builtins)
+    "eval", "exec", "setattr", "delattr", "__setitem__", "__delitem__",
+}
+
+ERROR_OUTPUT = re.compile(r"^\w+(Error|Exception|Interrupt|Exit):")
+
+class ToolResultCache:
+    """Thread-safe LRU cache of tool outputs."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached output, marking it as recently used."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store an output, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def normalize_code(code: str) -> Optional[ast.Module]:
+    """Parse code into an AST, or None if it isn't valid Python."""
+    try:
+        return ast.parse(sanitize_code(code))
+    except SyntaxError:
+        return None
+
+def is_cacheable(tree: ast.Module) -> bool:
+    """
+    Check that a snippet is a pure read of the dataset.
+
+    Snippets that assign, import, delete, modify in place (with inplace=
+    or a mutating call such as df.insert or df.pop), call random or clock
+    functions, or read variables from earlier steps are not cached, since
+    skipping them would change the REPL's state or their output.
+    """
+    stored: Set[str] = set()
+    loaded: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Delete,
+                             ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal,
+                             ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return False
+        if isinstance(node, ast.NamedExpr):
+            return False
+        if isinstance(node, ast.Call):
+            if any(keyword.arg == "inplace" for keyword in node.keywords):
+                return False
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in UNCACHEABLE_CALLS:
+                return False
+        if isinstance(node, ast.Name):
+            (stored if isinstance(node.ctx, ast.Store) else loaded).add(node.id)
+        if isinstance(node, ast.arg):
+            stored.add(node.arg)
+    return not (loaded - stored - KNOWN_NAMES)
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    """Get the variable at the base of an attribute or subscript chain."""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+def changes_dataset(tree: ast.Module) -> bool:
+    """
+    Check whether a snippet may change df, pd or np for later steps.
+
+    Args:
+        tree: Parsed snippet
+
+    Returns:
+        True if it assigns to or deletes from them, calls a mutating
+        method, or passes inplace=
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.Delete)):
+            targets = node.targets
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+            targets = [node.target]
+        elif isinstance(node, ast.Call):
+            if any(keyword.arg == "inplace" for keyword in node.keywords):
+                return True
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in UNCACHEABLE_CALLS:
+                return True
+            continue
+        else:
+            continue
+        for target in targets:
+            elements = target.elts if isinstance(target, (ast.Tuple, ast.List)) else [target]
+            if any(_root_name(element) in {"df", "pd", "np"} for element in elements):
+                return True
+    return False
+
+def cache_key(tree: ast.Module, dataset_version: str, scope: str = "") -> str:
+    """Build a cache key from the normalized code and dataset version."""
+    digest = hashlib.sha256()
+    for part in (dataset_version, scope, ast.dump(tree)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+_CACHE: Optional[ToolResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_tool_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache, shared across sessions."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            from .config import Config
+            _CACHE = ToolResultCache(Config.get_int("ORIXA_TOOL_CACHE_SIZE", 256))
+        return _CACHE
+
+class CachedPythonTool(BaseTool):
+    """Wraps python_repl_ast so identical read-only snippets run once per dataset."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str = "python_repl_ast"
+    description: str = ""
+    args_schema: Type[BaseModel] = PythonInputs
+    tool: BaseTool
+    dataset_version: str
+    scope: str = ""
+    # Set once a step changes df, after which outputs are this session's own
+    _changed: bool = PrivateAttr(default=False)
+
+    def __init__(self, **kwargs: Any):
+        tool = kwargs["tool"]
+        kwargs.setdefault("name", tool.name)
+        kwargs.setdefault("description", tool.description)
+        super().__init__(**kwargs)
+
+    def _run(self, query: str, run_manager: Any = None) -> Any:
+        """Return the cached output or run the wrapped tool."""
+        tree = normalize_code(query)
+        if tree is None or self._changed or not is_cacheable(tree):
+            if tree is not None and changes_dataset(tree):
+                self._changed = True
+            return self.tool._run(query)
+
+        cache = get_tool_cache()
+        key = cache_key(tree, self.dataset_version, self.scope)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        output = self.tool._run(query)
+        if not ERROR_OUTPUT.match(str(output)):
+            cache.put(key, str(output))
+        return output
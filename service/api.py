@@ -0,0 +1,130 @@
+"""Headless HTTP API for GA4 analysis.
+
+Run with several workers; datasets are shared through ORIXA_SERVICE_DATA_DIR:
+
+    uvicorn service.api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import os
+import tempfile
+from typing import List, Optional
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+from core.callbacks import METRICS_REGISTRY
+from core.config import Config
+from core.models import get_available_models
+from core.prompts import ANALYSIS_TYPES
+from .registry import DatasetRegistry, UnknownDatasetError
+
+Config.setup_environment()
+
+app = FastAPI(
+    title="Orixa API",
+    version="1.0",
+    description="GA4 data analysis with LLMs"
+)
+
+registry = DatasetRegistry(
+    data_dir=os.getenv("ORIXA_SERVICE_DATA_DIR", "").strip()
+    or os.path.join(tempfile.gettempdir(), "orixa-service"),
+    max_loaded=Config.get_int("ORIXA_SERVICE_MAX_LOADED", 8)
+)
+
+class RegisterRequest(BaseModel):
+    path: str
+    name: Optional[str] = None
+
+class AnalyzeRequest(BaseModel):
+    analysis_type: str = "overview"
+    model: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    analysis_types: Optional[List[str]] = None
+    model: Optional[str] = None
+
+class AskRequest(BaseModel):
+    question: str
+    model: Optional[str] = None
+    session_id: Optional[str] = None
+
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(UnknownDatasetError)
+async def unknown_dataset_handler(request: Request, exc: UnknownDatasetError) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"detail": f"Unknown dataset: {exc.args[0]}"})
+
+@app.exception_handler(PermissionError)
+async def permission_error_handler(request: Request, exc: PermissionError) -> JSONResponse:
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok"}
+
+@app.get("/models")
+async def models() -> dict:
+    return {
+        "models": [
+            {"name": name, "display_name": config.display_name, "model_id": config.model_id}
+            for name, config in get_available_models().items()
+        ],
+        "analysis_types": ANALYSIS_TYPES
+    }
+
+@app.post("/datasets")
+async def upload_dataset(file: UploadFile = File(...)) -> dict:
+    """Upload a GA4 CSV export; uploading the same content again returns the same id."""
+    max_bytes = Config.get_int("ORIXA_SERVICE_MAX_UPLOAD_MB", 200) * 1024 * 1024
+    content = await file.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+    info = await registry.add(content, file.filename or "upload.csv")
+    return info.to_dict()
+
+@app.post("/datasets/register")
+async def register_dataset(request: RegisterRequest) -> dict:
+    """Register an export already on the server, relative to ORIXA_SERVICE_DATA_ROOT."""
+    info = await registry.register(request.path, request.name)
+    return info.to_dict()
+
+@app.get("/datasets")
+async def list_datasets() -> dict:
+    return {"datasets": [info.to_dict() for info in registry.list()]}
+
+@app.get("/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str) -> dict:
+    return registry.info(dataset_id).to_dict()
+
+@app.post("/datasets/{dataset_id}/analyze")
+async def analyze(dataset_id: str, request: AnalyzeRequest) -> dict:
+    analyzer = await registry.analyzer(dataset_id, request.model)
+    result = await analyzer.aanalyze(request.analysis_type)
+    return {"model": analyzer.current_model_name, "analysis_type": request.analysis_type, "result": result}
+
+@app.post("/datasets/{dataset_id}/analyze-batch")
+async def analyze_batch(dataset_id: str, request: BatchRequest) -> dict:
+    analyzer = await registry.analyzer(dataset_id, request.model)
+    result = await analyzer.aanalyze_batch(request.analysis_types)
+    return {"model": analyzer.current_model_name, "result": result}
+
+@app.post("/datasets/{dataset_id}/ask")
+async def ask(dataset_id: str, request: AskRequest) -> dict:
+    analyzer = await registry.analyzer(dataset_id, request.model)
+    memory = registry.memory(dataset_id, request.session_id)
+    answer = await analyzer.aask(request.question, memory)
+    return {"model": analyzer.current_model_name, "answer": answer}
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS_REGISTRY.to_prometheus())
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        "service.api:app",
+        host=os.getenv("ORIXA_SERVICE_HOST", "127.0.0.1"),
+        port=Config.get_int("ORIXA_SERVICE_PORT", 8000),
+        workers=Config.get_int("ORIXA_SERVICE_WORKERS", 1)
+    )
@@ -0,0 +1,273 @@
+"""Dataset registry shared by all requests of a service worker."""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from core.analyzer import DataAnalyzer, LoadedData
+from core.config import Config
+from core.memory import ConversationMemory
+from core.models import get_default_model
+from core.reader import read_ga4_csv
+
+class UnknownDatasetError(KeyError):
+    """Raised for dataset ids that were never registered."""
+
+@dataclass
+class DatasetInfo:
+    """Metadata of a registered dataset."""
+    id: str
+    name: str
+    rows: int
+    columns: int
+    size_bytes: int
+    created_at: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class DatasetRegistry:
+    """
+    Registers GA4 exports on disk and keeps loaded datasets in memory.
+
+    Datasets are stored by content hash in a directory every worker can
+    read, so any uvicorn worker can serve any dataset; each worker parses
+    and preprocesses a dataset at most once and keeps the most recently
+    used ones loaded. Loading needs no model: an analyzer is built per
+    dataset and model when a request first uses that model, and each
+    request gets its own agent on top of it.
+    """
+
+    def __init__(self, data_dir: str, max_loaded: int = 8, max_sessions: int = 1000):
+        """
+        Args:
+            data_dir: Directory holding the registered exports
+            max_loaded: Datasets kept preprocessed in memory per worker
+            max_sessions: Conversations kept per worker for follow-up questions
+        """
+        self.data_dir = data_dir
+        self.max_loaded = max_loaded
+        self.max_sessions = max_sessions
+        self._datasets: "OrderedDict[str, LoadedData]" = OrderedDict()
+        self._analyzers: Dict[Tuple[str, str], DataAnalyzer] = {}
+        self._sessions: "OrderedDict[Tuple[str, str], ConversationMemory]" = OrderedDict()
+        # Dataset id -> (lock of its load, requests holding or waiting for it)
+        self._load_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+
+    def _path(self, dataset_id: str, extension: str) -> str:
+        if not dataset_id.isalnum():
+            raise UnknownDatasetError(dataset_id)
+        return os.path.join(self.data_dir, f"{dataset_id}.{extension}")
+
+    def _write(self, path: str, content: bytes) -> None:
+        """Write atomically so other workers never read a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _cache(self, dataset_id: str, data: LoadedData) -> None:
+        with self._lock:
+            self._datasets[dataset_id] = data
+            self._datasets.move_to_end(dataset_id)
+            while len(self._datasets) > self.max_loaded:
+                evicted, _ = self._datasets.popitem(last=False)
+                for key in [key for key in self._analyzers if key[0] == evicted]:
+                    del self._analyzers[key]
+
+    async def add(self, content: bytes, name: str) -> DatasetInfo:
+        """
+        Register an export, validating it as GA4 data first.
+
+        Args:
+            content: CSV file content
+            name: Display name, usually the file name
+
+        Returns:
+            The dataset's metadata; re-adding the same content is a no-op
+
+        Raises:
+            ValueError: If the file is not a valid GA4 export
+        """
+        dataset_id = hashlib.sha256(content).hexdigest()[:16]
+        try:
+            return self.info(dataset_id)
+        except UnknownDatasetError:
+            pass
+
+        try:
+            df = await asyncio.to_thread(read_ga4_csv, io.BytesIO(content))
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise ValueError(f"Error reading CSV file: {str(e)}")
+        except ValueError:
+            # Not a GA4 export; the reader's message says what's missing
+            raise
+        except Exception as e:
+            raise ValueError(f"Error reading CSV file: {str(e)}")
+        data = await asyncio.to_thread(DataAnalyzer.prepare_data, df)
+
+        info = DatasetInfo(
+            id=dataset_id,
+            name=name,
+            rows=len(df),
+            columns=len(df.columns),
+            size_bytes=len(content),
+            created_at=time.time()
+        )
+        await asyncio.to_thread(self._write, self._path(dataset_id, "csv"), content)
+        self._write(self._path(dataset_id, "json"), json.dumps(info.to_dict()).encode())
+        self._cache(dataset_id, data)
+        return info
+
+    async def register(self, path: str, name: Optional[str] = None) -> DatasetInfo:
+        """
+        Register an export already on the server.
+
+        Only files inside ORIXA_SERVICE_DATA_ROOT can be registered.
+
+        Raises:
+            PermissionError: If the path is outside the allowed root
+            ValueError: If the file is missing or not a valid GA4 export
+        """
+        root = os.getenv("ORIXA_SERVICE_DATA_ROOT", "").strip()
+        if not root:
+            raise PermissionError("Registering server-side files is disabled")
+        real_root = os.path.realpath(root)
+        real_path = os.path.realpath(os.path.join(real_root, path))
+        if os.path.commonpath([real_root, real_path]) != real_root:
+            raise PermissionError(f"Path is outside the data root: {path}")
+        if not os.path.isfile(real_path):
+            raise ValueError(f"File not found: {path}")
+        with open(real_path, "rb") as f:
+            content = await asyncio.to_thread(f.read)
+        return await self.add(content, name or os.path.basename(real_path))
+
+    def info(self, dataset_id: str) -> DatasetInfo:
+        """Get a dataset's metadata, raising UnknownDatasetError if it is unknown."""
+        try:
+            with open(self._path(dataset_id, "json"), encoding="utf-8") as f:
+                return DatasetInfo(**json.load(f))
+        except FileNotFoundError:
+            raise UnknownDatasetError(dataset_id)
+
+    def list(self) -> List[DatasetInfo]:
+        """All registered datasets, newest first."""
+        infos = []
+        for file_name in os.listdir(self.data_dir):
+            if file_name.endswith(".json"):
+                try:
+                    infos.append(self.info(file_name[:-len(".json")]))
+                except (UnknownDatasetError, ValueError):
+                    continue
+        return sorted(infos, key=lambda info: -info.created_at)
+
+    async def _load(self, dataset_id: str) -> LoadedData:
+        self.info(dataset_id)
+        df = await asyncio.to_thread(read_ga4_csv, self._path(dataset_id, "csv"))
+        data = await asyncio.to_thread(DataAnalyzer.prepare_data, df)
+        self._cache(dataset_id, data)
+        return data
+
+    async def analyzer(self, dataset_id: str, model: Optional[str] = None) -> DataAnalyzer:
+        """
+        Get an analyzer of a dataset and model for one request, loading the dataset on first use in this worker.
+
+        Concurrent requests for a dataset that is still loading wait for
+        that load instead of starting their own. The loaded data, the LLM
+        and stored analyses are shared, but every request gets its own
+        agent, so the code one request runs never sees another's variables
+        or changes to df. Analyzers don't prefetch: the service only calls
+        the LLM for analyses a request asks for.
+
+        Args:
+            dataset_id: Registered dataset
+            model: Model to use (defaults to the first available one)
+
+        Raises:
+            UnknownDatasetError: If the dataset is unknown
+            ValueError: If the model is unknown or unavailable
+        """
+        if model is None:
+            default = get_default_model()
+            if default is None:
+                raise ValueError(
+                    "No AI models available. Please configure at least one API key "
+                    "(OpenAI, Anthropic, or Google)"
+                )
+            model = default.name
+
+        with self._lock:
+            analyzer = self._analyzers.get((dataset_id, model))
+            if analyzer is None:
+                lock, waiters = self._load_locks.get(dataset_id, (asyncio.Lock(), 0))
+                self._load_locks[dataset_id] = (lock, waiters + 1)
+        if analyzer is None:
+            try:
+                analyzer = await self._shared_analyzer(dataset_id, model, lock)
+            finally:
+                with self._lock:
+                    # Drop the lock once no request needs it, so the map stays bounded
+                    lock, waiters = self._load_locks[dataset_id]
+                    if waiters > 1:
+                        self._load_locks[dataset_id] = (lock, waiters - 1)
+                    else:
+                        del self._load_locks[dataset_id]
+        with self._lock:
+            if dataset_id in self._datasets:
+                self._datasets.move_to_end(dataset_id)
+        return await asyncio.to_thread(analyzer.for_request)
+
+    async def _shared_analyzer(self, dataset_id: str, model: str, lock: asyncio.Lock) -> DataAnalyzer:
+        """Build the analyzer shared by a dataset's requests for a model, loading the dataset if needed."""
+        async with lock:
+            with self._lock:
+                data = self._datasets.get(dataset_id)
+                analyzer = self._analyzers.get((dataset_id, model))
+            if analyzer is not None:
+                return analyzer
+            if data is None:
+                data = await self._load(dataset_id)
+
+            def build() -> DataAnalyzer:
+                built = DataAnalyzer(model)
+                built.attach_data(data, prefetch=False)
+                return built
+
+            analyzer = await asyncio.to_thread(build)
+            with self._lock:
+                if dataset_id in self._datasets:
+                    self._analyzers[(dataset_id, model)] = analyzer
+            return analyzer
+
+    def memory(self, dataset_id: str, session_id: Optional[str]) -> ConversationMemory:
+        """
+        Get a session's conversation about a dataset.
+
+        Without a session id every question stands alone. Sessions live in
+        the worker's memory, so follow-ups need sticky routing when several
+        workers run.
+        """
+        if not session_id:
+            return ConversationMemory()
+        key = (dataset_id, session_id)
+        with self._lock:
+            memory = self._sessions.get(key)
+            if memory is None:
+                memory = ConversationMemory(
+                    max_turns=Config.get_int("ORIXA_MEMORY_TURNS", 3),
+                    token_budget=Config.get_int("ORIXA_MEMORY_TOKEN_BUDGET", 600)
+                )
+                self._sessions[key] = memory
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return memory
@@ -0,0 +1,35 @@
+"""Stored analysis jobs run on the model they are stored under."""
+import threading
+
+from core.analyzer import DataAnalyzer
+
+def _analyzer(model_name):
+    analyzer = DataAnalyzer.__new__(DataAnalyzer)
+    analyzer._jobs = {}
+    analyzer._jobs_lock = threading.Lock()
+    analyzer.dataset_version = "v1"
+    analyzer.current_model_name = model_name
+    analyzer.llm = f"llm-{model_name}"
+    analyzer.agent = f"agent-{model_name}"
+    return analyzer
+
+def test_job_claimed_before_switch_runs_on_claiming_model(monkeypatch):
+    monkeypatch.setattr(DataAnalyzer, "_precomputed_prompt", lambda self, analysis_type: "prompt")
+    monkeypatch.setattr(DataAnalyzer, "_call_llm", lambda self, prompt, operation: self.llm)
+    analyzer = _analyzer("a")
+
+    future, runner = analyzer._claim_job("overview")
+    # The model changes while the prefetch is still queued
+    analyzer.current_model_name, analyzer.llm, analyzer.agent = "b", "llm-b", "agent-b"
+    runner._run_job(future, "overview", "prefetch")
+
+    assert future.result() == "llm-a"
+    assert analyzer._jobs[("v1", "a", "overview")] is future
+    _, new_runner = analyzer._claim_job("overview")
+    assert new_runner.llm == "llm-b"
+
+def test_reused_job_has_no_runner():
+    analyzer = _analyzer("a")
+    future, runner = analyzer._claim_job("overview")
+    assert runner is not None
+    assert analyzer._claim_job("overview") == (future, None)
@@ -0,0 +1,35 @@
+"""Batch runs bound the exports held in memory at once."""
+import asyncio
+
+from core.batch import BatchRunner
+
+def test_exports_in_flight_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setenv("ORIXA_FAKE_PROFILE", "instant")
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"export{i}.csv"
+        path.write_text(f"event_date,event_name,event_timestamp\n20241019,page_view,{i}\n")
+        paths.append(str(path))
+
+    runner = BatchRunner(
+        output_dir=str(tmp_path / "reports"),
+        model_name="fake",
+        analysis_types=["overview"],
+        formats=["json"],
+        workers=1,
+        concurrency=4,
+        max_exports=2
+    )
+    in_flight = []
+    peak = []
+
+    async def run_one(path, content_hash, pool, semaphore):
+        in_flight.append(path)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(path)
+
+    monkeypatch.setattr(runner, "_run_one", run_one)
+    asyncio.run(runner.run(paths))
+    assert len(peak) == 6
+    assert max(peak) == 2
@@ -0,0 +1,24 @@
+"""LTTB downsampling keeps the shape of long series."""
+import numpy as np
+import pandas as pd
+
+from core.dashboard import downsample, lttb_indices
+
+def test_keeps_endpoints_and_point_count():
+    y = np.sin(np.linspace(0, 20, 1000))
+    picks = lttb_indices(y, 50)
+    assert len(picks) == 50
+    assert picks[0] == 0 and picks[-1] == 999
+    assert (np.diff(picks) > 0).all()
+
+def test_keeps_spikes():
+    y = np.zeros(1000)
+    y[437] = 100.0
+    y[812] = -50.0
+    picks = lttb_indices(y, 20)
+    assert 437 in picks and 812 in picks
+
+def test_short_series_are_unchanged():
+    frame = pd.DataFrame({"events": [1, 2, 3]}, index=["2024-10-01", "2024-10-02", "2024-10-03"])
+    assert downsample(frame, 10) is frame
+    assert list(lttb_indices(np.arange(5.0), 2)) == [0, 1, 2, 3, 4]
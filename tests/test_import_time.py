@@ -0,0 +1,19 @@
+"""Cold-start check: provider SDKs and agent tooling must be imported lazily."""
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_benchmark():
+    spec = importlib.util.spec_from_file_location(
+        "import_time", os.path.join(ROOT, "benchmarks", "import_time.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_analyzer_imports_no_provider_sdks():
+    benchmark = _load_benchmark()
+    timings, _ = benchmark.measure("core.analyzer")
+    eager = [name for name in benchmark.LAZY_MODULES if name in timings]
+    assert not eager, f"imported eagerly: {', '.join(eager)}"
@@ -0,0 +1,28 @@
+"""Conversation memory stays within its turn and token limits."""
+from core.digest import estimate_tokens
+from core.memory import ConversationMemory
+
+def test_old_turns_are_folded_into_summary():
+    memory = ConversationMemory(max_turns=2, token_budget=1000)
+    for i in range(4):
+        memory.add(f"Question {i}?", f"### 💡 Answer\nAnswer {i}. More detail follows.\n### Data\n- x")
+    rendered = memory.render()
+    assert len(memory.turns) == 2
+    assert memory.summary == ["Q: Question 0? → Answer 0.", "Q: Question 1? → Answer 1."]
+    assert "User: Question 3?" in rendered
+    assert memory.last_question == "Question 3?"
+
+def test_render_stays_within_budget():
+    memory = ConversationMemory(max_turns=3, token_budget=100)
+    for i in range(20):
+        memory.add(f"Question {i}?", "word " * 300)
+    assert estimate_tokens(memory.render()) <= 100
+    assert memory.last_question == "Question 19?"
+
+def test_repeated_turn_is_recorded_once():
+    memory = ConversationMemory()
+    memory.add("Top pages?", "Home.")
+    memory.add("Top pages?", "Home.")
+    assert len(memory) == 1
+    memory.clear()
+    assert memory.render() == ""
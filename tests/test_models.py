@@ -0,0 +1,20 @@
+"""Offline models are offered like the others and pooled by their settings."""
+from core.config import Config
+from core.models import AVAILABLE_MODELS
+
+def test_fake_model_is_listed_when_configured(monkeypatch):
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("ORIXA_FAKE_PROFILE", "instant")
+    status = Config.get_available_models()
+    assert status[AVAILABLE_MODELS["fake"].display_name]
+    assert set(status) == {model.display_name for model in AVAILABLE_MODELS.values()}
+
+def test_fake_pool_key_follows_timing_overrides(monkeypatch):
+    monkeypatch.setenv("ORIXA_FAKE_PROFILE", "instant")
+    fake = AVAILABLE_MODELS["fake"]
+    before = fake.pool_key
+    monkeypatch.setenv("ORIXA_FAKE_LATENCY", "0.5")
+    assert fake.pool_key != before
+    monkeypatch.setenv("ORIXA_FAKE_TOKENS_PER_SECOND", "10")
+    assert fake.create_instance().tokens_per_second == 10
@@ -0,0 +1,58 @@
+"""Only column and tool failures are retried on the full frame."""
+from types import SimpleNamespace
+
+import pytest
+
+from core.analyzer import DataAnalyzer, is_pruning_error
+
+class RateLimitError(Exception):
+    status_code = 429
+
+class AuthenticationError(Exception):
+    status_code = 401
+
+class ToolException(Exception):
+    pass
+
+@pytest.mark.parametrize("error, expected", [
+    (KeyError("page_title"), True),
+    (ValueError("['page_title'] not in index"), True),
+    (ToolException("python_repl_ast failed"), True),
+    (RateLimitError("429 Too Many Requests"), False),
+    (TimeoutError("Request timed out"), False),
+    (AuthenticationError("Invalid API key"), False),
+])
+def test_is_pruning_error(error, expected):
+    assert is_pruning_error(error) is expected
+
+class FailingAgent:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, prompt, config=None):
+        self.calls += 1
+        raise self.error
+
+def _analyzer(agent, full_agent):
+    analyzer = DataAnalyzer.__new__(DataAnalyzer)
+    analyzer.model_config = SimpleNamespace(supports_functions=True)
+    analyzer.context = SimpleNamespace(dropped=["page_title"])
+    analyzer.agent = agent
+    analyzer._full_agent = full_agent
+    return analyzer
+
+def test_provider_errors_are_not_retried_on_full_frame():
+    full_agent = FailingAgent(AssertionError("full frame used"))
+    analyzer = _analyzer(FailingAgent(RateLimitError("429 Too Many Requests")), full_agent)
+    with pytest.raises(RateLimitError):
+        analyzer._run_prompt("Top pages", "")
+    assert full_agent.calls == 0
+
+def test_column_errors_are_retried_on_full_frame():
+    class FullAgent:
+        def invoke(self, prompt, config=None):
+            return {"output": "answer"}
+
+    analyzer = _analyzer(FailingAgent(KeyError("page_title")), FullAgent())
+    assert analyzer._run_prompt("Top pages", "") == "answer"
@@ -0,0 +1,40 @@
+"""Chunked quality profiling matches a single pass over the export."""
+import numpy as np
+import pandas as pd
+
+from core.quality import QualityProfiler, profile_quality
+
+def _export():
+    return pd.DataFrame({
+        "user_pseudo_id": ["a", "b", "a", "c", "b", "a"],
+        "event_timestamp": [1, 2, 1, 3, 2, 4],
+        "event_name": ["page_view", "click", "page_view", "scroll", "click", "page_view"],
+        "page_title": ["Home", None, "Home", None, None, "Blog"],
+    })
+
+def test_duplicates_across_chunk_boundaries():
+    whole = profile_quality(_export())
+    chunked = profile_quality(_export(), chunk_rows=2)
+    assert whole.duplicate_events == chunked.duplicate_events == 2
+    assert sorted(cluster.rows for cluster in chunked.clusters) == [[0, 2], [1, 4]]
+    pd.testing.assert_series_equal(whole.null_rates, chunked.null_rates)
+    assert chunked.null_rates["page_title"] == 0.5
+
+def test_nested_fields_are_rated_over_all_rows():
+    frame = pd.DataFrame({
+        "event_name": ["page_view", None, None, "click"],
+        "event_timestamp": [1, None, None, 2],
+        "event_params.key": ["page", "title", "engaged", None],
+    })
+    report = profile_quality(frame, chunk_rows=3)
+    assert report.events == 2
+    assert report.null_rates["event_timestamp"] == 0
+    assert report.null_rates["event_params.key"] == 0.25
+
+def test_numeric_keys_match_across_chunk_dtypes():
+    frame = pd.DataFrame({"user_pseudo_id": ["a", "a"], "event_timestamp": [1, 1], "event_name": ["x", "x"]})
+    chunks = [frame.iloc[:1], frame.iloc[1:].astype({"event_timestamp": np.float64})]
+    profiler = QualityProfiler()
+    for chunk in chunks:
+        profiler.update(chunk)
+    assert profiler.report().duplicate_events == 1
@@ -0,0 +1,62 @@
+"""Ingestion retries files whose embedding batches failed."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive", "RAG"))
+pytest.importorskip("langchain_core")
+
+from ingest import Ingestor  # noqa: E402
+from langchain_core.embeddings import Embeddings  # noqa: E402
+from vector_store import HashingEmbeddings, LocalVectorStore  # noqa: E402
+
+def parse_lines(path, name, content_hash):
+    with open(path, encoding="utf-8") as f:
+        return [(line.strip(), {"filename": name, "file_hash": content_hash}) for line in f if line.strip()]
+
+class FlakyEmbeddings(Embeddings):
+    """Remote-style embedder failing the given calls (1-based), like a rate-limited API."""
+
+    def __init__(self, failing_calls=()):
+        self.hashing = HashingEmbeddings(dimensions=64)
+        self.failing_calls = set(failing_calls)
+        self.calls = 0
+
+    @property
+    def name(self):
+        return "flaky"
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls in self.failing_calls:
+            raise RuntimeError("429 Too Many Requests")
+        return self.hashing.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.hashing.embed_query(text)
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("\n".join(f"chunk number {i}" for i in range(10)), encoding="utf-8")
+    return str(path)
+
+def test_failed_batch_is_reported_and_retried(tmp_path, document):
+    directory = str(tmp_path / "store")
+    store = LocalVectorStore(directory, FlakyEmbeddings(failing_calls={2}))
+    ingestor = Ingestor(store, workers=1, batch_size=4, concurrency=1, parse=parse_lines)
+
+    stats = ingestor.ingest([(document, "doc.txt")])
+    assert "doc.txt" in stats.errors
+    assert len(store) == 6
+
+    retry = Ingestor(LocalVectorStore(directory, FlakyEmbeddings()), workers=1, batch_size=4, parse=parse_lines)
+    stats = retry.ingest([(document, "doc.txt")])
+    assert not stats.errors
+    assert stats.skipped_files == 0
+    assert stats.new_chunks == 4
+    assert len(retry.store) == 10
+
+    stats = retry.ingest([(document, "doc.txt")])
+    assert stats.skipped_files == 1
@@ -0,0 +1,34 @@
+"""Column projection must not drop values that appear after the sample."""
+import pandas as pd
+import pytest
+
+from core.reader import read_ga4_csv
+
+@pytest.fixture
+def export(tmp_path):
+    rows = 50
+    df = pd.DataFrame({
+        "event_date": [20241019] * rows,
+        "event_name": ["page_view"] * (rows - 1) + ["purchase"],
+        "event_timestamp": range(rows),
+        "ecommerce.purchase_revenue": [None] * (rows - 1) + [12.5],
+        "user_properties.plan": [None] * rows,
+    })
+    path = tmp_path / "export.csv"
+    df.to_csv(path, index=False)
+    return path
+
+@pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+def test_keeps_column_set_after_sample(export, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    df = read_ga4_csv(export, sample_rows=10, engine=engine)
+    assert df["ecommerce.purchase_revenue"].iloc[-1] == 12.5
+
+@pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+def test_drops_column_empty_throughout(export, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    df = read_ga4_csv(export, sample_rows=10, engine=engine)
+    assert "user_properties.plan" not in df.columns
+    assert "user_properties.plan" in read_ga4_csv(export, sample_rows=10, project=False, engine=engine)
@@ -0,0 +1,71 @@
+"""Fast-path routing: only whole-export questions may skip the agent."""
+import pandas as pd
+import pytest
+
+from core.aggregates import GA4Aggregates
+from core.router import IntentRouter
+
+@pytest.fixture
+def aggregates():
+    days = [f"2024-10-{day:02d}" for day in range(1, 31)]
+    return GA4Aggregates(
+        total_events=1000,
+        unique_users=100,
+        date_start=days[0],
+        date_end=days[-1],
+        breakdowns={
+            "pages": pd.Series({"/home": 500, "/pricing": 300, "/blog": 200}),
+            "events": pd.Series({"page_view": 700, "scroll": 200, "click": 100}),
+            "devices": pd.Series({"mobile": 600, "desktop": 400}),
+        },
+        daily_events=pd.Series(range(1, 31), index=days),
+    )
+
+@pytest.mark.parametrize("question, intent", [
+    ("What are the top pages?", "top_pages"),
+    ("How many events are there?", "event_counts"),
+    ("Show the daily trend", "daily_trend"),
+    ("Which devices do visitors use?", "device_split"),
+])
+def test_matches_whole_export_questions(aggregates, question, intent):
+    assert IntentRouter().match(question, aggregates).name == intent
+
+@pytest.mark.parametrize("question", [
+    "How many events on 20241019?",
+    "How many events on 2024-10-19?",
+    "top pages yesterday",
+    "top pages last week",
+    "top pages in the past 7 days",
+    "top pages last month",
+    "Which pages were most viewed on Monday?",
+    "top pages in October",
+    "top pages since the launch",
+    "event counts between the 1st and the 10th",
+    "top pages from 10/01 to 10/07",
+])
+def test_date_filters_go_to_agent(aggregates, question):
+    assert IntentRouter().match(question, aggregates) is None
+
+@pytest.mark.parametrize("question", [
+    "trend for that page",
+    "What is its daily trend?",
+    "Show the trend for those pages",
+    "daily trend of the page mentioned above",
+])
+def test_back_references_go_to_agent(aggregates, question):
+    assert IntentRouter().match(question, aggregates) is None
+
+def test_filter_by_other_breakdown_goes_to_agent(aggregates):
+    assert IntentRouter().match("top pages on mobile", aggregates) is None
+
+def test_daily_supporting_data_is_capped(aggregates):
+    router = IntentRouter()
+    intent = router.match("Show the daily trend", aggregates)
+    lines = router.supporting_data(intent, aggregates, top_k=5).splitlines()
+    assert len(lines) == 6
+    assert lines[0].startswith("- **2024-10-30**")
+
+def test_event_answer_states_total(aggregates):
+    router = IntentRouter()
+    intent = router.match("How many events are there?", aggregates)
+    assert "1,000 in total" in router.answer(intent, aggregates)
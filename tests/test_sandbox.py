@@ -0,0 +1,28 @@
+"""Sandbox sessions keep their variables but not each other's changes."""
+import pandas as pd
+import pytest
+
+from core.sandbox import SandboxPool, publish_dataset
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxPool(workers=1, timeout=60)
+    yield pool
+    pool.shutdown()
+
+@pytest.fixture(scope="module")
+def dataset():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    return publish_dataset(df, "test-sandbox-sessions")
+
+def test_session_keeps_variables(pool, dataset):
+    pool.run("total = df['a'].sum()", dataset, session_id="keep")
+    assert pool.run("total", dataset, session_id="keep") == "6"
+
+def test_sessions_do_not_share_frame_changes(pool, dataset):
+    pool.run("df['a'] = df['a'] * 100", dataset, session_id="writer")
+    pool.run("df.drop(columns=['b'], inplace=True)", dataset, session_id="writer")
+    pool.run("df.loc[0, 'a'] = -1", dataset, session_id="writer")
+    assert pool.run("list(df.columns)", dataset, session_id="writer") == "['a']"
+    assert pool.run("df['a'].tolist()", dataset, session_id="reader") == "[1, 2, 3]"
+    assert pool.run("list(df.columns)", dataset, session_id="reader") == "['a', 'b']"
@@ -0,0 +1,64 @@
+"""Rate limits, retries and per-operation latency tracking of the scheduler."""
+import time
+
+import pytest
+
+from core.scheduler import ProviderLimits, RequestScheduler, TokenBucket, is_retryable
+
+class RateLimitError(Exception):
+    status_code = 429
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=600, capacity=1)
+    assert bucket.acquire() == 0
+    start = time.perf_counter()
+    bucket.acquire()
+    assert time.perf_counter() - start == pytest.approx(0.1, abs=0.05)
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(per_minute=0)
+    assert all(bucket.acquire(1000) == 0 for _ in range(10))
+
+def test_retries_rate_limits_but_not_other_errors():
+    scheduler = RequestScheduler(max_retries=3, base_delay=0.001, max_delay=0.001)
+    scheduler.configure("test", ProviderLimits())
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimitError("429 Too Many Requests")
+        return "ok"
+
+    assert scheduler.call("test", flaky) == "ok"
+    assert scheduler.stats["retries"] == 2
+
+    def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call("test", broken)
+    assert scheduler.stats["retries"] == 2
+
+def test_is_retryable():
+    assert is_retryable(RateLimitError("slow down"))
+    assert is_retryable(TimeoutError("timed out"))
+    assert not is_retryable(ValueError("bad request"))
+
+def test_latencies_are_tracked_per_operation():
+    scheduler = RequestScheduler()
+    scheduler.call("test", lambda: time.sleep(0.05), operation="agent:ask")
+    scheduler.call("test", lambda: None, operation="llm:ask")
+    assert scheduler.latency_percentile("test", 95, "agent:ask") >= 0.05
+    assert scheduler.latency_percentile("test", 95, "llm:ask") < 0.05
+
+def test_fast_calls_do_not_trigger_hedging_of_agent_runs():
+    scheduler = RequestScheduler(hedge_min_samples=5)
+    for _ in range(100):
+        scheduler.call("test", lambda: None, operation="llm:ask")
+    for _ in range(5):
+        scheduler.call("test", lambda: time.sleep(0.05), operation="agent:ask")
+    hedge = ("backup", lambda: "backup")
+    result = scheduler.call("test", lambda: time.sleep(0.01) or "primary", hedge=hedge, operation="agent:ask")
+    assert result == "primary"
+    assert scheduler.stats["hedged"] == 0
@@ -0,0 +1,38 @@
+"""Service requests share loaded data but not the code their agents run."""
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("langchain_experimental")
+
+from service.registry import DatasetRegistry  # noqa: E402
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sample.csv")
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("ORIXA_FAKE_PROFILE", "instant")
+    monkeypatch.setenv("ORIXA_EXECUTION_BACKEND", "inprocess")
+    return DatasetRegistry(str(tmp_path))
+
+def _repl(analyzer):
+    tool = analyzer.agent.tools[0]
+    return getattr(tool, "tool", tool)
+
+def test_requests_get_isolated_agents(registry):
+    async def run():
+        with open(SAMPLE, "rb") as f:
+            info = await registry.add(f.read(), "sample.csv")
+        return await asyncio.gather(registry.analyzer(info.id, "fake"), registry.analyzer(info.id, "fake"))
+
+    first, second = asyncio.run(run())
+    assert first.df is second.df
+    assert first._jobs is second._jobs
+    assert not registry._load_locks
+
+    columns = len(_repl(second).locals["df"].columns)
+    _repl(first).run("df.drop(columns=[df.columns[0]], inplace=True); x = 1")
+    assert len(_repl(second).locals["df"].columns) == columns
+    assert len(first.agent_df.columns) == columns
+    assert "NameError" in _repl(second).run("x")
@@ -0,0 +1,69 @@
+"""Only pure reads of the dataset are served from the tool cache."""
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.tools import BaseTool  # noqa: E402
+
+from core import tool_cache  # noqa: E402
+from core.tool_cache import CachedPythonTool, ToolResultCache, cache_key, is_cacheable, normalize_code  # noqa: E402
+
+@pytest.mark.parametrize("code", [
+    "df['page_title'].value_counts().head(10)",
+    "df.groupby('event_name').size().sort_values(ascending=False)",
+    "df.query('event_count > 1').shape",
+    "[c for c in df.columns if c.startswith('event')]",
+])
+def test_reads_are_cacheable(code):
+    assert is_cacheable(normalize_code(code))
+
+@pytest.mark.parametrize("code", [
+    "df.insert(0, 'x', 1)",
+    "df.pop('page_title')",
+    "df.update(df.fillna(0))",
+    "df.eval('total = a + b', inplace=True)",
+    "df.dropna(inplace=True)",
+    "df['x'] = 1",
+    "top = df.head()",
+    "df.sample(5)",
+    "pd.Timestamp.now()",
+    "import os",
+    "top.head()",
+])
+def test_changes_and_session_state_are_not_cacheable(code):
+    assert not is_cacheable(normalize_code(code))
+
+def test_key_depends_on_dataset_and_scope():
+    tree = normalize_code("df.shape")
+    assert cache_key(tree, "v1") == cache_key(normalize_code("df.shape  # rows"), "v1")
+    assert cache_key(tree, "v1") != cache_key(tree, "v2")
+    assert cache_key(tree, "v1", "pruned") != cache_key(tree, "v1", "full")
+
+class CountingTool(BaseTool):
+    name: str = "python_repl_ast"
+    description: str = "Runs Python"
+    calls: int = 0
+
+    def _run(self, query: str, run_manager=None) -> str:
+        self.calls += 1
+        return f"result {self.calls}"
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ToolResultCache()
+    monkeypatch.setattr(tool_cache, "_CACHE", cache)
+    return cache
+
+def test_reads_run_once_per_dataset(cache):
+    first = CachedPythonTool(tool=CountingTool(), dataset_version="v1")
+    second = CachedPythonTool(tool=CountingTool(), dataset_version="v1")
+    assert first._run("df.shape") == second._run("df.shape") == "result 1"
+    assert second.tool.calls == 0
+    assert cache.hits == 1
+
+def test_session_that_changed_df_bypasses_cache(cache):
+    tool = CachedPythonTool(tool=CountingTool(), dataset_version="v1")
+    tool._run("df.insert(0, 'x', 1)")
+    tool._run("df.shape")
+    assert tool.tool.calls == 2
+    assert len(cache) == 0
@@ -0,0 +1,46 @@
+"""The local vector store persists chunks and finds the closest ones."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive", "RAG"))
+pytest.importorskip("langchain_core")
+
+from vector_store import HashingEmbeddings, LocalVectorStore  # noqa: E402
+
+TEXTS = [
+    "Organic search drove most new users in October",
+    "Paid social campaigns converted poorly on mobile",
+    "The pricing page had the longest engagement time",
+]
+
+def test_search_finds_closest_chunk(tmp_path):
+    store = LocalVectorStore(str(tmp_path), HashingEmbeddings(dimensions=256))
+    store.add_texts(TEXTS, [{"source": "a"}, {"source": "b"}, {"source": "b"}])
+    doc, score = store.similarity_search_with_score("Which campaigns converted on mobile?", k=1)[0]
+    assert doc.page_content == TEXTS[1]
+    assert -1.0 <= score <= 1.0
+    hits = store.similarity_search("organic search users", k=3, filter={"source": "b"})
+    assert {doc.page_content for doc in hits} == set(TEXTS[1:])
+
+def test_store_reopens_from_disk(tmp_path):
+    embeddings = HashingEmbeddings(dimensions=256)
+    ids = LocalVectorStore(str(tmp_path), embeddings).add_texts(TEXTS)
+    reopened = LocalVectorStore(str(tmp_path), embeddings)
+    assert len(reopened) == 3
+    assert reopened.ids() == set(ids)
+    assert reopened.similarity_search("pricing page engagement", k=1)[0].page_content == TEXTS[2]
+
+def test_other_embedder_is_rejected(tmp_path):
+    LocalVectorStore(str(tmp_path), HashingEmbeddings(dimensions=256)).add_texts(TEXTS)
+    with pytest.raises(ValueError):
+        LocalVectorStore(str(tmp_path), HashingEmbeddings(dimensions=128))
+
+def test_ivf_search_matches_full_scan(tmp_path):
+    store = LocalVectorStore(str(tmp_path), HashingEmbeddings(dimensions=256))
+    store.add_texts([f"{text} {i}" for i in range(30) for text in TEXTS])
+    query = "Paid social campaigns on mobile"
+    expected = [doc.page_content for doc in store.similarity_search(query, k=3)]
+    store.build_ivf(n_lists=4)
+    assert [doc.page_content for doc in store.similarity_search(query, k=3, n_probe=4)] == expected